@@ -0,0 +1,79 @@
+"""Microbenchmark parsing zona waktu dan waktu di ``bot.services.utility_tools``.
+
+Membandingkan jalur lama (``ZoneInfo`` + ``strptime`` berurutan) dengan
+resolver ber-memo dan grammar regex yang sudah dikompilasi.
+
+Jalankan dari root repo::
+
+    python -m benchmarks.bench_utility_tools
+"""
+
+from __future__ import annotations
+
+import timeit
+from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone, tzinfo
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from bot.services import utility_tools
+
+TIMEZONE_INPUTS = ("WIB", "Asia/Jakarta", "UTC+7", "GMT-03:30", "wita")
+DATETIME_INPUTS = ("2025-01-31 19:45", "31/01/2025 19:45", "31-01-2025", "23:45", "2025/01/31 19:45")
+NUMBER = 20_000
+
+
+def legacy_timezone(value: str) -> tzinfo:
+    candidate = utility_tools._TZ_ALIAS.get(value.strip().upper(), value.strip())
+    try:
+        return ZoneInfo(candidate)
+    except ZoneInfoNotFoundError:
+        match = utility_tools._OFFSET_RE.fullmatch(candidate)
+        if not match:
+            raise ValueError(value) from None
+        sign = 1 if match.group(1) == "+" else -1
+        delta = timedelta(hours=int(match.group(2)), minutes=int(match.group(3) or 0)) * sign
+        return dt_timezone(delta)
+
+
+def legacy_datetime(value: str, tz: tzinfo, reference: datetime) -> datetime:
+    iso = utility_tools._try_parse_iso(value)
+    if iso is not None:
+        return iso.replace(tzinfo=tz) if iso.tzinfo is None else iso.astimezone(tz)
+    for fmt in utility_tools.SUPPORTED_TIME_FORMATS:
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        if fmt in {"%H:%M", "%H:%M:%S"}:
+            return datetime.combine(reference.date(), parsed.time(), tz)
+        if fmt in {"%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y"}:
+            return datetime.combine(parsed.date(), dt_time(), tz)
+        return parsed.replace(tzinfo=tz)
+    raise ValueError(value)
+
+
+def _report(label: str, legacy: float, current: float) -> None:
+    per_call = 1_000_000 / NUMBER
+    print(f"{label:<12} lama {legacy * per_call:8.2f} µs  baru {current * per_call:8.2f} µs  ({legacy / current:4.1f}x)")
+
+
+def main() -> None:
+    tz = ZoneInfo("Asia/Jakarta")
+    reference = datetime(2025, 1, 1, 12, 0, tzinfo=tz)
+
+    for value in TIMEZONE_INPUTS:
+        legacy = timeit.timeit(lambda: legacy_timezone(value), number=NUMBER)
+        current = timeit.timeit(lambda: utility_tools.resolve_timezone(value), number=NUMBER)
+        _report(value, legacy, current)
+
+    for value in DATETIME_INPUTS:
+        assert legacy_datetime(value, tz, reference) == utility_tools.parse_datetime_input(value, tz, reference=reference)
+        legacy = timeit.timeit(lambda: legacy_datetime(value, tz, reference), number=NUMBER)
+        current = timeit.timeit(
+            lambda: utility_tools.parse_datetime_input(value, tz, reference=reference),
+            number=NUMBER,
+        )
+        _report(value[:10], legacy, current)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,55 @@
 from __future__ import annotations
 
+import time
 from typing import TYPE_CHECKING, Optional
 
 import interactions
 
-from bot.services.activity_logger import ACTIVITY_LOG_CATEGORIES, ActivityLogger
+from bot.services.activity_logger import (
+    ACTIVITY_LOG_CATEGORIES,
+    ActivityLogger,
+    format_category_mode,
+    truncate_content,
+)
+from bot.services.message_pipeline import MessageContext
 
 if TYPE_CHECKING:
     from bot.database.repositories import GuildSettingsRepository
     from bot.main import ForUS
 
 
+ARCHIVE_SEARCH_LIMIT = 10
+
 CATEGORY_CHOICES: list[interactions.SlashCommandChoice] = [
     interactions.SlashCommandChoice(name=label, value=key) for key, label in ACTIVITY_LOG_CATEGORIES.items()
 ]
+MODE_CHOICES: list[interactions.SlashCommandChoice] = [
+    interactions.SlashCommandChoice(name="Penuh (setiap event)", value="full"),
+    interactions.SlashCommandChoice(name="Sampel (persentase event)", value="sampled"),
+    interactions.SlashCommandChoice(name="Agregat (ringkasan berkala)", value="aggregated"),
+]
+MODE_LABELS = {"full": "penuh", "sampled": "sampel", "aggregated": "agregat"}
 
 
 class ActivityLog(interactions.Extension):
     def __init__(self, bot: ForUS) -> None:
         self.bot = bot
         self.logger = ActivityLogger(bot)
+        bot.activity_logger = self.logger
+        self._pipeline = getattr(bot, "message_pipeline", None)
+        if self._pipeline is not None:
+            self._pipeline.register_provider("activity_log_channel", self._provide_activity_log_channel)
+            self._pipeline.register_stage("activity_log", self._message_stage)
+
+    def drop(self) -> None:
+        """Called when extension is unloaded"""
+        if self._pipeline is not None:
+            self._pipeline.unregister("activity_log")
+        if self.bot.activity_logger is self.logger:
+            self.bot.activity_logger = None
+        # Flush outbox berjalan async; ForUS.close() menunggu task ini selesai.
+        self.bot.track_closing(self.logger.close())
+        super().drop()
 
     async def _ensure_context(
         self, ctx: interactions.SlashContext
@@ -81,7 +111,9 @@ class ActivityLog(interactions.Extension):
         category_lines = []
         for key, label in ACTIVITY_LOG_CATEGORIES.items():
             emoji = "✅" if key not in config.disabled_categories else "❌"
-            category_lines.append(f"{emoji} {label} (`{key}`)")
+            mode, rate = config.mode_for(key)
+            mode_label = f"{MODE_LABELS[mode]} {rate}%" if mode == "sampled" else MODE_LABELS[mode]
+            category_lines.append(f"{emoji} {label} (`{key}`) — {mode_label}")
 
         embed.add_field(
             name="Kategori",
@@ -176,6 +208,7 @@ class ActivityLog(interactions.Extension):
             activity_log_channel_id=None,
             activity_log_enabled=True,
             activity_log_disabled_events=[],
+            activity_log_category_modes={},
         )
         await self.logger.invalidate_cache(guild.id)
 
@@ -242,6 +275,153 @@ class ActivityLog(interactions.Extension):
 
         await self._send_ephemeral(ctx, message)
 
+    @interactions.slash_command(
+        name="activitylog",
+        description="Activity log commands",
+        sub_cmd_name="mode",
+        sub_cmd_description="Atur mode pencatatan kategori: penuh, sampel, atau agregat.",
+        default_member_permissions=interactions.Permissions.ADMINISTRATOR,
+    )
+    @interactions.slash_option(
+        name="category",
+        description="Kategori log yang ingin diatur.",
+        opt_type=interactions.OptionType.STRING,
+        required=True,
+        choices=CATEGORY_CHOICES,
+    )
+    @interactions.slash_option(
+        name="mode",
+        description="Cara event kategori ini dicatat.",
+        opt_type=interactions.OptionType.STRING,
+        required=True,
+        choices=MODE_CHOICES,
+    )
+    @interactions.slash_option(
+        name="persen",
+        description="Persentase event yang dikirim untuk mode sampel (default 10).",
+        opt_type=interactions.OptionType.INTEGER,
+        required=False,
+        min_value=1,
+        max_value=99,
+    )
+    async def mode(
+        self,
+        ctx: interactions.SlashContext,
+        category: str,
+        mode: str,
+        persen: int = 10,
+    ) -> None:
+        guild = ctx.guild
+        repo = self.bot.guild_repo
+        if guild is None or repo is None:
+            await ctx.send("Repositori belum siap atau bukan dalam server.", ephemeral=True)
+            return
+        settings = await repo.get(guild.id)
+        modes = dict(settings.activity_log_category_modes if settings else {})
+        value = format_category_mode(mode, persen)
+        if value == "full":
+            modes.pop(category, None)
+        else:
+            modes[category] = value
+
+        await repo.upsert(guild.id, activity_log_category_modes=modes)
+        await self.logger.invalidate_cache(guild.id)
+
+        label = ACTIVITY_LOG_CATEGORIES.get(category, category)
+        if mode == "sampled":
+            message = f"Kategori {label} kini hanya mengirim sekitar {persen}% event ke channel log."
+        elif mode == "aggregated":
+            message = f"Kategori {label} kini dikirim sebagai ringkasan setiap {round(self.logger.aggregate_window / 60)} menit."
+        else:
+            message = f"Kategori {label} kembali mencatat setiap event."
+        await ctx.send(message, ephemeral=True)
+
+    @interactions.slash_command(
+        name="activitylog",
+        description="Activity log commands",
+        sub_cmd_name="search",
+        sub_cmd_description="Cari arsip activity log berdasarkan pengguna, channel, kategori, atau teks.",
+        default_member_permissions=interactions.Permissions.ADMINISTRATOR,
+    )
+    @interactions.slash_option(
+        name="pengguna",
+        description="Pengguna yang terlibat.",
+        opt_type=interactions.OptionType.USER,
+        required=False,
+    )
+    @interactions.slash_option(
+        name="channel",
+        description="Channel tempat aktivitas terjadi.",
+        opt_type=interactions.OptionType.CHANNEL,
+        required=False,
+    )
+    @interactions.slash_option(
+        name="kategori",
+        description="Kategori log.",
+        opt_type=interactions.OptionType.STRING,
+        required=False,
+        choices=CATEGORY_CHOICES,
+    )
+    @interactions.slash_option(
+        name="teks",
+        description="Kata kunci pada isi log (misal isi pesan yang dihapus).",
+        opt_type=interactions.OptionType.STRING,
+        required=False,
+    )
+    @interactions.slash_option(
+        name="hari",
+        description="Rentang waktu ke belakang dalam hari (default 7).",
+        opt_type=interactions.OptionType.INTEGER,
+        required=False,
+        min_value=1,
+        max_value=365,
+    )
+    async def search(
+        self,
+        ctx: interactions.SlashContext,
+        pengguna: Optional[interactions.User] = None,
+        channel: Optional[interactions.GuildChannel] = None,
+        kategori: Optional[str] = None,
+        teks: Optional[str] = None,
+        hari: int = 7,
+    ) -> None:
+        guild = ctx.guild
+        if guild is None:
+            await ctx.send("Perintah ini hanya bisa digunakan di dalam server.", ephemeral=True)
+            return
+        archive = getattr(self.bot, "activity_archive", None)
+        if archive is None:
+            await ctx.send("Arsip activity log tidak aktif di bot ini.", ephemeral=True)
+            return
+
+        since = int(time.time()) - hari * 86400
+        entries = await archive.search(
+            guild.id,
+            user_id=pengguna.id if pengguna else None,
+            channel_id=channel.id if channel else None,
+            category=kategori,
+            since=since,
+            text=teks,
+            limit=ARCHIVE_SEARCH_LIMIT,
+        )
+        if not entries:
+            await ctx.send("Tidak ada log yang cocok dengan filter tersebut.", ephemeral=True)
+            return
+
+        embed = interactions.Embed(
+            title="Hasil Pencarian Activity Log",
+            description=f"{len(entries)} entri terbaru dalam {hari} hari terakhir.",
+            color=interactions.Color.from_hex("#5865F2"),
+        )
+        for entry in entries:
+            label = ACTIVITY_LOG_CATEGORIES.get(entry.category, entry.category)
+            embed.add_field(
+                name=f"{entry.title} • {label}",
+                value=f"<t:{entry.created_at}:f>\n{truncate_content(entry.summary, limit=300)}",
+                inline=False,
+            )
+        await ctx.send(embed=embed, ephemeral=True)
+
     async def _resolve_log_channel(
         self,
         guild: interactions.Guild,
@@ -254,15 +434,15 @@ class ActivityLog(interactions.Extension):
         is_same = compare_channel_id == channel.id if compare_channel_id is not None else False
         return channel, is_same
 
-    @interactions.listen()
-    async def on_message(self, message: discord.Message) -> None:
-        guild = message.guild
-        if guild is None:
-            return
-        log_channel, is_log_channel = await self._resolve_log_channel(guild, compare_channel_id=message.channel.id)
-        if log_channel is None or is_log_channel:
+    async def _provide_activity_log_channel(self, ctx: MessageContext) -> Optional[interactions.GuildText]:
+        return await self.logger.get_log_channel(ctx.guild)
+
+    async def _message_stage(self, ctx: MessageContext) -> None:
+        message = ctx.message
+        if message.type != interactions.MessageType.DEFAULT:
             return
-        if message.type is not discord.MessageType.default:
+        log_channel = await ctx.get("activity_log_channel")
+        if log_channel is None or log_channel.id == message.channel.id:
             return
         await self.logger.log_message_sent(message, channel=log_channel)
 
@@ -73,6 +73,9 @@ class Admin(interactions.Extension):
             await ctx.send("Repositori belum siap atau bukan dalam server.", ephemeral=True)
             return
         await self.bot.guild_repo.upsert(ctx.guild.id, log_channel_id=channel.id)
+        pipeline = getattr(self.bot, "message_pipeline", None)
+        if pipeline is not None:
+            await pipeline.invalidate_settings(ctx.guild.id)
         await self._respond_updated(ctx, f"Channel log diset ke {channel.mention}.")
 
     @interactions.slash_command(
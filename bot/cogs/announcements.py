@@ -1,15 +1,24 @@
 from __future__ import annotations
 
-from datetime import datetime, time, timezone
-from typing import TYPE_CHECKING
+from datetime import datetime, time, timedelta, timezone
+from typing import TYPE_CHECKING, Any
 from zoneinfo import ZoneInfo
 
 import interactions
 
+from bot.database.repositories import ScheduledAnnouncement, ScheduledJob
+from bot.services.logging import get_logger
+
 if TYPE_CHECKING:
     from bot.main import ForUS
 
 DEFAULT_TZ = ZoneInfo("Asia/Jakarta")
+# Pengumuman yang terlambat lebih dari ini saat bot kembali aktif dibatalkan.
+ANNOUNCEMENT_MISFIRE_GRACE_SECONDS = 15 * 60
+# Kegagalan sementara (5xx, 429, jaringan) dijadwalkan ulang dengan backoff
+# eksponensial; hanya Forbidden/NotFound atau channel hilang yang membatalkan.
+ANNOUNCEMENT_RETRY_SECONDS = 60
+ANNOUNCEMENT_MAX_ATTEMPTS = 4
 
 
 # Permissions moved to command decorators
@@ -18,24 +27,29 @@ class Announcements(interactions.Extension):
     def __init__(self, bot: ForUS) -> None:
         super().__init__()
         self.bot = bot
+        self._log = get_logger("Announcements")
 
     async def cog_load(self) -> None:
-        if self.bot.announcement_repo is None:
+        # Jadwal pengumuman tersimpan di tabel job persisten; cukup daftarkan handler.
+        if self.bot.announcement_repo is None or not self.bot.scheduler:
             return
-        pending = await self.bot.announcement_repo.list_pending_all()
-        for announcement in pending:
-            run_time = datetime.fromisoformat(announcement.scheduled_at)
-            self._schedule_announcement(announcement.id, run_time)
+        self.bot.scheduler.register_job_type(
+            "announcement",
+            self._fire_announcements,
+            misfire_grace_time=ANNOUNCEMENT_MISFIRE_GRACE_SECONDS,
+            coalesce=True,
+            on_misfire=self._cancel_missed_announcements,
+        )
 
-    def _schedule_announcement(self, announcement_id: int, run_time: datetime) -> None:
+    async def _schedule_announcement(self, announcement_id: int, run_time: datetime) -> None:
         if not self.bot.scheduler:
             return
-        self.bot.scheduler.schedule_once(
-            f"announcement-{announcement_id}",
-            run_time,
-            self._fire_announcement,
-            announcement_id,
-        )
+        await self.bot.scheduler.schedule_persistent("announcement", announcement_id, run_time)
+
+    async def _cancel_missed_announcements(self, jobs: list[ScheduledJob]) -> None:
+        if self.bot.announcement_repo is None:
+            return
+        await self.bot.announcement_repo.finish_many([int(job.key) for job in jobs], "cancelled")
 
     async def _ensure_repos(self, ctx: interactions.SlashContext) -> bool:
         if not ctx.guild:
@@ -46,20 +60,7 @@ class Announcements(interactions.Extension):
             return False
         return True
 
-    async def _fire_announcement(self, announcement_id: int) -> None:
-        if self.bot.announcement_repo is None:
-            return
-        announcement = await self.bot.announcement_repo.get(announcement_id)
-        if announcement is None or announcement.status != "pending":
-            return
-        guild = self.bot.get_guild(announcement.guild_id)
-        if guild is None:
-            await self.bot.announcement_repo.cancel(announcement_id)
-            return
-        channel = guild.get_channel(announcement.channel_id)
-        if not isinstance(channel, interactions.GuildText):
-            await self.bot.announcement_repo.cancel(announcement_id)
-            return
+    def _build_message(self, announcement: ScheduledAnnouncement) -> dict[str, Any]:
         content_parts: list[str] = []
         if announcement.mention_role_id:
             content_parts.append(f"<@&{announcement.mention_role_id}>")
@@ -76,22 +77,83 @@ class Announcements(interactions.Extension):
             if announcement.image_url:
                 embed.set_image(url=announcement.image_url)
         if announcement.mention_role_id:
-            allowed_mentions = discord.AllowedMentions(roles=[discord.Object(id=announcement.mention_role_id)], users=False, everyone=False)
+            allowed_mentions = interactions.AllowedMentions(roles=[announcement.mention_role_id])
         else:
-            allowed_mentions = discord.AllowedMentions.none()
-        try:
-            await channel.send(content=content, embed=embed, allowed_mentions=allowed_mentions)
-            await self.bot.announcement_repo.mark_sent(announcement_id)
-            if self.bot.audit_repo is not None:
-                await self.bot.audit_repo.add_entry(
-                    guild.id,
-                    action="announcement.sent",
-                    actor_id=announcement.author_id,
-                    target_id=announcement.channel_id,
-                    context=str(announcement.id),
+            allowed_mentions = interactions.AllowedMentions.none()
+        return {"content": content, "embed": embed, "allowed_mentions": allowed_mentions}
+
+    async def _fire_announcements(self, jobs: list[ScheduledJob]) -> None:
+        repo = self.bot.announcement_repo
+        if repo is None:
+            return
+        attempts = {int(job.key): int(job.payload.get("attempt", 0) or 0) for job in jobs}
+        announcements = await repo.get_many(list(attempts))
+        cancelled: list[int] = []
+        ready: list[tuple[ScheduledAnnouncement, interactions.GuildText]] = []
+        for announcement in announcements:
+            if announcement.status != "pending":
+                continue
+            guild = self.bot.get_guild(announcement.guild_id)
+            channel = guild.get_channel(announcement.channel_id) if guild is not None else None
+            if not isinstance(channel, interactions.GuildText):
+                cancelled.append(announcement.id)
+                continue
+            ready.append((announcement, channel))
+
+        async def _send(entry: tuple[ScheduledAnnouncement, interactions.GuildText]) -> None:
+            announcement, channel = entry
+            await channel.send(**self._build_message(announcement))
+
+        results = await self.bot.delivery.run(ready, _send, channel_of=lambda entry: entry[1].id)
+        sent = [result.item[0] for result in results if result.ok]
+        now = datetime.now(timezone.utc)
+        for result in results:
+            if result.ok:
+                continue
+            announcement = result.item[0]
+            if isinstance(result.error, (interactions.errors.Forbidden, interactions.errors.NotFound)):
+                cancelled.append(announcement.id)
+                continue
+            attempt = attempts.get(announcement.id, 0) + 1
+            if attempt >= ANNOUNCEMENT_MAX_ATTEMPTS or not self.bot.scheduler:
+                self._log.error(
+                    "Pengumuman %s gagal dikirim %s kali dan dibatalkan: %r",
+                    announcement.id,
+                    attempt,
+                    result.error,
                 )
-        except discord.Forbidden:
-            await self.bot.announcement_repo.cancel(announcement_id)
+                cancelled.append(announcement.id)
+                continue
+            delay = ANNOUNCEMENT_RETRY_SECONDS * (2 ** (attempt - 1))
+            self._log.warning(
+                "Pengumuman %s gagal dikirim (percobaan %s), dicoba lagi dalam %s detik: %r",
+                announcement.id,
+                attempt,
+                delay,
+                result.error,
+            )
+            await self.bot.scheduler.schedule_persistent(
+                "announcement",
+                announcement.id,
+                now + timedelta(seconds=delay),
+                {"attempt": attempt},
+            )
+
+        await repo.finish_many([announcement.id for announcement in sent], "sent")
+        await repo.finish_many(cancelled, "cancelled")
+        if self.bot.audit_repo is not None:
+            await self.bot.audit_repo.add_entries(
+                [
+                    (
+                        announcement.guild_id,
+                        "announcement.sent",
+                        announcement.author_id,
+                        announcement.channel_id,
+                        str(announcement.id),
+                    )
+                    for announcement in sent
+                ]
+            )
 
     @interactions.slash_command(name='schedule', description='Jadwalkan pengumuman otomatis.')
     @interactions.slash_option(
@@ -197,7 +259,7 @@ class Announcements(interactions.Extension):
             image_url=image_url,
             scheduled_at=utc_dt.isoformat(),
         )
-        self._schedule_announcement(announcement.id, utc_dt)
+        await self._schedule_announcement(announcement.id, utc_dt)
         if self.bot.audit_repo is not None:
             await self.bot.audit_repo.add_entry(
                 ctx.guild.id,
@@ -243,7 +305,7 @@ class Announcements(interactions.Extension):
             await ctx.send("Pengumuman tidak ditemukan atau sudah diproses.", ephemeral=True)
             return
         if self.bot.scheduler:
-            self.bot.scheduler.cancel(f"announcement-{pengumuman_id}")
+            await self.bot.scheduler.cancel_persistent(f"announcement-{pengumuman_id}")
         await ctx.send("Pengumuman dibatalkan.", ephemeral=True)
 
 
@@ -4,11 +4,13 @@ from typing import TYPE_CHECKING
 
 import interactions
 
-from bot.services.automod import AutomodEngine
+from bot.services.automod import MAX_REGEX_PATTERNS, AutomodEngine, compile_regex_patterns, find_unsafe_regex_patterns
 RULE_CHOICES: list[interactions.SlashCommandChoice] = [
     interactions.SlashCommandChoice(name="Filter Tautan", value="link_filter"),
     interactions.SlashCommandChoice(name="Batas Mention", value="mention_limit"),
     interactions.SlashCommandChoice(name="Huruf Kapital", value="caps"),
+    interactions.SlashCommandChoice(name="Paket Regex", value="regex_pack"),
+    interactions.SlashCommandChoice(name="Banjir Pesan Duplikat", value="duplicate_flood"),
 ]
 
 
@@ -176,6 +178,107 @@ class AutoMod(interactions.Extension):
             ephemeral=True,
         )
 
+    @interactions.slash_command(name='regex', description='Blokir pesan yang cocok dengan daftar pola regex.')
+    @interactions.slash_option(
+        name="pola",
+        description="Daftar pola regex (pisahkan dengan ';;')",
+        opt_type=interactions.OptionType.STRING,
+        required=True,
+    )
+    @interactions.slash_option(
+        name="aktif",
+        description="Apakah paket regex aktif",
+        opt_type=interactions.OptionType.BOOLEAN,
+        required=False,
+    )
+    async def regex(
+        self,
+        ctx: interactions.SlashContext,
+        pola: str,
+        aktif: bool = True,
+    ) -> None:
+        if not await self._ensure_repo(ctx):
+            return
+        assert ctx.guild is not None
+        patterns = [item.strip() for item in pola.split(";;") if item.strip()][:MAX_REGEX_PATTERNS]
+        valid = compile_regex_patterns(patterns)
+        if len(valid) != len(patterns):
+            await ctx.send("Sebagian pola regex tidak valid. Periksa kembali sintaksnya.", ephemeral=True)
+            return
+        unsafe = find_unsafe_regex_patterns(patterns)
+        if unsafe:
+            listed = ", ".join(f"`{item}`" for item in unsafe[:5])
+            await ctx.send(
+                f"Pola berikut berisiko lambat (kuantifier bersarang seperti `(a+)+`): {listed}. "
+                "Sederhanakan polanya terlebih dahulu.",
+                ephemeral=True,
+            )
+            return
+        payload = {"patterns": patterns}
+        await self.bot.automod_repo.set_rule(ctx.guild.id, "regex_pack", payload, is_active=aktif)
+        await self.bot.audit_repo.add_entry(
+            ctx.guild.id,
+            action="automod.regex",
+            actor_id=ctx.author.id,
+            context=f"{len(patterns)} pola",
+        )
+        self.bot.dispatch("automod_rules_updated", ctx.guild.id)
+        state = "aktif" if aktif else "nonaktif"
+        await ctx.send(f"Paket regex ({len(patterns)} pola) kini {state}.", ephemeral=True)
+
+    @interactions.slash_command(name='duplicateflood', description='Deteksi pesan serupa dari banyak akun (raid copy-paste).')
+    @interactions.slash_option(
+        name="jumlah_pengguna",
+        description="Jumlah akun berbeda yang memicu aturan (2-50)",
+        opt_type=interactions.OptionType.INTEGER,
+        min_value=2,
+        max_value=50,
+        required=True,
+    )
+    @interactions.slash_option(
+        name="jendela_detik",
+        description="Rentang waktu pengecekan dalam detik (5-600)",
+        opt_type=interactions.OptionType.INTEGER,
+        min_value=5,
+        max_value=600,
+        required=True,
+    )
+    @interactions.slash_option(
+        name="kemiripan",
+        description="Ambang kemiripan pesan (0.5-1.0)",
+        opt_type=interactions.OptionType.NUMBER,
+        min_value=0.5,
+        max_value=1.0,
+        required=False,
+    )
+    async def duplicateflood(
+        self,
+        ctx: interactions.SlashContext,
+        jumlah_pengguna: int,
+        jendela_detik: int,
+        kemiripan: float = 0.8,
+    ) -> None:
+        if not await self._ensure_repo(ctx):
+            return
+        assert ctx.guild is not None
+        payload = {
+            "min_users": int(jumlah_pengguna),
+            "window_seconds": int(jendela_detik),
+            "similarity": float(kemiripan),
+        }
+        await self.bot.automod_repo.set_rule(ctx.guild.id, "duplicate_flood", payload, is_active=True)
+        await self.bot.audit_repo.add_entry(
+            ctx.guild.id,
+            action="automod.duplicateflood",
+            actor_id=ctx.author.id,
+            context=str(payload),
+        )
+        self.bot.dispatch("automod_rules_updated", ctx.guild.id)
+        await ctx.send(
+            f"Deteksi banjir duplikat aktif: {int(jumlah_pengguna)} akun dalam {int(jendela_detik)} detik.",
+            ephemeral=True,
+        )
+
 
 def setup(bot: ForUS) -> None:
     AutoMod(bot)
@@ -13,8 +13,9 @@ if TYPE_CHECKING:
 DATA_DIR = Path(__file__).resolve().parents[2] / "bot" / "data"
 
 
-from bot.database.repositories import AutomodRule, LevelProgress
-from bot.services.automod import AutomodEngine
+from bot.database.repositories import LevelProgress
+from bot.services.automod import AutomodEngine, AutomodViolation, CompiledRuleSet
+from bot.services.message_pipeline import GuardAction, MessageContext
 from bot.services.cache import TTLCache
 
 
@@ -23,9 +24,32 @@ class Events(interactions.Extension):
         self.bot = bot
         self.banned_words = self._load_banned_words()
         self._recent_messages: dict[int, list[float]] = {}
-        self._automod_engine = AutomodEngine()
+        automod_config = getattr(getattr(bot, "config", None), "automod", None)
+        if automod_config is not None:
+            self._automod_engine = AutomodEngine(
+                heavy_workers=automod_config.heavy_workers,
+                heavy_deadline=automod_config.heavy_deadline_ms / 1000,
+                heavy_fallback=automod_config.heavy_fallback,
+            )
+        else:
+            self._automod_engine = AutomodEngine()
         self._automod_cache = TTLCache(ttl=30)
 
+        self._pipeline = getattr(bot, "message_pipeline", None)
+        if self._pipeline is not None:
+            self._pipeline.register_provider("automod_rules", self._provide_automod_rules)
+            self._pipeline.register_guard("banned_words", self._check_banned_words, priority=10)
+            self._pipeline.register_guard("spam", self._check_spam, priority=20)
+            self._pipeline.register_guard("automod", self._check_automod, priority=30)
+            self._pipeline.register_stage("level_xp", self._level_stage, skip_if_moderated=True)
+
+    def drop(self) -> None:
+        """Called when extension is unloaded"""
+        if self._pipeline is not None:
+            self._pipeline.unregister("banned_words", "spam", "automod", "level_xp")
+        self._automod_engine.close()
+        super().drop()
+
     def _load_banned_words(self) -> set[str]:
         file_path = DATA_DIR / "banned_words.txt"
         if not file_path.exists():
@@ -47,7 +71,7 @@ class Events(interactions.Extension):
                 if role:
                     try:
                         await member.add_roles(role, reason="Autorole sambutan")
-                    except discord.Forbidden:
+                    except interactions.errors.Forbidden:
                         pass
 
     @interactions.listen()
@@ -60,77 +84,93 @@ class Events(interactions.Extension):
             if isinstance(channel, interactions.GuildText):
                 await channel.send(f"Selamat tinggal {member.display_name}. Semoga kembali lagi!")
 
-    @interactions.listen()
-    async def on_message(self, message: discord.Message) -> None:
-        if message.guild is None or message.author.bot:
-            return
+    async def _check_banned_words(self, ctx: MessageContext) -> GuardAction | None:
+        if ctx.is_bot:
+            return None
+        message = ctx.message
         content = message.content.lower()
-        if any(bad_word in content for bad_word in self.banned_words):
+        if not any(bad_word in content for bad_word in self.banned_words):
+            return None
+
+        async def _action() -> None:
             try:
                 await message.delete()
-            except discord.Forbidden:
+            except interactions.errors.Forbidden:
                 pass
             await message.channel.send(
                 f"{message.author.mention}, kata yang kamu gunakan tidak diperbolehkan.",
                 delete_after=5,
             )
-            return
 
+        return _action
+
+    async def _check_spam(self, ctx: MessageContext) -> GuardAction | None:
+        if ctx.is_bot:
+            return None
+        message = ctx.message
         # Anti-spam sederhana: lebih dari 5 pesan dalam 10 detik
         history = self._recent_messages.setdefault(message.author.id, [])
         now = message.created_at.timestamp()
         history.append(now)
         history[:] = [timestamp for timestamp in history if now - timestamp < 10]
-        if len(history) > 5:
+        if len(history) <= 5:
+            return None
+
+        async def _action() -> None:
             try:
                 await message.channel.set_permissions(
                     message.author,
                     send_messages=False,
                     reason="Anti-spam otomatis",
                 )
-            except discord.Forbidden:
+            except interactions.errors.Forbidden:
                 pass
             await message.channel.send(
                 f"{message.author.mention} dibisukan sementara karena spam.",
                 delete_after=5,
             )
-            return
-
-        if await self._handle_automod(message):
-            return
 
-        await self._award_level_xp(message)
+        return _action
 
-    async def _handle_automod(self, message: discord.Message) -> bool:
-        if self.bot.automod_repo is None or message.guild is None:
-            return False
+    async def _check_automod(self, ctx: MessageContext) -> GuardAction | None:
+        if ctx.is_bot or self.bot.automod_repo is None:
+            return None
+        message = ctx.message
 
-        rules = await self._get_automod_rules(message.guild.id)
+        rules: CompiledRuleSet = await ctx.get("automod_rules")
         if not rules:
-            return False
+            return None
 
         mention_count = len(message.mentions) + len(message.role_mentions)
         if message.mention_everyone:
             mention_count += 1
 
-        violations = self._automod_engine.evaluate(
+        violations = await self._automod_engine.evaluate_async(
             content=message.content,
             mention_count=mention_count,
             rules=rules,
+            author_id=message.author.id,
+            timestamp=message.created_at.timestamp(),
         )
         if not violations:
-            return False
+            return None
 
-        violation = violations[0]
+        async def _action() -> None:
+            await self._handle_automod_violation(ctx, violations[0])
+
+        return _action
+
+    async def _handle_automod_violation(self, ctx: MessageContext, violation: AutomodViolation) -> None:
+        message = ctx.message
         try:
             await message.delete()
-        except discord.Forbidden:
+        except interactions.errors.Forbidden:
             pass
 
         warning_text = f"{message.author.mention}, pesanmu dihapus: {violation.reason}"
         await message.channel.send(warning_text, delete_after=6)
 
-        log_channel = await self._get_log_channel(message.guild)
+        log_channel = await ctx.log_channel()
         if log_channel:
             embed = interactions.Embed(
                 title="Automod",
@@ -148,40 +188,35 @@ class Events(interactions.Extension):
 
         if self.bot.audit_repo is not None:
             await self.bot.audit_repo.add_entry(
-                message.guild.id,
+                ctx.guild.id,
                 action="automod.violation",
                 actor_id=message.author.id,
                 target_id=message.channel.id,
                 context=violation.rule_type,
             )
 
-        return True
+    async def _provide_automod_rules(self, ctx: MessageContext) -> CompiledRuleSet:
+        return await self._get_automod_rules(ctx.guild.id)
 
-    async def _get_log_channel(self, guild: interactions.Guild) -> interactions.GuildText | None:
-        if self.bot.guild_repo is None:
-            return None
-        settings = await self.bot.guild_repo.get(guild.id)
-        if settings and settings.log_channel_id:
-            channel = guild.get_channel(settings.log_channel_id)
-            if isinstance(channel, interactions.GuildText):
-                return channel
-        return None
+    async def _level_stage(self, ctx: MessageContext) -> None:
+        if ctx.is_bot:
+            return
+        await self._award_level_xp(ctx.message)
 
-    async def _get_automod_rules(self, guild_id: int) -> list[AutomodRule]:
+    async def _get_automod_rules(self, guild_id: int) -> CompiledRuleSet:
         cache_key = f"automod:{guild_id}"
 
         repo = self.bot.automod_repo
         if repo is None:
-            return []
+            return CompiledRuleSet()
 
-        async def _loader():
+        async def _loader() -> CompiledRuleSet:
             data = await repo.list_rules(guild_id)
-            return tuple(data)
+            return self._automod_engine.compile(data)
 
-        cached = await self._automod_cache.get_or_set(cache_key, _loader)
-        return list(cached)
+        return await self._automod_cache.get_or_set(cache_key, _loader)
 
-    async def _award_level_xp(self, message: discord.Message) -> None:
+    async def _award_level_xp(self, message: interactions.Message) -> None:
         if self.bot.level_repo is None or message.guild is None:
             return
         if len(message.content.strip()) < 3:
@@ -191,7 +226,7 @@ class Events(interactions.Extension):
         if progress.leveled_up:
             await self._handle_level_up(message, progress)
 
-    async def _handle_level_up(self, message: discord.Message, progress: LevelProgress) -> None:
+    async def _handle_level_up(self, message: interactions.Message, progress: LevelProgress) -> None:
         guild = message.guild
         if guild is None:
             return
@@ -216,7 +251,7 @@ class Events(interactions.Extension):
         if role and isinstance(message.author, interactions.Member) and role not in message.author.roles:
             try:
                 await message.author.add_roles(role, reason="Hadiah level")
-            except discord.Forbidden:
+            except interactions.errors.Forbidden:
                 pass
 
     @interactions.listen()
@@ -1,44 +1,77 @@
 from __future__ import annotations
 
-import asyncio
 import random
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-import aiohttp
 import interactions
 
 from bot.services.cache import TTLCache
+from bot.services.content_pool import ContentPool
 
 if TYPE_CHECKING:
     from bot.main import ForUS
 
 
+CONTENT_POOL_SIZE = 20
+
+
 class Fun(interactions.Extension):
     def __init__(self, bot: ForUS) -> None:
         self.bot = bot
-        self.session = aiohttp.ClientSession()
         self.cache = TTLCache(ttl=120)
+        # Jeda minimum mengikuti batas upstream: zenquotes 5 req/30 detik,
+        # jokeapi 120 req/menit, meme-api tanpa batas resmi.
+        self.pools = {
+            "meme": ContentPool("meme", self._fetch_memes, capacity=CONTENT_POOL_SIZE, min_interval=3.0),
+            "quote": ContentPool("quote", self._fetch_quotes, capacity=CONTENT_POOL_SIZE, min_interval=10.0),
+            "joke": ContentPool("joke", self._fetch_jokes, capacity=CONTENT_POOL_SIZE, min_interval=2.0),
+        }
 
     def drop(self) -> None:
-        """Called when extension is unloaded"""
-        asyncio.create_task(self.session.close())
+        for pool in self.pools.values():
+            pool.stop()
+        super().drop()
 
-    async def _fetch_json(self, url: str) -> object:
-        async def _request() -> object:
-            async with self.session.get(url, timeout=10) as resp:
-                resp.raise_for_status()
-                return await resp.json()
+    @interactions.listen()
+    async def on_startup(self) -> None:
+        for pool in self.pools.values():
+            pool.start()
 
+    async def _fetch_json(self, url: str) -> object:
         cached = await self.cache.get(url)
         if cached:
             return cached  # type: ignore[return-value]
-        data = await _request()
+        data = await self.bot.http_client.get_json(url)
         await self.cache.set(url, data)
         return data
 
+    async def _fetch_memes(self) -> list[Any]:
+        data = await self.bot.http_client.get_json("https://meme-api.com/gimme/10")
+        memes = data.get("memes") if isinstance(data, dict) else None
+        return [meme for meme in memes or [] if isinstance(meme, dict) and not meme.get("nsfw")]
+
+    async def _fetch_quotes(self) -> list[Any]:
+        data = await self.bot.http_client.get_json("https://zenquotes.io/api/quotes")
+        return [item for item in data if isinstance(item, dict) and item.get("q")] if isinstance(data, list) else []
+
+    async def _fetch_jokes(self) -> list[Any]:
+        data = await self.bot.http_client.get_json("https://v2.jokeapi.dev/joke/Any?lang=en&amount=10")
+        jokes = data.get("jokes") if isinstance(data, dict) else None
+        return [joke for joke in jokes or [] if isinstance(joke, dict)]
+
+    async def _next_item(self, kind: str, fallback_url: str) -> Any:
+        pool = self.pools[kind]
+        # Extension yang dimuat ulang setelah startup belum punya task pengisi.
+        pool.start()
+        item = pool.take()
+        if item is not None:
+            return item
+        # Pool masih kosong (baru start atau upstream gangguan): ambil langsung.
+        return await self._fetch_json(fallback_url)
+
     @interactions.slash_command(name="meme", description="Menampilkan meme acak.")
     async def meme(self, ctx: interactions.SlashContext) -> None:
-        data = await self._fetch_json("https://meme-api.com/gimme")
+        data = await self._next_item("meme", "https://meme-api.com/gimme")
         embed = interactions.Embed(title=data.get("title", "Meme"), color=interactions.Color.random())
         if "url" in data:
             embed.set_image(url=str(data["url"]))
@@ -47,11 +80,12 @@ class Fun(interactions.Extension):
 
     @interactions.slash_command(name="quote", description="Kutipan motivasi acak.")
     async def quote(self, ctx: interactions.SlashContext) -> None:
-        data = await self._fetch_json("https://zenquotes.io/api/random")
+        data = await self._next_item("quote", "https://zenquotes.io/api/random")
         if isinstance(data, list) and data:
-            quote_data = data[0]
-            quote = quote_data.get("q", "Tetap semangat!")
-            author = quote_data.get("a", "Anonim")
+            data = data[0]
+        if isinstance(data, dict):
+            quote = data.get("q", "Tetap semangat!")
+            author = data.get("a", "Anonim")
         else:
             quote = "Teruslah melangkah meski perlahan."
             author = "Anonim"
@@ -59,7 +93,7 @@ class Fun(interactions.Extension):
 
     @interactions.slash_command(name="joke", description="Lelucon acak.")
     async def joke(self, ctx: interactions.SlashContext) -> None:
-        data = await self._fetch_json("https://v2.jokeapi.dev/joke/Any?lang=en")
+        data = await self._next_item("joke", "https://v2.jokeapi.dev/joke/Any?lang=en")
         if data.get("type") == "single":
             text = data.get("joke", "Saya tidak punya lelucon kali ini.")
         else:
@@ -1,58 +1,112 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 import interactions
 
+from bot.database.repositories import ScheduledJob
+from bot.services.logging import get_logger
+
 if TYPE_CHECKING:
     from bot.main import ForUS
 
+# Pengingat yang terlambat lebih dari ini (mis. bot mati lama) dibuang, bukan dikirim.
+REMINDER_MISFIRE_GRACE_SECONDS = 15 * 60
+# Pengiriman yang gagal (mis. error HTTP Discord) dijadwalkan ulang dengan backoff
+# eksponensial; setelah percobaan habis pengingat dibuang dan dicatat di log.
+REMINDER_RETRY_SECONDS = 60
+REMINDER_MAX_ATTEMPTS = 4
+
 
 class Reminders(interactions.Extension):
     # MANUAL REVIEW: GroupCog -> Extension with slash_command group
     def __init__(self, bot: ForUS) -> None:
         super().__init__()
         self.bot = bot
+        self._log = get_logger("Reminders")
 
     async def cog_load(self) -> None:
-        if self.bot.reminder_repo is None:
+        # Jadwal pengingat tersimpan di tabel job persisten; cukup daftarkan handler.
+        if self.bot.reminder_repo is None or not self.bot.scheduler:
             return
-        reminders = await self.bot.reminder_repo.all_pending()
-        for reminder in reminders:
-            remind_at = datetime.fromisoformat(reminder["remind_at"])
-            if remind_at < datetime.now(timezone.utc):
-                await self.bot.reminder_repo.delete(reminder["id"])
-                continue
-            await self._schedule_reminder(reminder["id"], remind_at)
+        self.bot.scheduler.register_job_type(
+            "reminder",
+            self._fire_reminders,
+            misfire_grace_time=REMINDER_MISFIRE_GRACE_SECONDS,
+            coalesce=True,
+            on_misfire=self._drop_reminders,
+        )
 
     async def _schedule_reminder(self, reminder_id: int, remind_at: datetime) -> None:
         if not self.bot.scheduler:
             return
-        if not self.bot.scheduler.has_job(f"reminder-{reminder_id}"):
-            self.bot.scheduler.schedule_reminder(reminder_id, remind_at, self._fire_reminder)
+        await self.bot.scheduler.schedule_persistent("reminder", reminder_id, remind_at)
 
-    async def _fire_reminder(self, reminder_id: int) -> None:
+    async def _fire_reminders(self, jobs: list[ScheduledJob]) -> None:
         if self.bot.reminder_repo is None:
             return
-        reminders = await self.bot.reminder_repo.due_reminders(datetime.now(timezone.utc).isoformat())
-        for reminder in reminders:
-            if reminder["id"] != reminder_id:
+        # Satu query untuk semua pengingat yang jatuh tempo pada tick yang sama.
+        attempts = {int(job.key): int(job.payload.get("attempt", 0) or 0) for job in jobs}
+        reminders = await self.bot.reminder_repo.get_many(list(attempts))
+        results = await self.bot.delivery.run(
+            reminders,
+            self._deliver_reminder,
+            channel_of=lambda reminder: reminder.get("channel_id") or f"dm-{reminder['user_id']}",
+        )
+        finished = [int(result.item["id"]) for result in results if result.ok]
+        now = datetime.now(timezone.utc)
+        for result in results:
+            if result.ok:
                 continue
-            guild = self.bot.get_guild(reminder["guild_id"])
-            if not guild:
+            reminder_id = int(result.item["id"])
+            attempt = attempts.get(reminder_id, 0) + 1
+            if attempt >= REMINDER_MAX_ATTEMPTS:
+                self._log.error(
+                    "Pengingat %s gagal dikirim %s kali dan dibuang: %r",
+                    reminder_id,
+                    attempt,
+                    result.error,
+                )
+                finished.append(reminder_id)
                 continue
-            channel = guild.get_channel(reminder["channel_id"]) if reminder.get("channel_id") else None
-            if channel and isinstance(channel, interactions.GuildText):
-                await channel.send(f"<@{reminder['user_id']}> Pengingat: {reminder['message']}")
-            else:
-                member = guild.get_member(reminder["user_id"])
-                if member:
-                    try:
-                        await member.send(f"Pengingat dari {guild.name}: {reminder['message']}")
-                    except discord.Forbidden:
-                        pass
-            await self.bot.reminder_repo.delete(reminder_id)
+            delay = REMINDER_RETRY_SECONDS * (2 ** (attempt - 1))
+            self._log.warning(
+                "Pengingat %s gagal dikirim (percobaan %s), dicoba lagi dalam %s detik: %r",
+                reminder_id,
+                attempt,
+                delay,
+                result.error,
+            )
+            if self.bot.scheduler:
+                await self.bot.scheduler.schedule_persistent(
+                    "reminder",
+                    reminder_id,
+                    now + timedelta(seconds=delay),
+                    {"attempt": attempt},
+                )
+        # Hanya pengingat yang terkirim (atau menyerah) yang dihapus.
+        await self.bot.reminder_repo.delete_many(finished)
+
+    async def _drop_reminders(self, jobs: list[ScheduledJob]) -> None:
+        if self.bot.reminder_repo is None:
+            return
+        await self.bot.reminder_repo.delete_many([int(job.key) for job in jobs])
+
+    async def _deliver_reminder(self, reminder: dict[str, Any]) -> None:
+        guild = self.bot.get_guild(reminder["guild_id"])
+        if not guild:
+            return
+        channel = guild.get_channel(reminder["channel_id"]) if reminder.get("channel_id") else None
+        if channel and isinstance(channel, interactions.GuildText):
+            await channel.send(f"<@{reminder['user_id']}> Pengingat: {reminder['message']}")
+        else:
+            member = guild.get_member(reminder["user_id"])
+            if member:
+                try:
+                    await member.send(f"Pengingat dari {guild.name}: {reminder['message']}")
+                except interactions.errors.Forbidden:
+                    pass
 
     @interactions.slash_command(name='create', description='Buat pengingat baru dengan durasi tertentu.')
     @interactions.slash_option(
@@ -124,6 +178,8 @@ class Reminders(interactions.Extension):
             await ctx.send("Repositori belum siap atau bukan dalam server.", ephemeral=True)
             return
         await self.bot.reminder_repo.delete(reminder_id)
+        if self.bot.scheduler:
+            await self.bot.scheduler.cancel_persistent(f"reminder-{reminder_id}")
         await ctx.send(f"Pengingat dengan ID {reminder_id} dihapus.", ephemeral=True)
 
 
@@ -3,15 +3,23 @@ from __future__ import annotations
 import calendar
 import platform
 import time
-from datetime import date, datetime, timezone as dt_timezone
+from datetime import date, datetime, timedelta, timezone as dt_timezone
 from typing import TYPE_CHECKING, Any
 from urllib.parse import quote_plus
 from zoneinfo import ZoneInfo
 
-import aiohttp
 import interactions
 
 from bot.services.cache import TTLCache
+from bot.services.http import CircuitOpenError, HTTPRequestError
+from bot.services.location_index import LocationEntry, PrayerLocationCatalog
+from bot.services.prayer_prefetch import PrayerPrefetcher
+from bot.services.prayer_schedule import (
+    MonthSchedule,
+    compact_indonesia_month,
+    compact_malaysia_month,
+    indonesian_date_label,
+)
 from bot.services.utility_tools import (
     discord_timestamp_variants,
     format_timezone_display,
@@ -26,6 +34,8 @@ if TYPE_CHECKING:
 
 
 PRAYER_CACHE_TTL = 60 * 60 * 6
+PRAYER_PREFETCH_INTERVAL = 60 * 15
+LOCATION_INDEX_REFRESH_INTERVAL = 60 * 60 * 24
 LOOKUP_CACHE_TTL = 60 * 60 * 12
 INDONESIA_TIMEZONE = ZoneInfo("Asia/Jakarta")
 MALAYSIA_TIMEZONE = ZoneInfo("Asia/Kuala_Lumpur")
@@ -40,17 +50,60 @@ class PrayerAPIError(RuntimeError):
     """Kesalahan umum ketika mengambil data jadwal sholat."""
 
 
+def _indonesia_location_entry(item: dict[str, Any]) -> LocationEntry | None:
+    location_id = item.get("id")
+    if location_id is None:
+        return None
+    return LocationEntry(location_id=str(location_id), label=str(item.get("lokasi", "")), payload=item)
+
+
+def _malaysia_zone_entry(zone: dict[str, Any]) -> LocationEntry | None:
+    code = zone.get("jakimCode")
+    if not code:
+        return None
+    label = " ".join(str(zone.get(key, "")) for key in ("negeri", "daerah"))
+    return LocationEntry(location_id=str(code), label=label.strip(), payload=zone)
+
+
 class Utility(interactions.Extension):
     def __init__(self, bot: ForUS) -> None:
         self.bot = bot
         self.launch_time = time.time()
-        self.session = aiohttp.ClientSession()
         self.prayer_cache = TTLCache(ttl=PRAYER_CACHE_TTL)
         self.lookup_cache = TTLCache(ttl=LOOKUP_CACHE_TTL)
+        self.prayer_prefetcher = PrayerPrefetcher(
+            self.prayer_cache,
+            self._refresh_prayer_month,
+            self._prayer_cache_key,
+            timezones={"indonesia": INDONESIA_TIMEZONE, "malaysia": MALAYSIA_TIMEZONE},
+        )
+        self.location_catalog = PrayerLocationCatalog(
+            getattr(bot, "prayer_location_repo", None),
+            loaders={"indonesia": self._load_indonesia_locations, "malaysia": self._load_malaysia_zones},
+            builders={"indonesia": _indonesia_location_entry, "malaysia": _malaysia_zone_entry},
+        )
+        scheduler = getattr(bot, "scheduler", None)
+        if scheduler is not None:
+            scheduler.schedule_interval(
+                "maintenance-prayer-prefetch",
+                PRAYER_PREFETCH_INTERVAL,
+                self.prayer_prefetcher.run_once,
+                jitter=60,
+            )
+            scheduler.schedule_interval(
+                "maintenance-location-index",
+                LOCATION_INDEX_REFRESH_INTERVAL,
+                self.location_catalog.refresh_all,
+                jitter=600,
+                first_run=datetime.now(dt_timezone.utc) + timedelta(seconds=30),
+            )
 
     def drop(self) -> None:
-        import asyncio
-        asyncio.create_task(self.session.close())
+        scheduler = getattr(self.bot, "scheduler", None)
+        if scheduler is not None:
+            scheduler.cancel("maintenance-prayer-prefetch")
+            scheduler.cancel("maintenance-location-index")
+        super().drop()
 
     async def _get_default_timezone(self, guild: interactions.Guild | None) -> str:
         if guild and self.bot.guild_repo is not None:
@@ -388,7 +441,8 @@ class Utility(interactions.Extension):
         if guild is None:
             await ctx.send("Perintah ini hanya dapat digunakan dalam server.", ephemeral=True)
             return
-        stats = gather_guild_statistics(guild)
+        registry = getattr(self.bot, "stats", None)
+        stats = (registry.guild(guild.id) if registry is not None else None) or gather_guild_statistics(guild)
         embed = interactions.Embed(title=guild.name, color=interactions.Color.from_hex("#F1C40F"))
         if guild.description:
             embed.description = self._limit_text(guild.description, 350)
@@ -590,9 +644,11 @@ class Utility(interactions.Extension):
 
         scheduler_jobs = 0
         job_list: list[str] = []
+        job_metrics: dict[str, dict[str, Any]] = {}
         if self.bot.scheduler:
             scheduler_jobs = self.bot.scheduler.job_count()
             job_list = self.bot.scheduler.list_jobs()
+            job_metrics = self.bot.scheduler.metrics_summary()
 
         resource_stats = process_resource_snapshot()
         command_count = len(self.bot.tree.get_commands())
@@ -610,9 +666,27 @@ class Utility(interactions.Extension):
         embed.add_field(name="Tugas terjadwal", value=str(scheduler_jobs), inline=True)
         embed.add_field(name="Uptime", value=f"{uptime_text} (Sejak {format_dt(started_at, style='R')})", inline=False)
 
-        memory_mb = resource_stats.get("memory_mb")
+        sampler = getattr(self.bot, "resource_sampler", None)
+        trend = sampler.summary() if sampler is not None else {}
+        memory_mb = trend.get("rss_mb") or resource_stats.get("memory_mb")
         if memory_mb is not None:
-            embed.add_field(name="Memori proses", value=f"{memory_mb:.1f} MB", inline=True)
+            memory_text = f"{memory_mb:.1f} MB"
+            if trend.get("rss_delta_mb") is not None and trend["samples"] > 1:
+                window_minutes = trend["window_seconds"] / 60
+                memory_text += f" ({trend['rss_delta_mb']:+.1f} MB / {window_minutes:.0f} menit)"
+            embed.add_field(name="Memori proses", value=memory_text, inline=True)
+        if trend:
+            cpu_avg = trend.get("cpu_percent_avg")
+            if cpu_avg is not None:
+                embed.add_field(name="CPU rata-rata", value=f"{cpu_avg:.1f}%", inline=True)
+            runtime_lines = [
+                f"Task asyncio: {trend['tasks']}",
+                f"Thread: {trend['threads']}",
+            ]
+            if trend.get("open_fds") is not None:
+                runtime_lines.append(f"File descriptor: {trend['open_fds']}")
+            runtime_lines.append(f"GC: {trend['gc_collections']}x, jeda {trend['gc_pause_ms']:.0f} ms")
+            embed.add_field(name="Runtime", value="\n".join(runtime_lines), inline=True)
 
         load_average = resource_stats.get("load_average")
         if isinstance(load_average, tuple) and any(value is not None for value in load_average):
@@ -622,10 +696,44 @@ class Utility(interactions.Extension):
             )
             embed.add_field(name="Load Average (1m/5m/15m)", value=formatted, inline=True)
 
+        loop_monitor = getattr(self.bot, "loop_monitor", None)
+        if loop_monitor is not None and loop_monitor.lag.count:
+            loop_stats = loop_monitor.summary()
+            loop_text = (
+                f"p50 {loop_stats['p50'] * 1000:.1f} ms · p95 {loop_stats['p95'] * 1000:.1f} ms · "
+                f"p99 {loop_stats['p99'] * 1000:.1f} ms · maks {loop_stats['max'] * 1000:.0f} ms\n"
+                f"Callback lambat: {loop_stats['slow_callbacks']}"
+            )
+            if loop_stats["last_slow"]:
+                loop_text += f" (terakhir: `{loop_stats['last_slow']}`)"
+            embed.add_field(name="Lag event loop", value=self._limit_text(loop_text, 1024), inline=False)
+
         if job_list:
             preview = ", ".join(job_list[:5])
             embed.add_field(name="ID job aktif", value=self._limit_text(preview, 200), inline=False)
 
+        if job_metrics:
+            lines = [
+                f"`{kind}`: lag p95 {metrics['lag']['p95'] * 1000:.0f} ms · "
+                f"durasi p95 {metrics['runtime']['p95'] * 1000:.0f} ms · "
+                f"{metrics['runs']} jalan, {metrics['failures']} gagal, {metrics['misfires']} terlewat"
+                for kind, metrics in job_metrics.items()
+            ]
+            embed.add_field(name="Metrik job terjadwal", value=self._limit_text("\n".join(lines), 1024), inline=False)
+
+        coalesced = {
+            **self.prayer_cache.flights.stats(),
+            **self.lookup_cache.flights.stats(),
+        }
+        busiest = sorted(
+            ((key, counts) for key, counts in coalesced.items() if counts["coalesced"]),
+            key=lambda item: item[1]["coalesced"],
+            reverse=True,
+        )[:5]
+        if busiest:
+            lines = [f"`{key}`: {counts['coalesced']}/{counts['calls']} digabung" for key, counts in busiest]
+            embed.add_field(name="Permintaan API digabung", value=self._limit_text("\n".join(lines), 1024), inline=False)
+
         embed.set_footer(text="Gunakan /help untuk melihat seluruh kemampuan bot.")
         await ctx.send(embed=embed, ephemeral=True)
 
@@ -687,13 +795,13 @@ class Utility(interactions.Extension):
 
         try:
             if negara == "indonesia":
-                month_payload = await self._fetch_month_indonesia(lokasi, target_date.year, target_date.month)
-                day_payload = self._extract_indonesia_day(month_payload, target_date)
-                embed = self._build_embed_indonesia(lokasi, month_payload, day_payload)
+                schedule = await self._fetch_month_indonesia(lokasi, target_date.year, target_date.month)
+                day_times = self._extract_indonesia_day(schedule, target_date)
+                embed = self._build_embed_indonesia(lokasi, target_date, schedule, day_times)
             else:
-                month_payload = await self._fetch_month_malaysia(lokasi, target_date.year, target_date.month)
-                day_payload = self._extract_malaysia_day(month_payload, target_date)
-                embed = self._build_embed_malaysia(lokasi, target_date, month_payload, day_payload)
+                schedule = await self._fetch_month_malaysia(lokasi, target_date.year, target_date.month)
+                day_times = self._extract_malaysia_day(schedule, target_date)
+                embed = self._build_embed_malaysia(lokasi, target_date, schedule, day_times)
         except PrayerAPIError as exc:
             await ctx.send(str(exc), ephemeral=True)
             return
@@ -705,6 +813,7 @@ class Utility(interactions.Extension):
             await ctx.send(message, ephemeral=True)
             return
 
+        self.prayer_prefetcher.record(negara, lokasi)
         await ctx.send(embed=embed)
 
     @jadwalsholat.autocomplete("lokasi")
@@ -769,10 +878,20 @@ class Utility(interactions.Extension):
             raise PrayerAPIError(f"Tanggal harus di antara 1-{max_day} untuk bulan tersebut.")
         return date(year, month, day)
 
-    async def _fetch_month_indonesia(self, kota_id: str, year: int, month: int) -> dict[str, Any]:
-        cache_key = f"id:{kota_id}:{year}:{month:02d}"
+    @staticmethod
+    def _prayer_cache_key(negara: str, lokasi: str, year: int, month: int) -> str:
+        prefix = "id" if negara == "indonesia" else "my"
+        return f"{prefix}:{lokasi}:{year}:{month:02d}"
+
+    async def _refresh_prayer_month(self, negara: str, lokasi: str, year: int, month: int) -> MonthSchedule:
+        if negara == "indonesia":
+            return await self._fetch_month_indonesia(lokasi, year, month, refresh=True)
+        return await self._fetch_month_malaysia(lokasi, year, month, refresh=True)
+
+    async def _fetch_month_indonesia(self, kota_id: str, year: int, month: int, *, refresh: bool = False) -> MonthSchedule:
+        cache_key = self._prayer_cache_key("indonesia", kota_id, year, month)
 
-        async def _factory() -> dict[str, Any]:
+        async def _factory() -> MonthSchedule:
             url = f"https://api.myquran.com/v2/sholat/jadwal/{kota_id}/{year}/{month:02d}"
             payload = await self._request_json(url)
             if not payload.get("status"):
@@ -781,30 +900,52 @@ class Utility(interactions.Extension):
             data = payload.get("data")
             if not data or "jadwal" not in data:
                 raise PrayerAPIError("Data jadwal Indonesia tidak ditemukan.")
-            return data
+            return compact_indonesia_month(data, year, month)
 
+        if refresh:
+            return await self.prayer_cache.refresh(cache_key, _factory)
         return await self.prayer_cache.get_or_set(cache_key, _factory)
 
-    async def _fetch_month_malaysia(self, zone_code: str, year: int, month: int) -> dict[str, Any]:
-        cache_key = f"my:{zone_code}:{year}:{month:02d}"
+    async def _fetch_month_malaysia(self, zone_code: str, year: int, month: int, *, refresh: bool = False) -> MonthSchedule:
+        cache_key = self._prayer_cache_key("malaysia", zone_code, year, month)
 
-        async def _factory() -> dict[str, Any]:
+        async def _factory() -> MonthSchedule:
             url = f"https://api.waktusolat.app/v2/solat/{zone_code}?year={year}&month={month}"
             payload = await self._request_json(url)
             if "prayers" not in payload:
                 raise PrayerAPIError("Data jadwal Malaysia tidak ditemukan.")
             zone_detail = await self._get_malaysia_zone_detail(zone_code)
-            if zone_detail:
-                payload["zone_detail"] = zone_detail
-            return payload
+            return compact_malaysia_month(payload, year, month, MALAYSIA_TIMEZONE, zone_detail=zone_detail)
 
+        if refresh:
+            return await self.prayer_cache.refresh(cache_key, _factory)
         return await self.prayer_cache.get_or_set(cache_key, _factory)
 
+    async def _load_indonesia_locations(self) -> list[dict[str, Any]]:
+        payload = await self._request_json("https://api.myquran.com/v2/sholat/kota/semua")
+        if not payload.get("status", True):
+            message = payload.get("message", "Permintaan tidak berhasil.")
+            raise PrayerAPIError(f"API MyQuran: {message}")
+        data = payload.get("data") or []
+        if not isinstance(data, list):
+            raise PrayerAPIError("Data kota Indonesia tidak valid.")
+        return data
+
+    async def _load_malaysia_zones(self) -> list[dict[str, Any]]:
+        payload = await self._request_json("https://api.waktusolat.app/zones")
+        if not isinstance(payload, list):
+            raise PrayerAPIError("Data zona Malaysia tidak valid.")
+        return payload
+
     async def _search_indonesia_locations(self, keyword: str) -> list[dict[str, Any]]:
         normalized = keyword.strip()
         if len(normalized) < 2:
             return []
 
+        local_results = await self.location_catalog.search("indonesia", normalized)
+        if local_results is not None:
+            return local_results
+
         cache_key = f"lookup:id:{normalized.lower()}"
 
         async def _factory() -> list[dict[str, Any]]:
@@ -826,6 +967,9 @@ class Utility(interactions.Extension):
         normalized = keyword.strip()
         if len(normalized) < 2:
             return []
+        local_results = await self.location_catalog.search("malaysia", normalized)
+        if local_results is not None:
+            return local_results
         zones = await self._get_malaysia_zones()
         keyword_lower = normalized.lower()
         filtered: list[dict[str, Any]] = []
@@ -838,14 +982,7 @@ class Utility(interactions.Extension):
         return filtered
 
     async def _get_malaysia_zones(self) -> list[dict[str, Any]]:
-
-        async def _factory() -> list[dict[str, Any]]:
-            payload = await self._request_json("https://api.waktusolat.app/zones")
-            if not isinstance(payload, list):
-                raise PrayerAPIError("Data zona Malaysia tidak valid.")
-            return payload
-
-        zones = await self.lookup_cache.get_or_set("lookup:my:zones", _factory)
+        zones = await self.lookup_cache.get_or_set("lookup:my:zones", self._load_malaysia_zones)
         return list(zones)
 
     async def _get_malaysia_zone_detail(self, zone_code: str) -> dict[str, Any] | None:
@@ -901,38 +1038,39 @@ class Utility(interactions.Extension):
 
     async def _request_json(self, url: str) -> Any:
         try:
-            async with self.session.get(url, timeout=15) as response:
-                if response.status >= 400:
-                    raise PrayerAPIError(f"Permintaan ke API gagal dengan status {response.status}.")
-                return await response.json()
-        except aiohttp.ClientError as exc:  # noqa: PERF203
+            return await self.bot.http_client.get_json(url)
+        except CircuitOpenError as exc:
+            raise PrayerAPIError("Layanan jadwal sholat sedang gangguan, coba lagi beberapa saat lagi.") from exc
+        except HTTPRequestError as exc:
+            if exc.status is not None:
+                raise PrayerAPIError(f"Permintaan ke API gagal dengan status {exc.status}.") from exc
             raise PrayerAPIError("Tidak dapat terhubung ke layanan jadwal sholat.") from exc
 
-    def _extract_indonesia_day(self, payload: dict[str, Any], target_date: date) -> dict[str, Any]:
-        for item in payload.get("jadwal", []):
-            if item.get("date") == target_date.isoformat():
-                return item
-        raise PrayerAPIError("Jadwal untuk tanggal tersebut tidak tersedia pada API MyQuran.")
+    def _extract_indonesia_day(self, schedule: MonthSchedule, target_date: date) -> dict[str, str]:
+        day_times = schedule.day(target_date.day)
+        if day_times is None:
+            raise PrayerAPIError("Jadwal untuk tanggal tersebut tidak tersedia pada API MyQuran.")
+        return day_times
 
-    def _extract_malaysia_day(self, payload: dict[str, Any], target_date: date) -> dict[str, Any]:
-        day_number = target_date.day
-        for item in payload.get("prayers", []):
-            if item.get("day") == day_number:
-                return item
-        raise PrayerAPIError("Jadwal untuk tanggal tersebut tidak tersedia pada API WaktuSolat.")
+    def _extract_malaysia_day(self, schedule: MonthSchedule, target_date: date) -> dict[str, str]:
+        day_times = schedule.day(target_date.day)
+        if day_times is None:
+            raise PrayerAPIError("Jadwal untuk tanggal tersebut tidak tersedia pada API WaktuSolat.")
+        return day_times
 
     def _build_embed_indonesia(
         self,
         kota_id: str,
-        month_payload: dict[str, Any],
-        day_payload: dict[str, Any],
+        target_date: date,
+        schedule: MonthSchedule,
+        day_times: dict[str, str],
     ) -> interactions.Embed:
-        lokasi = month_payload.get("lokasi", kota_id)
-        daerah = month_payload.get("daerah")
-        judul = f"Jadwal Sholat • {lokasi.title() if isinstance(lokasi, str) else lokasi}"
-        deskripsi = day_payload.get("tanggal") or day_payload.get("date") or ""
+        lokasi = schedule.label or kota_id
+        daerah = schedule.region
+        judul = f"Jadwal Sholat • {lokasi.title()}"
+        deskripsi = indonesian_date_label(target_date)
         if daerah:
-            deskripsi += f"\n{daerah.title() if isinstance(daerah, str) else daerah}"
+            deskripsi += f"\n{daerah.title()}"
 
         embed = interactions.Embed(title=judul, description=deskripsi.strip(), color=interactions.Color.from_hex("#1ABC9C"))
         for nama, key in [
@@ -945,7 +1083,7 @@ class Utility(interactions.Extension):
             ("Maghrib", "maghrib"),
             ("Isya", "isya"),
         ]:
-            value = day_payload.get(key)
+            value = day_times.get(key)
             if value:
                 embed.add_field(name=nama, value=value, inline=True)
 
@@ -956,21 +1094,11 @@ class Utility(interactions.Extension):
         self,
         zone_code: str,
         target_date: date,
-        month_payload: dict[str, Any],
-        day_payload: dict[str, Any],
+        schedule: MonthSchedule,
+        day_times: dict[str, str],
     ) -> interactions.Embed:
-        zone_detail = month_payload.get("zone_detail")
-        readable_label = None
-        daerah = None
-        if isinstance(zone_detail, dict):
-            negeri = str(zone_detail.get("negeri", "")).strip()
-            daerah = str(zone_detail.get("daerah", "")).strip() or None
-            parts = [part for part in [negeri] if part]
-            if parts:
-                readable_label = parts[0]
-
-        if not readable_label:
-            readable_label = str(month_payload.get("zone", zone_code))
+        readable_label = schedule.label or zone_code
+        daerah = schedule.region
 
         judul = f"Jadwal Solat • {readable_label}"
 
@@ -980,14 +1108,11 @@ class Utility(interactions.Extension):
         deskripsi = "\n".join(deskripsi_lines)
         embed = interactions.Embed(title=judul, description=deskripsi, color=interactions.Color.from_hex("#2ECC71"))
 
-        tz = MALAYSIA_TIMEZONE
-
-        def format_epoch(key: str) -> str:
-            raw = day_payload.get(key)
-            if raw is None:
+        def format_time(key: str) -> str:
+            value = day_times.get(key)
+            if value is None:
                 raise PrayerAPIError("Data waktu solat tidak valid.")
-            dt = datetime.fromtimestamp(raw, tz)
-            return dt.strftime("%H:%M")
+            return value
 
         label_map = [
             ("Subuh", "fajr"),
@@ -999,9 +1124,9 @@ class Utility(interactions.Extension):
         ]
 
         for label, key in label_map:
-            embed.add_field(name=label, value=format_epoch(key), inline=True)
+            embed.add_field(name=label, value=format_time(key), inline=True)
 
-        hijri = day_payload.get("hijri")
+        hijri = schedule.note(target_date.day)
         if hijri:
             embed.add_field(name="Tanggal Hijriah", value=hijri, inline=False)
         embed.set_footer(text=f"Sumber: api.waktusolat.app • Zona JAKIM: {zone_code}")
@@ -41,6 +41,7 @@ class RichPresenceConfig:
     rotation_seconds: int = 45
     default_status: str = "online"
     activities: list[PresenceActivityConfig] = field(default_factory=list)
+    min_update_seconds: int = 15
 
 
 _DEFAULT_PRESENCE_CONFIG: dict[str, Any] = {
@@ -136,6 +137,7 @@ def _load_presence_config(base_path: Path | None) -> RichPresenceConfig:
     except ValueError:
         rotation = default_rotation
     rotation = max(10, rotation)
+    min_update = _env_int("PRESENCE_MIN_UPDATE_SECONDS", int(config_data.get("min_update_seconds", 15) or 15), minimum=5)
 
     status_env = _clean_optional_str(os.getenv("PRESENCE_STATUS"))
     default_status = _clean_optional_str(config_data.get("status")) or "online"
@@ -151,6 +153,73 @@ def _load_presence_config(base_path: Path | None) -> RichPresenceConfig:
         rotation_seconds=rotation,
         default_status=merged_status,
         activities=activities,
+        min_update_seconds=min_update,
+    )
+
+
+@dataclass(slots=True)
+class AutomodConfig:
+    heavy_workers: int = 0
+    heavy_deadline_ms: int = 250
+    heavy_fallback: str = "allow"
+
+
+def _env_int(key: str, default: int, *, minimum: int = 0) -> int:
+    raw = _clean_optional_str(os.getenv(key))
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        return default
+    return max(minimum, value)
+
+
+def _load_automod_config() -> AutomodConfig:
+    fallback = (_clean_optional_str(os.getenv("AUTOMOD_HEAVY_FALLBACK")) or "allow").lower()
+    if fallback not in {"allow", "block"}:
+        fallback = "allow"
+    return AutomodConfig(
+        heavy_workers=_env_int("AUTOMOD_HEAVY_WORKERS", 0),
+        heavy_deadline_ms=_env_int("AUTOMOD_HEAVY_DEADLINE_MS", 250, minimum=10),
+        heavy_fallback=fallback,
+    )
+
+
+@dataclass(slots=True)
+class ActivityLogDeliveryConfig:
+    max_pending: int = 500
+    overflow: str = "summarize"
+    flush_ms: int = 1500
+    use_webhooks: bool = False
+    archive_retention_days: int = 30
+
+
+def _load_activity_log_config() -> ActivityLogDeliveryConfig:
+    overflow = (_clean_optional_str(os.getenv("ACTIVITY_LOG_OVERFLOW")) or "summarize").lower()
+    if overflow not in {"drop", "summarize"}:
+        overflow = "summarize"
+    return ActivityLogDeliveryConfig(
+        max_pending=_env_int("ACTIVITY_LOG_QUEUE_SIZE", 500, minimum=10),
+        overflow=overflow,
+        flush_ms=_env_int("ACTIVITY_LOG_FLUSH_MS", 1500),
+        use_webhooks=_env_bool("ACTIVITY_LOG_WEBHOOKS", False),
+        archive_retention_days=_env_int("ACTIVITY_ARCHIVE_RETENTION_DAYS", 30),
+    )
+
+
+@dataclass(slots=True)
+class LoopMonitorConfig:
+    enabled: bool = True
+    probe_ms: int = 500
+    slow_callback_ms: int = 250
+
+
+def _load_loop_monitor_config() -> LoopMonitorConfig:
+    return LoopMonitorConfig(
+        enabled=_env_bool("LOOP_MONITOR_ENABLED", True),
+        probe_ms=_env_int("LOOP_MONITOR_PROBE_MS", 500, minimum=50),
+        slow_callback_ms=_env_int("LOOP_SLOW_CALLBACK_MS", 250, minimum=10),
     )
 
 
@@ -163,6 +232,9 @@ class BotConfig:
     owner_ids: list[int] = field(default_factory=list)
     bot_version: str = "dev"
     presence: RichPresenceConfig = field(default_factory=RichPresenceConfig)
+    automod: AutomodConfig = field(default_factory=AutomodConfig)
+    activity_log: ActivityLogDeliveryConfig = field(default_factory=ActivityLogDeliveryConfig)
+    loop_monitor: LoopMonitorConfig = field(default_factory=LoopMonitorConfig)
 
 
 def load_config(env_path: Optional[Path] = None) -> BotConfig:
@@ -200,4 +272,7 @@ def load_config(env_path: Optional[Path] = None) -> BotConfig:
         owner_ids=owner_ids,
         bot_version=version,
         presence=presence_config,
+        automod=_load_automod_config(),
+        activity_log=_load_activity_log_config(),
+        loop_monitor=_load_loop_monitor_config(),
     )
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import sqlite3
 from typing import Sequence
 
 from .core import Database
@@ -243,6 +244,66 @@ CREATE_TABLE_QUERIES: Sequence[str] = (
         delivered_at TEXT
     );
     """
+    ,
+    """
+    CREATE TABLE IF NOT EXISTS activity_archive (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        guild_id INTEGER NOT NULL,
+        created_at INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        title TEXT NOT NULL,
+        user_id INTEGER,
+        channel_id INTEGER,
+        summary TEXT NOT NULL,
+        payload BLOB
+    );
+    """
+    ,
+    """
+    CREATE INDEX IF NOT EXISTS idx_activity_archive_guild_time
+    ON activity_archive (guild_id, created_at);
+    """
+    ,
+    """
+    CREATE INDEX IF NOT EXISTS idx_activity_archive_guild_user_time
+    ON activity_archive (guild_id, user_id, created_at);
+    """
+    ,
+    # Jadwal pengingat dibaca dari scheduled_jobs (indeks kind, run_at);
+    # indeks remind_at lama tidak pernah dipakai query mana pun.
+    """
+    DROP INDEX IF EXISTS idx_reminders_remind_at;
+    """
+    ,
+    """
+    CREATE TABLE IF NOT EXISTS prayer_locations (
+        negara TEXT NOT NULL,
+        location_id TEXT NOT NULL,
+        label TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (negara, location_id)
+    );
+    """
+)
+
+
+ACTIVITY_ARCHIVE_FTS_QUERIES: Sequence[str] = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS activity_archive_fts
+    USING fts5(summary, content='activity_archive', content_rowid='id');
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS activity_archive_ai AFTER INSERT ON activity_archive BEGIN
+        INSERT INTO activity_archive_fts (rowid, summary) VALUES (new.id, new.summary);
+    END;
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS activity_archive_ad AFTER DELETE ON activity_archive BEGIN
+        INSERT INTO activity_archive_fts (activity_archive_fts, rowid, summary)
+        VALUES ('delete', old.id, old.summary);
+    END;
+    """,
 )
 
 
@@ -251,6 +312,8 @@ async def run_migrations() -> None:
     for query in CREATE_TABLE_QUERIES:
         await db.execute(query)
     await _ensure_guild_settings_activity_columns(db)
+    await _ensure_activity_archive_fts(db)
+    await _ensure_scheduled_jobs(db)
 
 
 async def _ensure_guild_settings_activity_columns(db: Database) -> None:
@@ -269,3 +332,63 @@ async def _ensure_guild_settings_activity_columns(db: Database) -> None:
         await db.execute(
             "ALTER TABLE guild_settings ADD COLUMN activity_log_disabled_events TEXT NOT NULL DEFAULT '[]'"
         )
+
+    if "activity_log_category_modes" not in column_names:
+        await db.execute(
+            "ALTER TABLE guild_settings ADD COLUMN activity_log_category_modes TEXT NOT NULL DEFAULT '{}'"
+        )
+
+
+async def _ensure_activity_archive_fts(db: Database) -> None:
+    """Indeks teks penuh untuk arsip log; dilewati jika SQLite tanpa FTS5."""
+
+    try:
+        for query in ACTIVITY_ARCHIVE_FTS_QUERIES:
+            await db.execute(query)
+    except sqlite3.OperationalError:
+        return
+
+
+SCHEDULED_JOBS_QUERIES: Sequence[str] = (
+    """
+    CREATE TABLE IF NOT EXISTS scheduled_jobs (
+        job_id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        job_key TEXT NOT NULL,
+        run_at REAL NOT NULL,
+        payload TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    );
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_kind_run_at
+    ON scheduled_jobs (kind, run_at);
+    """,
+)
+
+
+async def _ensure_scheduled_jobs(db: Database) -> None:
+    """Buat tabel job persisten dan salin jadwal lama saat tabel pertama kali dibuat."""
+
+    existing = await db.fetchone("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'scheduled_jobs'")
+    for query in SCHEDULED_JOBS_QUERIES:
+        await db.execute(query)
+    if existing is not None:
+        return
+
+    await db.execute(
+        """
+        INSERT OR IGNORE INTO scheduled_jobs (job_id, kind, job_key, run_at)
+        SELECT 'reminder-' || id, 'reminder', CAST(id AS TEXT), CAST(strftime('%s', remind_at) AS REAL)
+        FROM reminders
+        WHERE strftime('%s', remind_at) IS NOT NULL
+        """
+    )
+    await db.execute(
+        """
+        INSERT OR IGNORE INTO scheduled_jobs (job_id, kind, job_key, run_at)
+        SELECT 'announcement-' || id, 'announcement', CAST(id AS TEXT), CAST(strftime('%s', scheduled_at) AS REAL)
+        FROM scheduled_announcements
+        WHERE status = 'pending' AND strftime('%s', scheduled_at) IS NOT NULL
+        """
+    )
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import json
+import zlib
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta, timezone
 from typing import Any, Iterable, Optional, Sequence
 
@@ -21,6 +22,7 @@ class GuildSettings:
     activity_log_channel_id: Optional[int]
     activity_log_enabled: bool
     activity_log_disabled_events: list[str]
+    activity_log_category_modes: dict[str, str] = field(default_factory=dict)
 
     def effective_activity_channel(self) -> Optional[int]:
         return self.activity_log_channel_id or self.log_channel_id
@@ -31,6 +33,17 @@ class GuildSettings:
         return category not in self.activity_log_disabled_events
 
 
+def _decode_category_modes(raw: Any) -> dict[str, str]:
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError:
+            return {}
+    if not isinstance(raw, dict):
+        return {}
+    return {str(key): str(value) for key, value in raw.items() if isinstance(value, str)}
+
+
 class GuildSettingsRepository:
     def __init__(self, db: Database) -> None:
         self._db = db
@@ -49,6 +62,7 @@ class GuildSettingsRepository:
             ]
         except (TypeError, json.JSONDecodeError):
             disabled_events = []
+        modes_raw = row["activity_log_category_modes"] if "activity_log_category_modes" in row_keys else "{}"
 
         return GuildSettings(
             guild_id=row["guild_id"],
@@ -61,6 +75,7 @@ class GuildSettingsRepository:
             activity_log_channel_id=row["activity_log_channel_id"] if "activity_log_channel_id" in row_keys else None,
             activity_log_enabled=bool(row["activity_log_enabled"]) if "activity_log_enabled" in row_keys else True,
             activity_log_disabled_events=disabled_events,
+            activity_log_category_modes=_decode_category_modes(modes_raw),
         )
 
     async def upsert(self, guild_id: int, **kwargs: Any) -> None:
@@ -102,6 +117,15 @@ class GuildSettingsRepository:
 
         data["activity_log_disabled_events"] = json.dumps(sorted(set(disabled_events)))
 
+        modes_input = kwargs.get(
+            "activity_log_category_modes",
+            existing.activity_log_category_modes if existing else {},
+        )
+        data["activity_log_category_modes"] = json.dumps(
+            _decode_category_modes(modes_input),
+            sort_keys=True,
+        )
+
         if existing:
             await self._db.execute(
                 """
@@ -115,6 +139,7 @@ class GuildSettingsRepository:
                     activity_log_channel_id = ?,
                     activity_log_enabled = ?,
                     activity_log_disabled_events = ?,
+                    activity_log_category_modes = ?,
                     updated_at = CURRENT_TIMESTAMP
                 WHERE guild_id = ?
                 """,
@@ -127,6 +152,7 @@ class GuildSettingsRepository:
                 data["activity_log_channel_id"],
                 data["activity_log_enabled"],
                 data["activity_log_disabled_events"],
+                data["activity_log_category_modes"],
                 guild_id,
             )
         else:
@@ -142,8 +168,9 @@ class GuildSettingsRepository:
                     ticket_category_id,
                     activity_log_channel_id,
                     activity_log_enabled,
-                    activity_log_disabled_events
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    activity_log_disabled_events,
+                    activity_log_category_modes
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 guild_id,
                 data["welcome_channel_id"],
@@ -155,6 +182,7 @@ class GuildSettingsRepository:
                 data["activity_log_channel_id"],
                 data["activity_log_enabled"],
                 data["activity_log_disabled_events"],
+                data["activity_log_category_modes"],
             )
 
 class EconomyRepository:
@@ -222,6 +250,7 @@ class EconomyRepository:
 class ReminderRepository:
     def __init__(self, db: Database) -> None:
         self._db = db
+        self._pending_count: Optional[int] = None
 
     async def create(self, guild_id: int, user_id: int, message: str, remind_at: str, channel_id: Optional[int]) -> int:
         await self._db.execute(
@@ -233,17 +262,55 @@ class ReminderRepository:
             channel_id,
         )
         row = await self._db.fetchone("SELECT last_insert_rowid() as id")
+        if self._pending_count is not None:
+            self._pending_count += 1
         return int(row["id"]) if row else 0
 
+    async def count_pending(self) -> int:
+        """Jumlah pengingat tersimpan; dihitung sekali lalu diperbarui setiap tulis."""
+
+        if self._pending_count is None:
+            row = await self._db.fetchone("SELECT COUNT(*) AS total FROM reminders")
+            self._pending_count = int(row["total"]) if row else 0
+        return self._pending_count
+
     async def due_reminders(self, timestamp: str) -> list[dict[str, Any]]:
         rows = await self._db.fetchall(
-            "SELECT * FROM reminders WHERE remind_at <= ?",
+            "SELECT * FROM reminders WHERE remind_at <= ? ORDER BY remind_at",
             timestamp,
         )
         return [dict(row) for row in rows]
 
+    async def get_many(self, reminder_ids: Sequence[int]) -> list[dict[str, Any]]:
+        if not reminder_ids:
+            return []
+        placeholders = ", ".join("?" for _ in reminder_ids)
+        rows = await self._db.fetchall(
+            f"SELECT * FROM reminders WHERE id IN ({placeholders}) ORDER BY remind_at",
+            *reminder_ids,
+        )
+        return [dict(row) for row in rows]
+
     async def delete(self, reminder_id: int) -> None:
-        await self._db.execute("DELETE FROM reminders WHERE id = ?", reminder_id)
+        async def _delete(conn: Any) -> int:
+            cursor = await conn.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
+            return cursor.rowcount
+
+        removed = await self._db.transaction(_delete)
+        if self._pending_count is not None and removed:
+            self._pending_count = max(self._pending_count - removed, 0)
+
+    async def delete_many(self, reminder_ids: Sequence[int]) -> None:
+        if not reminder_ids:
+            return
+
+        async def _delete(conn: Any) -> int:
+            cursor = await conn.executemany("DELETE FROM reminders WHERE id = ?", [(rid,) for rid in reminder_ids])
+            return cursor.rowcount
+
+        removed = await self._db.transaction(_delete)
+        if self._pending_count is not None and removed:
+            self._pending_count = max(self._pending_count - removed, 0)
 
     async def list_for_user(self, guild_id: int, user_id: int) -> list[dict[str, Any]]:
         rows = await self._db.fetchall(
@@ -1100,6 +1167,22 @@ class AuditLogRepository:
             context,
         )
 
+    async def add_entries(
+        self,
+        entries: Sequence[tuple[int, str, int, Optional[int], Optional[str]]],
+    ) -> None:
+        """Tulis banyak entri ``(guild_id, action, actor_id, target_id, context)`` sekaligus."""
+
+        if not entries:
+            return
+        await self._db.executemany(
+            """
+            INSERT INTO audit_logs (guild_id, action, actor_id, target_id, context)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            list(entries),
+        )
+
     async def recent_entries(self, guild_id: int, limit: int = 10, action_prefix: Optional[str] = None) -> list[dict[str, Any]]:
         if action_prefix:
             rows = await self._db.fetchall(
@@ -1567,6 +1650,31 @@ class AnnouncementRepository:
             announcement_id,
         )
 
+    async def get_many(self, announcement_ids: Sequence[int]) -> list[ScheduledAnnouncement]:
+        if not announcement_ids:
+            return []
+        placeholders = ", ".join("?" for _ in announcement_ids)
+        rows = await self._db.fetchall(
+            f"SELECT * FROM scheduled_announcements WHERE id IN ({placeholders}) ORDER BY scheduled_at ASC",
+            *announcement_ids,
+        )
+        return [self._row_to_announcement(row) for row in rows]
+
+    async def finish_many(self, announcement_ids: Sequence[int], status: str) -> None:
+        """Tandai banyak pengumuman tertunda sebagai ``sent``/``cancelled`` sekaligus."""
+
+        if not announcement_ids:
+            return
+        await self._db.executemany(
+            """
+            UPDATE scheduled_announcements
+            SET status = ?,
+                delivered_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'pending'
+            """,
+            [(status, announcement_id) for announcement_id in announcement_ids],
+        )
+
     async def cancel(self, announcement_id: int) -> bool:
         row = await self._db.fetchone(
             """
@@ -1587,3 +1695,286 @@ class AnnouncementRepository:
             announcement_id,
         )
         return True
+
+
+@dataclass(slots=True)
+class ActivityArchiveEntry:
+    guild_id: int
+    created_at: int
+    category: str
+    title: str
+    summary: str
+    user_id: Optional[int] = None
+    channel_id: Optional[int] = None
+    payload: Optional[dict[str, Any]] = None
+    id: Optional[int] = None
+
+
+def _fts_phrase_query(text: str) -> str:
+    terms = [term.replace('"', '""') for term in text.split() if term.strip()]
+    return " ".join(f'"{term}"' for term in terms)
+
+
+class ActivityArchiveRepository:
+    def __init__(self, db: Database) -> None:
+        self._db = db
+        self._has_fts: Optional[bool] = None
+
+    async def _fts_available(self) -> bool:
+        if self._has_fts is None:
+            row = await self._db.fetchone(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'activity_archive_fts'"
+            )
+            self._has_fts = row is not None
+        return self._has_fts
+
+    @staticmethod
+    def _row_to_entry(row: Any) -> ActivityArchiveEntry:
+        payload: Optional[dict[str, Any]] = None
+        raw = row["payload"]
+        if raw:
+            try:
+                decoded = json.loads(zlib.decompress(raw).decode("utf-8"))
+            except (zlib.error, UnicodeDecodeError, json.JSONDecodeError):
+                decoded = None
+            if isinstance(decoded, dict):
+                payload = decoded
+        return ActivityArchiveEntry(
+            id=int(row["id"]),
+            guild_id=int(row["guild_id"]),
+            created_at=int(row["created_at"]),
+            category=str(row["category"]),
+            title=str(row["title"]),
+            summary=str(row["summary"]),
+            user_id=row["user_id"],
+            channel_id=row["channel_id"],
+            payload=payload,
+        )
+
+    async def append_many(self, entries: Sequence[ActivityArchiveEntry]) -> None:
+        if not entries:
+            return
+        rows = [
+            (
+                entry.guild_id,
+                entry.created_at,
+                entry.category,
+                entry.title,
+                entry.user_id,
+                entry.channel_id,
+                entry.summary,
+                zlib.compress(json.dumps(entry.payload, separators=(",", ":")).encode("utf-8"))
+                if entry.payload
+                else None,
+            )
+            for entry in entries
+        ]
+        await self._db.executemany(
+            """
+            INSERT INTO activity_archive (guild_id, created_at, category, title, user_id, channel_id, summary, payload)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+
+    async def search(
+        self,
+        guild_id: int,
+        *,
+        user_id: Optional[int] = None,
+        channel_id: Optional[int] = None,
+        category: Optional[str] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        text: Optional[str] = None,
+        limit: int = 10,
+    ) -> list[ActivityArchiveEntry]:
+        clauses = ["a.guild_id = ?"]
+        params: list[Any] = [guild_id]
+        if user_id is not None:
+            clauses.append("a.user_id = ?")
+            params.append(user_id)
+        if channel_id is not None:
+            clauses.append("a.channel_id = ?")
+            params.append(channel_id)
+        if category:
+            clauses.append("a.category = ?")
+            params.append(category)
+        if since is not None:
+            clauses.append("a.created_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("a.created_at < ?")
+            params.append(until)
+
+        source = "activity_archive AS a"
+        phrase = _fts_phrase_query(text or "")
+        if phrase:
+            if await self._fts_available():
+                source += " JOIN activity_archive_fts AS f ON f.rowid = a.id"
+                clauses.append("activity_archive_fts MATCH ?")
+                params.append(phrase)
+            else:
+                clauses.append("a.summary LIKE ?")
+                params.append(f"%{text.strip()}%")
+
+        params.append(max(1, limit))
+        rows = await self._db.fetchall(
+            f"""
+            SELECT a.* FROM {source}
+            WHERE {" AND ".join(clauses)}
+            ORDER BY a.created_at DESC, a.id DESC
+            LIMIT ?
+            """,
+            *params,
+        )
+        return [self._row_to_entry(row) for row in rows]
+
+    async def purge_before(self, cutoff: int) -> int:
+        async def _purge(conn: Any) -> int:
+            cursor = await conn.execute("DELETE FROM activity_archive WHERE created_at < ?", (cutoff,))
+            return cursor.rowcount
+
+        return int(await self._db.transaction(_purge))
+
+
+@dataclass(slots=True)
+class ScheduledJob:
+    job_id: str
+    kind: str
+    key: str
+    run_at: float
+    payload: dict[str, Any] = field(default_factory=dict)
+
+
+class ScheduledJobRepository:
+    """Penyimpanan job terjadwal satu kali (``run_at`` dalam detik epoch UTC)."""
+
+    def __init__(self, db: Database) -> None:
+        self._db = db
+
+    @staticmethod
+    def _row_to_job(row: Any) -> ScheduledJob:
+        payload: dict[str, Any] = {}
+        if row["payload"]:
+            try:
+                decoded = json.loads(row["payload"])
+            except json.JSONDecodeError:
+                decoded = None
+            if isinstance(decoded, dict):
+                payload = decoded
+        return ScheduledJob(
+            job_id=str(row["job_id"]),
+            kind=str(row["kind"]),
+            key=str(row["job_key"]),
+            run_at=float(row["run_at"]),
+            payload=payload,
+        )
+
+    async def upsert(self, job: ScheduledJob) -> bool:
+        """Simpan atau perbarui job; ``True`` bila baris baru benar-benar ditambahkan."""
+
+        async def _upsert(conn: Any) -> bool:
+            cursor = await conn.execute("SELECT 1 FROM scheduled_jobs WHERE job_id = ?", (job.job_id,))
+            existing = await cursor.fetchone()
+            await conn.execute(
+                """
+                INSERT INTO scheduled_jobs (job_id, kind, job_key, run_at, payload)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(job_id) DO UPDATE SET
+                    kind = excluded.kind,
+                    job_key = excluded.job_key,
+                    run_at = excluded.run_at,
+                    payload = excluded.payload
+                """,
+                (
+                    job.job_id,
+                    job.kind,
+                    job.key,
+                    job.run_at,
+                    json.dumps(job.payload) if job.payload else None,
+                ),
+            )
+            return existing is None
+
+        return bool(await self._db.transaction(_upsert))
+
+    async def delete(self, job_id: str) -> int:
+        async def _delete(conn: Any) -> int:
+            cursor = await conn.execute("DELETE FROM scheduled_jobs WHERE job_id = ?", (job_id,))
+            return cursor.rowcount
+
+        return int(await self._db.transaction(_delete))
+
+    async def delete_many(self, job_ids: Sequence[str]) -> None:
+        if not job_ids:
+            return
+        await self._db.executemany("DELETE FROM scheduled_jobs WHERE job_id = ?", [(job_id,) for job_id in job_ids])
+
+    async def complete(self, jobs: Sequence[ScheduledJob]) -> int:
+        """Hapus job yang selesai dijalankan, kecuali yang sudah dijadwalkan ulang (``run_at`` berubah)."""
+
+        if not jobs:
+            return 0
+
+        async def _complete(conn: Any) -> int:
+            removed = 0
+            for job in jobs:
+                cursor = await conn.execute(
+                    "DELETE FROM scheduled_jobs WHERE job_id = ? AND run_at = ?",
+                    (job.job_id, job.run_at),
+                )
+                removed += cursor.rowcount
+            return removed
+
+        return int(await self._db.transaction(_complete))
+
+    async def window(self, kinds: Sequence[str], until: float, *, limit: int = 500) -> list[ScheduledJob]:
+        """Job berjenis ``kinds`` dengan ``run_at <= until`` (termasuk yang terlambat)."""
+
+        if not kinds:
+            return []
+        placeholders = ", ".join("?" for _ in kinds)
+        rows = await self._db.fetchall(
+            f"SELECT * FROM scheduled_jobs WHERE kind IN ({placeholders}) AND run_at <= ? ORDER BY run_at LIMIT ?",
+            *kinds,
+            until,
+            limit,
+        )
+        return [self._row_to_job(row) for row in rows]
+
+    async def count(self) -> int:
+        row = await self._db.fetchone("SELECT COUNT(*) AS total FROM scheduled_jobs")
+        return int(row["total"]) if row else 0
+
+
+class PrayerLocationRepository:
+    """Salinan lokal daftar kota/zona jadwal sholat dari upstream."""
+
+    def __init__(self, db: Database) -> None:
+        self._db = db
+
+    async def replace(self, negara: str, rows: Sequence[tuple[str, str, dict[str, Any]]]) -> None:
+        async def _replace(conn: Any) -> None:
+            await conn.execute("DELETE FROM prayer_locations WHERE negara = ?", (negara,))
+            await conn.executemany(
+                "INSERT INTO prayer_locations (negara, location_id, label, payload) VALUES (?, ?, ?, ?)",
+                [(negara, location_id, label, json.dumps(payload)) for location_id, label, payload in rows],
+            )
+
+        await self._db.transaction(_replace)
+
+    async def list_all(self, negara: str) -> list[dict[str, Any]]:
+        rows = await self._db.fetchall(
+            "SELECT payload FROM prayer_locations WHERE negara = ? ORDER BY label",
+            negara,
+        )
+        payloads: list[dict[str, Any]] = []
+        for row in rows:
+            try:
+                decoded = json.loads(row["payload"])
+            except json.JSONDecodeError:
+                continue
+            if isinstance(decoded, dict):
+                payloads.append(decoded)
+        return payloads
@@ -24,10 +24,24 @@ from .database.repositories import (
     AuditLogRepository,
     LevelRepository,
     AnnouncementRepository,
+    ActivityArchiveRepository,
+    ScheduledJobRepository,
+    PrayerLocationRepository,
 )
+from .services.activity_archive import ActivityArchive
+from .services.activity_logger import ActivityLogger
+from .services.delivery import DeliveryExecutor
+from .services.http import HTTPClient
 from .services.logging import setup_logging, get_logger
+from .services.loop_monitor import LoopMonitor
 from .services.scheduler import Scheduler
 from .services.presence import RichPresenceManager
+from .services.resources import ResourceSampler
+from .services.message_pipeline import MessagePipeline
+from .services.stats import StatsRegistry
+
+# 120 sampel (lihat ResourceSampler) x 60 detik = tren dua jam terakhir.
+RESOURCE_SAMPLE_SECONDS = 60
 
 
 class ForUS(interactions.Client):
@@ -64,23 +78,67 @@ class ForUS(interactions.Client):
         self.audit_repo: AuditLogRepository | None = None
         self.level_repo: LevelRepository | None = None
         self.announcement_repo: AnnouncementRepository | None = None
+        self.prayer_location_repo: PrayerLocationRepository | None = None
+        self.activity_archive: ActivityArchive | None = None
+        # Diisi oleh ekstensi ActivityLog; outbox-nya di-flush saat bot ditutup.
+        self.activity_logger: ActivityLogger | None = None
+        self._closing_tasks: set[asyncio.Task[Any]] = set()
         self.scheduler = Scheduler()
+        self.delivery = DeliveryExecutor()
+        self.http_client = HTTPClient()
+        self.stats = StatsRegistry()
+        self.resource_sampler = ResourceSampler()
+        self.loop_monitor = LoopMonitor(
+            interval=config.loop_monitor.probe_ms / 1000,
+            slow_threshold=config.loop_monitor.slow_callback_ms / 1000,
+        )
         self.log = get_logger("ForUS")
         self.started_at: datetime | None = None
         self.presence_manager = RichPresenceManager(self, config.presence, version=config.bot_version)
+        self.message_pipeline = MessagePipeline(self)
 
     async def setup_hook(self) -> None:
         self.log.info("Memulai inisialisasi bot...")
+        if self.config.loop_monitor.enabled:
+            self.loop_monitor.start()
         await self._setup_database()
         self.scheduler.start()
+        self.resource_sampler.start()
+        self.resource_sampler.sample()
+        self.scheduler.schedule_interval(
+            "maintenance-resource-sample",
+            RESOURCE_SAMPLE_SECONDS,
+            self.resource_sampler.run_once,
+        )
         await self._load_cogs()
         await self._synchronize_commands()
         self.started_at = datetime.now(timezone.utc)
         self.presence_manager.start()
         self.presence_manager.request_refresh()
 
+    def track_closing(self, coro: Any) -> asyncio.Task[Any]:
+        """Jalankan coroutine penutupan dari konteks sinkron (mis. ``drop``); ditunggu di :meth:`close`."""
+
+        task = asyncio.ensure_future(coro)
+        self._closing_tasks.add(task)
+        task.add_done_callback(self._closing_tasks.discard)
+        return task
+
     async def close(self) -> None:
+        if self.activity_logger is not None:
+            self.track_closing(self.activity_logger.close())
+            self.activity_logger = None
+        if self._closing_tasks:
+            results = await asyncio.gather(*list(self._closing_tasks), return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    self.log.error("Gagal menutup komponen saat shutdown: %r", result)
         await self.presence_manager.close()
+        self.resource_sampler.close()
+        await self.loop_monitor.close()
+        await self.http_client.close()
+        if self.activity_archive:
+            await self.activity_archive.close()
         if self.scheduler:
             self.scheduler.shutdown(wait=False)
         if self.db:
@@ -101,6 +159,14 @@ class ForUS(interactions.Client):
         self.audit_repo = AuditLogRepository(self.db)
         self.level_repo = LevelRepository(self.db)
         self.announcement_repo = AnnouncementRepository(self.db)
+        self.prayer_location_repo = PrayerLocationRepository(self.db)
+        self.scheduler.attach_store(ScheduledJobRepository(self.db))
+        retention_days = self.config.activity_log.archive_retention_days
+        if retention_days > 0:
+            self.activity_archive = ActivityArchive(
+                ActivityArchiveRepository(self.db),
+                retention_days=retention_days,
+            )
 
     async def _load_cogs(self) -> None:
         extensions = (
@@ -165,16 +231,77 @@ class ForUS(interactions.Client):
     @interactions.listen()
     async def on_startup(self) -> None:
         self.log.info("Bot siap sebagai %s (ID: %s)", self.user, getattr(self.user, "id", "?"))
+        self.stats.rebuild(self.guilds)
         self.presence_manager.request_refresh()
 
+    @interactions.listen()
+    async def on_message_create(self, event: interactions.events.MessageCreate) -> None:
+        await self.message_pipeline.process(event.message)
+
     @interactions.listen()
     async def on_guild_join(self, event: interactions.events.GuildJoin) -> None:
+        guild = event.guild
+        if guild is not None:
+            self.stats.track_guild(guild)
         self.presence_manager.request_refresh()
 
     @interactions.listen()
     async def on_guild_left(self, event: interactions.events.GuildLeft) -> None:
+        self.stats.forget_guild(event.guild_id)
         self.presence_manager.request_refresh()
 
+    @interactions.listen()
+    async def on_member_add(self, event: interactions.events.MemberAdd) -> None:
+        self.stats.member_joined(event.guild_id, is_bot=bool(getattr(event.member, "bot", False)))
+
+    @interactions.listen()
+    async def on_member_remove(self, event: interactions.events.MemberRemove) -> None:
+        self.stats.member_left(event.guild_id, is_bot=bool(getattr(event.member, "bot", False)))
+
+    @interactions.listen()
+    async def on_guild_update(self, event: interactions.events.GuildUpdate) -> None:
+        self.stats.guild_updated(event.after)
+
+    @interactions.listen()
+    async def on_channel_create(self, event: interactions.events.ChannelCreate) -> None:
+        self.stats.channel_created(event.channel)
+
+    @interactions.listen()
+    async def on_channel_delete(self, event: interactions.events.ChannelDelete) -> None:
+        self.stats.channel_deleted(event.channel)
+
+    @interactions.listen()
+    async def on_thread_create(self, event: interactions.events.ThreadCreate) -> None:
+        self.stats.channel_created(event.thread)
+
+    @interactions.listen()
+    async def on_thread_delete(self, event: interactions.events.ThreadDelete) -> None:
+        self.stats.channel_deleted(event.thread)
+
+    @interactions.listen()
+    async def on_role_create(self, event: interactions.events.RoleCreate) -> None:
+        self.stats.role_created(event.guild_id)
+
+    @interactions.listen()
+    async def on_role_delete(self, event: interactions.events.RoleDelete) -> None:
+        self.stats.role_deleted(event.guild_id)
+
+    @interactions.listen()
+    async def on_guild_emojis_update(self, event: interactions.events.GuildEmojisUpdate) -> None:
+        self.stats.emojis_updated(event.guild_id, event.after)
+
+    @interactions.listen()
+    async def on_guild_stickers_update(self, event: interactions.events.GuildStickersUpdate) -> None:
+        self.stats.stickers_updated(event.guild_id, event.stickers)
+
+    @interactions.listen()
+    async def on_guild_scheduled_event_create(self, event: interactions.events.GuildScheduledEventCreate) -> None:
+        self.stats.scheduled_event_created(event.scheduled_event)
+
+    @interactions.listen()
+    async def on_guild_scheduled_event_delete(self, event: interactions.events.GuildScheduledEventDelete) -> None:
+        self.stats.scheduled_event_deleted(event.scheduled_event)
+
 
 async def main() -> None:
     config = load_config(Path(".env"))
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Optional
+
+import interactions
+
+from bot.database.repositories import ActivityArchiveEntry, ActivityArchiveRepository
+
+from .logging import get_logger
+
+
+__all__ = ["ActivityArchive", "summarize_embed"]
+
+
+SUMMARY_LIMIT = 1500
+PURGE_INTERVAL_SECONDS = 3600
+
+
+def summarize_embed(embed: interactions.Embed) -> str:
+    """Teks datar dari embed log untuk diindeks dan ditampilkan di hasil pencarian."""
+
+    parts: list[str] = [embed.title or "Log"]
+    if embed.description:
+        parts.append(" ".join(embed.description.split()))
+    for embed_field in embed.fields:
+        value = " ".join(str(embed_field.value).split())
+        parts.append(f"{embed_field.name}: {value}")
+    summary = " | ".join(parts)
+    if len(summary) > SUMMARY_LIMIT:
+        summary = summary[: SUMMARY_LIMIT - 1] + "…"
+    return summary
+
+
+class ActivityArchive:
+    """Arsip lokal append-only untuk setiap log aktivitas yang diformat.
+
+    ``record`` hanya menaruh entri di buffer; penulisan ke SQLite dilakukan
+    berkelompok (``executemany``) oleh task latar. Entri yang lebih tua dari
+    ``retention_days`` dihapus paling sering sekali per jam saat flush.
+    """
+
+    def __init__(
+        self,
+        repo: ActivityArchiveRepository,
+        *,
+        retention_days: int = 30,
+        flush_interval: float = 5.0,
+        batch_size: int = 200,
+    ) -> None:
+        self.repo = repo
+        self.retention_days = max(1, retention_days)
+        self.flush_interval = max(0.0, flush_interval)
+        self.batch_size = max(1, batch_size)
+        self._buffer: list[ActivityArchiveEntry] = []
+        self._flush_task: Optional[asyncio.Task[None]] = None
+        self._closing = asyncio.Event()
+        self._last_purge = 0.0
+        self._log = get_logger("ActivityArchive")
+        self.recorded = 0
+        self.written = 0
+        self.purged = 0
+
+    def record(
+        self,
+        guild_id: int,
+        embed: interactions.Embed,
+        *,
+        category: str,
+        user_id: Optional[int] = None,
+        channel_id: Optional[int] = None,
+    ) -> None:
+        timestamp = embed.timestamp.timestamp() if embed.timestamp else time.time()
+        self._buffer.append(
+            ActivityArchiveEntry(
+                guild_id=guild_id,
+                created_at=int(timestamp),
+                category=category,
+                title=embed.title or "Log",
+                summary=summarize_embed(embed),
+                user_id=user_id,
+                channel_id=channel_id,
+                payload=embed.to_dict(),
+            )
+        )
+        self.recorded += 1
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        if self.flush_interval and len(self._buffer) < self.batch_size:
+            try:
+                await asyncio.wait_for(self._closing.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+        await self.flush()
+
+    async def flush(self) -> None:
+        while self._buffer:
+            batch = self._buffer[: self.batch_size]
+            del self._buffer[: self.batch_size]
+            try:
+                await self.repo.append_many(batch)
+            except Exception:  # noqa: BLE001
+                self._log.exception("Gagal menulis %s entri arsip log aktivitas", len(batch))
+                continue
+            self.written += len(batch)
+
+        if time.monotonic() - self._last_purge >= PURGE_INTERVAL_SECONDS:
+            await self.purge_expired()
+
+    async def purge_expired(self, *, now: Optional[float] = None) -> int:
+        self._last_purge = time.monotonic()
+        cutoff = int((now if now is not None else time.time()) - self.retention_days * 86400)
+        try:
+            removed = await self.repo.purge_before(cutoff)
+        except Exception:  # noqa: BLE001
+            self._log.exception("Gagal menghapus arsip log aktivitas yang kedaluwarsa")
+            return 0
+        self.purged += removed
+        return removed
+
+    async def search(self, guild_id: int, **filters: object) -> list[ActivityArchiveEntry]:
+        await self.flush()
+        return await self.repo.search(guild_id, **filters)  # type: ignore[arg-type]
+
+    async def close(self) -> None:
+        self._closing.set()
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        self._flush_task = None
+        await self.flush()
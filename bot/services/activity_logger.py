@@ -1,13 +1,18 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+import random
+from collections import Counter
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Dict, FrozenSet, Iterable, Optional, Sequence, TYPE_CHECKING, Protocol
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Mapping, Optional, Sequence, TYPE_CHECKING, Protocol
 
 import interactions
 
+from .activity_outbox import PRIORITY_CHATTER, PRIORITY_MODERATION, ActivityLogOutbox
 from .cache import TTLCache
 from .logging import get_logger
+from .webhook_sink import WebhookLogSink
 
 if TYPE_CHECKING:
     from bot.main import ForUS
@@ -19,6 +24,9 @@ __all__ = [
     "format_attachments",
     "format_user",
     "ACTIVITY_LOG_CATEGORIES",
+    "CATEGORY_MODES",
+    "format_category_mode",
+    "parse_category_mode",
 ]
 
 
@@ -32,6 +40,41 @@ ACTIVITY_LOG_CATEGORIES: Dict[str, str] = {
     "reactions": "Reaksi",
     "commands": "Perintah",
 }
+CATEGORY_MODES = ("full", "sampled", "aggregated")
+AGGREGATE_WINDOW_SECONDS = 300
+AGGREGATE_MAX_CHANNELS = 15
+_AGGREGATE_NOUNS: Dict[str, str] = {
+    "messages": "pesan",
+    "reactions": "reaksi",
+    "voice": "aktivitas voice",
+}
+
+
+def parse_category_mode(raw: Optional[str]) -> tuple[str, int]:
+    """Ubah nilai tersimpan (``full``, ``aggregated``, ``sampled:25``) menjadi (mode, persen)."""
+
+    if not raw:
+        return "full", 100
+    mode, _, rate_raw = raw.partition(":")
+    mode = mode.strip().lower()
+    if mode == "aggregated":
+        return "aggregated", 0
+    if mode == "sampled":
+        try:
+            rate = int(rate_raw)
+        except ValueError:
+            rate = 100
+        rate = max(1, min(100, rate))
+        return ("full", 100) if rate == 100 else ("sampled", rate)
+    return "full", 100
+
+
+def format_category_mode(mode: str, rate: int = 100) -> str:
+    if mode == "sampled" and rate < 100:
+        return f"sampled:{max(1, rate)}"
+    if mode == "aggregated":
+        return "aggregated"
+    return "full"
 
 
 def truncate_content(content: str, *, limit: int = MAX_CONTENT_LENGTH) -> str:
@@ -91,18 +134,141 @@ class _ActivityLogConfig:
     channel_id: Optional[int]
     enabled: bool
     disabled_categories: FrozenSet[str]
+    category_modes: Mapping[str, tuple[str, int]] = field(default_factory=dict)
+
+    def mode_for(self, category: str) -> tuple[str, int]:
+        return self.category_modes.get(category, ("full", 100))
+
+    def aggregates(self, category: str) -> bool:
+        if not self.enabled or category in self.disabled_categories:
+            return False
+        return self.mode_for(category)[0] == "aggregated"
+
+    def allows(
+        self,
+        category: str,
+        *,
+        sample: bool = True,
+        roll: Callable[[], float] = random.random,
+    ) -> bool:
+        """Apakah event kategori ini dikirim sebagai embed penuh.
+
+        Mode ``sampled`` meloloskan event secara acak sesuai persentase dan mode
+        ``aggregated`` tidak pernah mengirim embed per event. ``sample=False``
+        dipakai event moderasi yang selalu dikirim penuh.
+        """
 
-    def allows(self, category: str) -> bool:
         if not self.enabled:
             return False
-        return category not in self.disabled_categories
+        if category in self.disabled_categories:
+            return False
+        if not sample:
+            return True
+        mode, rate = self.mode_for(category)
+        if mode == "aggregated":
+            return False
+        if mode == "sampled":
+            return roll() * 100 < rate
+        return True
+
+
+@dataclass(slots=True)
+class _CategoryAggregate:
+    channel: Any
+    counts: Counter[int] = field(default_factory=Counter)
+    users: dict[int, set[int]] = field(default_factory=dict)
+
+    def add(self, channel_id: int, user_id: Optional[int]) -> None:
+        self.counts[channel_id] += 1
+        if user_id is not None:
+            self.users.setdefault(channel_id, set()).add(user_id)
 
 
 class ActivityLogger:
-    def __init__(self, bot: ForUS, *, cache_ttl: int = 300) -> None:
+    def __init__(
+        self,
+        bot: ForUS,
+        *,
+        cache_ttl: int = 300,
+        outbox: Optional[ActivityLogOutbox] = None,
+        aggregate_window: float = AGGREGATE_WINDOW_SECONDS,
+    ) -> None:
         self.bot = bot
+        self.aggregate_window = aggregate_window
+        self._aggregates: dict[tuple[int, str], _CategoryAggregate] = {}
+        self._aggregate_task: Optional[asyncio.Task[None]] = None
         self._cache = TTLCache(ttl=cache_ttl)
         self._internal_log = get_logger("ActivityLogger")
+        if outbox is None:
+            delivery = getattr(getattr(bot, "config", None), "activity_log", None)
+            outbox = ActivityLogOutbox(
+                flush_interval=getattr(delivery, "flush_ms", 1500) / 1000,
+                max_pending=getattr(delivery, "max_pending", 500),
+                overflow=getattr(delivery, "overflow", "summarize"),
+                on_failure=self._on_delivery_failure,
+                sink=WebhookLogSink() if getattr(delivery, "use_webhooks", False) else None,
+            )
+        self.outbox = outbox
+
+    async def _on_delivery_failure(self, guild_id: int, exc: BaseException) -> None:  # noqa: ARG002
+        await self.invalidate_cache(guild_id)
+
+    async def close(self) -> None:
+        if self._aggregate_task is not None and not self._aggregate_task.done():
+            self._aggregate_task.cancel()
+        self._aggregate_task = None
+        self.flush_aggregates()
+        await self.outbox.close()
+
+    def _aggregate(
+        self,
+        guild_id: int,
+        category: str,
+        target: interactions.GuildText,
+        *,
+        user_id: Optional[int],
+        source_channel_id: Optional[int],
+    ) -> None:
+        key = (guild_id, category)
+        aggregate = self._aggregates.get(key)
+        if aggregate is None:
+            aggregate = _CategoryAggregate(channel=target)
+            self._aggregates[key] = aggregate
+        aggregate.channel = target
+        aggregate.add(source_channel_id or 0, user_id)
+        if self._aggregate_task is None or self._aggregate_task.done():
+            self._aggregate_task = asyncio.create_task(self._aggregate_loop())
+
+    async def _aggregate_loop(self) -> None:
+        while self._aggregates:
+            await asyncio.sleep(self.aggregate_window)
+            self.flush_aggregates()
+
+    def flush_aggregates(self) -> None:
+        aggregates, self._aggregates = self._aggregates, {}
+        for (guild_id, category), aggregate in aggregates.items():
+            embed = self._aggregate_embed(category, aggregate)
+            self.outbox.submit(aggregate.channel, embed, guild_id=guild_id, category=category, priority=PRIORITY_CHATTER)
+
+    def _aggregate_embed(self, category: str, aggregate: _CategoryAggregate) -> interactions.Embed:
+        noun = _AGGREGATE_NOUNS.get(category, "aktivitas")
+        minutes = max(1, round(self.aggregate_window / 60))
+        lines: list[str] = []
+        for channel_id, count in aggregate.counts.most_common(AGGREGATE_MAX_CHANNELS):
+            users = len(aggregate.users.get(channel_id, ()))
+            where = f"<#{channel_id}>" if channel_id else "channel tidak diketahui"
+            lines.append(f"{count} {noun} di {where} dari {users} pengguna")
+        hidden = len(aggregate.counts) - len(lines)
+        if hidden > 0:
+            lines.append(f"+{hidden} channel lainnya")
+        total = sum(aggregate.counts.values())
+        embed = self._base_embed(
+            f"Ringkasan {ACTIVITY_LOG_CATEGORIES.get(category, category)}",
+            color=interactions.Color.from_hex("#95A5A6"),
+        )
+        embed.description = "\n".join(lines)
+        embed.set_footer(text=f"{total} {noun} dalam {minutes} menit terakhir")
+        return embed
 
     def _cache_key(self, guild_id: int) -> str:
         return f"activity-log-config:{guild_id}"
@@ -127,6 +293,10 @@ class ActivityLogger:
                     channel_id=settings.effective_activity_channel(),
                     enabled=bool(settings.activity_log_enabled),
                     disabled_categories=frozenset(settings.activity_log_disabled_events),
+                    category_modes={
+                        category: parse_category_mode(raw)
+                        for category, raw in settings.activity_log_category_modes.items()
+                    },
                 )
 
         await self._cache.set(cache_key, config)
@@ -174,9 +344,23 @@ class ActivityLogger:
         channel: Optional[interactions.GuildText] = None,
         files: Optional[Sequence[interactions.File]] = None,
         category: Optional[str] = None,
+        priority: Optional[int] = None,
+        user_id: Optional[int] = None,
+        source_channel_id: Optional[int] = None,
     ) -> bool:
         config = await self._get_config(guild)
-        if category is not None and not config.allows(category):
+        sample = priority != PRIORITY_MODERATION
+        archive = getattr(self.bot, "activity_archive", None)
+        if archive is not None and config.enabled:
+            archive.record(
+                guild.id,
+                embed,
+                category=category or "lainnya",
+                user_id=user_id,
+                channel_id=source_channel_id,
+            )
+        aggregate = category is not None and sample and config.aggregates(category)
+        if category is not None and not aggregate and not config.allows(category, sample=sample):
             return False
         if category is None and not config.enabled:
             return False
@@ -184,8 +368,13 @@ class ActivityLogger:
         target = channel or await self._resolve_channel(guild, config)
         if target is None:
             return False
+        if aggregate:
+            self._aggregate(guild.id, category, target, user_id=user_id, source_channel_id=source_channel_id)
+            return True
+        if not files:
+            return self.outbox.submit(target, embed, guild_id=guild.id, category=category, priority=priority)
         try:
-            await target.send(embed=embed, files=files or [])
+            await target.send(embed=embed, files=files)
         except (interactions.errors.Forbidden, interactions.errors.HTTPException) as exc:
             self._internal_log.warning("Gagal mengirim log aktivitas: %s", exc)
             await self.invalidate_cache(guild.id)
@@ -211,7 +400,14 @@ class ActivityLogger:
         if attachments:
             embed.add_field(name="Lampiran", value=attachments, inline=False)
         embed.add_field(name="Link", value=message.jump_url, inline=False)
-        return await self.send_embed(message.guild, embed, channel=channel, category="messages")
+        return await self.send_embed(
+            message.guild,
+            embed,
+            channel=channel,
+            category="messages",
+            user_id=message.author.id,
+            source_channel_id=message.channel.id,
+        )
 
     async def log_message_edit(
         self,
@@ -232,7 +428,14 @@ class ActivityLogger:
         if after.content:
             embed.add_field(name="Sesudah", value=truncate_content(after.content), inline=False)
         embed.add_field(name="Link", value=after.jump_url, inline=False)
-        return await self.send_embed(after.guild, embed, channel=channel, category="messages")
+        return await self.send_embed(
+            after.guild,
+            embed,
+            channel=channel,
+            category="messages",
+            user_id=after.author.id,
+            source_channel_id=after.channel.id,
+        )
 
     async def log_message_delete(
         self,
@@ -254,7 +457,15 @@ class ActivityLogger:
         attachment_display = format_attachments(attachments or [])
         if attachment_display:
             embed.add_field(name="Lampiran", value=attachment_display, inline=False)
-        return await self.send_embed(guild, embed, channel=channel, category="messages")
+        return await self.send_embed(
+            guild,
+            embed,
+            channel=channel,
+            category="messages",
+            priority=PRIORITY_MODERATION,
+            user_id=getattr(getattr(message, "author", None), "id", None),
+            source_channel_id=message.channel.id,
+        )
 
     async def log_bulk_delete(
         self,
@@ -267,7 +478,14 @@ class ActivityLogger:
         count = sum(1 for _ in messages)
         embed = self._base_embed("Bulk Delete", color=interactions.Color.dark_red(), description=f"{count} pesan dihapus.")
         embed.add_field(name="Channel", value=channel_deleted.mention)
-        return await self.send_embed(guild, embed, channel=channel, category="messages")
+        return await self.send_embed(
+            guild,
+            embed,
+            channel=channel,
+            category="messages",
+            priority=PRIORITY_MODERATION,
+            source_channel_id=channel_deleted.id,
+        )
 
     async def log_member_join(self, member: interactions.Member, *, channel: Optional[interactions.GuildText] = None) -> bool:
         guild = member.guild
@@ -276,7 +494,13 @@ class ActivityLogger:
         embed.add_field(name="Akun dibuat", value=interactions.Timestamp.fromdatetime(member.created_at).format(interactions.TimestampStyles.F))
         if member.bot:
             embed.add_field(name="Tipe", value="Bot")
-        return await self.send_embed(guild, embed, channel=channel, category="members")
+        return await self.send_embed(
+            guild,
+            embed,
+            channel=channel,
+            category="members",
+            user_id=member.id,
+        )
 
     async def log_member_remove(self, member: interactions.Member | interactions.User, guild: interactions.Guild, *, channel: Optional[interactions.GuildText] = None) -> bool:
         embed = self._base_embed("Anggota Keluar", color=interactions.Color.from_hex("#E67E22"))  # orange
@@ -284,7 +508,13 @@ class ActivityLogger:
         joined_at = getattr(member, "joined_at", None)
         if joined_at:
             embed.add_field(name="Bergabung", value=interactions.Timestamp.fromdatetime(joined_at).format(interactions.TimestampStyles.F))
-        return await self.send_embed(guild, embed, channel=channel, category="members")
+        return await self.send_embed(
+            guild,
+            embed,
+            channel=channel,
+            category="members",
+            user_id=member.id,
+        )
 
     async def log_member_update(
         self,
@@ -319,7 +549,13 @@ class ActivityLogger:
         embed = self._base_embed("Anggota Diperbarui", color=interactions.Color.blue())
         embed.add_field(name="Pengguna", value=format_user(after), inline=False)
         embed.add_field(name="Perubahan", value="\n".join(changes), inline=False)
-        return await self.send_embed(after.guild, embed, channel=channel, category="members")
+        return await self.send_embed(
+            after.guild,
+            embed,
+            channel=channel,
+            category="members",
+            user_id=after.id,
+        )
 
     async def log_voice_state(
         self,
@@ -355,7 +591,14 @@ class ActivityLogger:
         embed = self._base_embed("Aktivitas Voice", color=interactions.Color.from_hex("#9B59B6"))
         embed.add_field(name="Pengguna", value=format_user(member), inline=False)
         embed.add_field(name="Perubahan", value="\n".join(changes), inline=False)
-        return await self.send_embed(guild, embed, channel=channel, category="voice")
+        return await self.send_embed(
+            guild,
+            embed,
+            channel=channel,
+            category="voice",
+            user_id=member.id,
+            source_channel_id=getattr(after.channel or before.channel, "id", None),
+        )
 
     async def log_channel_event(
         self,
@@ -373,7 +616,13 @@ class ActivityLogger:
         if old_name or new_name:
             embed.add_field(name="Nama", value=f"{old_name or '-'} → {new_name or '-'}", inline=False)
         embed.add_field(name="ID", value=f"`{channel_obj.id}`")
-        return await self.send_embed(guild, embed, channel=channel, category="server")
+        return await self.send_embed(
+            guild,
+            embed,
+            channel=channel,
+            category="server",
+            source_channel_id=channel_obj.id,
+        )
 
     async def log_role_event(
         self,
@@ -408,7 +657,13 @@ class ActivityLogger:
         if parent:
             embed.add_field(name="Parent", value=parent.mention)
         embed.add_field(name="ID", value=f"`{thread.id}`")
-        return await self.send_embed(guild, embed, channel=channel, category="server")
+        return await self.send_embed(
+            guild,
+            embed,
+            channel=channel,
+            category="server",
+            source_channel_id=thread.id,
+        )
 
     async def log_reaction(
         self,
@@ -428,7 +683,14 @@ class ActivityLogger:
         embed.add_field(name="Channel", value=message.channel.mention)
         embed.add_field(name="Emote", value=str(reaction.emoji))
         embed.add_field(name="Link", value=message.jump_url, inline=False)
-        return await self.send_embed(guild, embed, channel=channel, category="reactions")
+        return await self.send_embed(
+            guild,
+            embed,
+            channel=channel,
+            category="reactions",
+            user_id=user.id,
+            source_channel_id=message.channel.id,
+        )
 
     async def log_app_command(
         self,
@@ -456,7 +718,14 @@ class ActivityLogger:
         embed.add_field(name="Perintah", value=command_name)
         if not succeeded and error:
             embed.add_field(name="Error", value=truncate_content(str(error), limit=512), inline=False)
-        return await self.send_embed(guild, embed, channel=channel, category="commands")
+        return await self.send_embed(
+            guild,
+            embed,
+            channel=channel,
+            category="commands",
+            user_id=interaction.author.id,
+            source_channel_id=getattr(interaction.channel, "id", None),
+        )
 
     async def log_prefix_command(
         self,
@@ -479,4 +748,11 @@ class ActivityLogger:
         embed.add_field(name="Perintah", value=command_name)
         if not succeeded and error:
             embed.add_field(name="Error", value=truncate_content(str(error), limit=512), inline=False)
-        return await self.send_embed(guild, embed, channel=channel, category="commands")
+        return await self.send_embed(
+            guild,
+            embed,
+            channel=channel,
+            category="commands",
+            user_id=ctx.author.id,
+            source_channel_id=getattr(ctx.channel, "id", None),
+        )
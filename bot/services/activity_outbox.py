@@ -0,0 +1,322 @@
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional, Sequence
+
+import interactions
+
+from .logging import get_logger
+
+if TYPE_CHECKING:
+    from .webhook_sink import WebhookLogSink
+
+
+__all__ = [
+    "ActivityLogOutbox",
+    "CATEGORY_PRIORITIES",
+    "MAX_EMBEDS_PER_MESSAGE",
+    "MAX_EMBED_TOTAL_CHARS",
+    "OVERFLOW_POLICIES",
+    "PRIORITY_CHATTER",
+    "PRIORITY_DEFAULT",
+    "PRIORITY_MODERATION",
+    "build_summary_embed",
+]
+
+
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_TOTAL_CHARS = 6000
+SUMMARY_DESCRIPTION_LIMIT = 4096
+SUMMARY_LINE_LIMIT = 160
+
+PRIORITY_MODERATION = 0
+PRIORITY_DEFAULT = 1
+PRIORITY_CHATTER = 2
+CATEGORY_PRIORITIES: dict[str, int] = {
+    "members": PRIORITY_MODERATION,
+    "server": PRIORITY_MODERATION,
+    "commands": PRIORITY_DEFAULT,
+    "voice": PRIORITY_DEFAULT,
+    "messages": PRIORITY_CHATTER,
+    "reactions": PRIORITY_CHATTER,
+}
+OVERFLOW_POLICIES = frozenset({"drop", "summarize"})
+
+FailureCallback = Callable[[int, BaseException], Awaitable[None]]
+
+
+def _pack_batches(embeds: Sequence[interactions.Embed]) -> list[list[interactions.Embed]]:
+    """Kelompokkan embed berurutan per pesan: maks. 10 embed dan 6000 karakter total."""
+
+    batches: list[list[interactions.Embed]] = []
+    current: list[interactions.Embed] = []
+    used = 0
+    for embed in embeds:
+        size = len(embed)
+        if current and (len(current) >= MAX_EMBEDS_PER_MESSAGE or used + size > MAX_EMBED_TOTAL_CHARS):
+            batches.append(current)
+            current, used = [], 0
+        current.append(embed)
+        used += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _summary_line(embed: interactions.Embed) -> str:
+    parts: list[str] = [f"**{embed.title or 'Log'}**"]
+    for embed_field in embed.fields[:3]:
+        value = " ".join(str(embed_field.value).split())
+        parts.append(f"{embed_field.name}: {value}")
+    line = " — ".join(parts)
+    if len(line) > SUMMARY_LINE_LIMIT:
+        line = line[: SUMMARY_LINE_LIMIT - 1] + "…"
+    return line
+
+
+def build_summary_embed(embeds: Sequence[interactions.Embed]) -> interactions.Embed:
+    """Ringkas beberapa embed log menjadi satu embed berisi daftar baris."""
+
+    lines: list[str] = []
+    used = 0
+    for index, embed in enumerate(embeds):
+        line = _summary_line(embed)
+        remaining = len(embeds) - index
+        if used + len(line) + 1 > SUMMARY_DESCRIPTION_LIMIT - 32:
+            lines.append(f"+{remaining} log lainnya")
+            break
+        lines.append(line)
+        used += len(line) + 1
+
+    first = embeds[0] if embeds else None
+    summary = interactions.Embed(
+        title=f"Ringkasan Log ({len(embeds)} aktivitas)",
+        description="\n".join(lines),
+        color=getattr(first, "color", None),
+        timestamp=getattr(first, "timestamp", None),
+    )
+    return summary
+
+
+def _skipped_embed(skipped: Counter[str]) -> interactions.Embed:
+    total = sum(skipped.values())
+    lines = [f"• `{category}`: {count} log" for category, count in skipped.most_common()]
+    return interactions.Embed(
+        title=f"{total} Log Dilewati",
+        description="Antrean log penuh, sebagian aktivitas hanya dicatat sebagai jumlah.\n" + "\n".join(lines),
+        color=interactions.Color.from_hex("#95A5A6"),
+    )
+
+
+@dataclass(slots=True)
+class _QueuedLog:
+    priority: int
+    channel: Any
+    embed: interactions.Embed
+    category: str
+
+
+@dataclass(slots=True)
+class _GuildQueue:
+    guild_id: int
+    lanes: dict[int, deque[_QueuedLog]] = field(default_factory=dict)
+    size: int = 0
+    skipped: Counter[str] = field(default_factory=Counter)
+    skipped_channel: Any = None
+    worker: Optional[asyncio.Task[None]] = None
+
+    def push(self, item: _QueuedLog) -> None:
+        self.lanes.setdefault(item.priority, deque()).append(item)
+        self.size += 1
+
+    def evict_below(self, priority: int) -> Optional[_QueuedLog]:
+        """Keluarkan log tertua dengan prioritas lebih rendah dari ``priority``."""
+
+        for lane_priority in sorted(self.lanes, reverse=True):
+            if lane_priority <= priority:
+                break
+            lane = self.lanes[lane_priority]
+            if lane:
+                self.size -= 1
+                return lane.popleft()
+        return None
+
+    def drain(self) -> list[_QueuedLog]:
+        items: list[_QueuedLog] = []
+        for lane_priority in sorted(self.lanes):
+            lane = self.lanes[lane_priority]
+            items.extend(lane)
+            lane.clear()
+        self.size = 0
+        return items
+
+
+class ActivityLogOutbox:
+    """Antrean pengiriman log aktivitas yang tidak pernah memblokir event handler.
+
+    ``submit`` hanya memasukkan embed ke antrean terbatas per guild lalu kembali.
+    Worker per guild menunggu sebentar (``flush_interval``), mengosongkan antrean
+    sesuai kelas prioritas (moderasi lebih dulu daripada pesan/reaksi), dan
+    mengirim hingga 10 embed dan 6000 karakter Discord per pesan per channel;
+    hanya embed tunggal yang melebihi 6000 karakter yang diganti embed
+    ringkasan. Jika ``sink``
+    webhook diberikan, batch dikirim lewat webhook channel tersebut.
+
+    Saat antrean penuh, log berprioritas terendah dibuang (``drop``) atau
+    dihitung dan dilaporkan sebagai ringkasan jumlah (``summarize``).
+    """
+
+    def __init__(
+        self,
+        *,
+        flush_interval: float = 1.5,
+        max_pending: int = 500,
+        overflow: str = "summarize",
+        on_failure: Optional[FailureCallback] = None,
+        sink: Optional[WebhookLogSink] = None,
+    ) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Kebijakan overflow tidak dikenal: {overflow}")
+        self.flush_interval = max(0.0, flush_interval)
+        self.max_pending = max(1, max_pending)
+        self.overflow = overflow
+        self._queues: dict[int, _GuildQueue] = {}
+        self._on_failure = on_failure
+        self.sink = sink
+        self._closing = asyncio.Event()
+        self._log = get_logger("ActivityLogOutbox")
+        self.submitted = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.messages_sent = 0
+        self.embeds_sent = 0
+        self.summaries_sent = 0
+
+    def pending(self, guild_id: Optional[int] = None) -> int:
+        if guild_id is not None:
+            queue = self._queues.get(guild_id)
+            return queue.size if queue else 0
+        return sum(queue.size for queue in self._queues.values())
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "pending": self.pending(),
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "messages_sent": self.messages_sent,
+            "embeds_sent": self.embeds_sent,
+            "summaries_sent": self.summaries_sent,
+        }
+
+    def submit(
+        self,
+        channel: Any,
+        embed: interactions.Embed,
+        *,
+        guild_id: int,
+        category: Optional[str] = None,
+        priority: Optional[int] = None,
+    ) -> bool:
+        """Masukkan embed ke antrean guild; ``False`` jika log ini dibuang."""
+
+        category = category or "lainnya"
+        if priority is None:
+            priority = CATEGORY_PRIORITIES.get(category, PRIORITY_DEFAULT)
+        item = _QueuedLog(priority=priority, channel=channel, embed=embed, category=category)
+
+        queue = self._queues.get(guild_id)
+        if queue is None:
+            queue = _GuildQueue(guild_id=guild_id)
+            self._queues[guild_id] = queue
+
+        self.submitted += 1
+        accepted = True
+        if queue.size >= self.max_pending:
+            victim = queue.evict_below(priority)
+            if victim is None:
+                victim = item
+                accepted = False
+            self._discard(queue, victim)
+        if accepted:
+            queue.push(item)
+
+        self._ensure_worker(queue)
+        return accepted
+
+    def _discard(self, queue: _GuildQueue, item: _QueuedLog) -> None:
+        if self.overflow == "summarize":
+            self.coalesced += 1
+            queue.skipped[item.category] += 1
+            queue.skipped_channel = item.channel
+        else:
+            self.dropped += 1
+
+    def _ensure_worker(self, queue: _GuildQueue) -> None:
+        if queue.worker is None or queue.worker.done():
+            queue.worker = asyncio.create_task(self._run_worker(queue))
+
+    async def _run_worker(self, queue: _GuildQueue) -> None:
+        while queue.size or queue.skipped:
+            if self.flush_interval and not self._closing.is_set():
+                try:
+                    await asyncio.wait_for(self._closing.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            await self._flush_queue(queue)
+
+    async def _flush_queue(self, queue: _GuildQueue) -> None:
+        per_channel: dict[int, tuple[Any, list[interactions.Embed]]] = {}
+        for item in queue.drain():
+            _, embeds = per_channel.setdefault(item.channel.id, (item.channel, []))
+            embeds.append(item.embed)
+
+        if queue.skipped and queue.skipped_channel is not None:
+            channel = queue.skipped_channel
+            _, embeds = per_channel.setdefault(channel.id, (channel, []))
+            embeds.append(_skipped_embed(queue.skipped))
+            queue.skipped = Counter()
+            queue.skipped_channel = None
+
+        for channel, embeds in per_channel.values():
+            for batch in _pack_batches(embeds):
+                await self._send_batch(queue.guild_id, channel, batch)
+
+    async def _send_batch(self, guild_id: int, channel: Any, batch: list[interactions.Embed]) -> None:
+        # Hanya embed tunggal yang melebihi batas total yang diringkas;
+        # batch lain sudah dipecah oleh :func:`_pack_batches`.
+        summarized = sum(len(embed) for embed in batch) > MAX_EMBED_TOTAL_CHARS
+        embeds = [build_summary_embed(batch)] if summarized else batch
+        try:
+            await self._deliver(channel, embeds)
+        except (interactions.errors.Forbidden, interactions.errors.HTTPException) as exc:
+            self._log.warning("Gagal mengirim %s log aktivitas ke channel %s: %s", len(batch), channel.id, exc)
+            if self._on_failure is not None:
+                await self._on_failure(guild_id, exc)
+            return
+        self.messages_sent += 1
+        self.embeds_sent += len(batch)
+        if summarized:
+            self.summaries_sent += 1
+
+    async def _deliver(self, channel: Any, embeds: list[interactions.Embed]) -> None:
+        if self.sink is not None and self.sink.supports(channel.id):
+            try:
+                await self.sink.send(channel, embeds)
+                return
+            except interactions.errors.Forbidden:
+                pass
+        await channel.send(embeds=embeds)
+
+    async def flush(self) -> None:
+        for queue in list(self._queues.values()):
+            await self._flush_queue(queue)
+
+    async def close(self) -> None:
+        self._closing.set()
+        workers = [queue.worker for queue in self._queues.values() if queue.worker is not None]
+        if workers:
+            await asyncio.gather(*workers, return_exceptions=True)
+        await self.flush()
@@ -1,14 +1,49 @@
 from __future__ import annotations
 
+import asyncio
+import heapq
 import re
-from dataclasses import dataclass
-from typing import Iterable
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
 
 from bot.database.repositories import AutomodRule
 
+try:  # Python 3.11+
+    from re import _constants as _sre_constants, _parser as _sre_parser
+except ImportError:  # pragma: no cover - Python < 3.11
+    import sre_constants as _sre_constants  # type: ignore[no-redef]
+    import sre_parse as _sre_parser  # type: ignore[no-redef]
+
+from .logging import get_logger
+
 
 LINK_REGEX = re.compile(r"https?://[^\s]+", re.IGNORECASE)
 
+# Aturan yang mahal dievaluasi (regex pack, fuzzy match, dll) dijalankan di
+# process pool bila executor diaktifkan. Aturan lain tetap dicek inline.
+HEAVY_RULE_TYPES: frozenset[str] = frozenset({"regex_pack"})
+
+HEAVY_FALLBACK_ALLOW = "allow"
+HEAVY_FALLBACK_BLOCK = "block"
+
+MAX_REGEX_PATTERNS = 50
+
+FLOOD_SHINGLE_SIZE = 5
+FLOOD_SKETCH_SIZE = 16
+FLOOD_MAX_CONTENT = 512
+FLOOD_WINDOW_CAPACITY = 256
+FLOOD_DEFAULTS: dict[str, float | int] = {
+    "min_users": 4,
+    "window_seconds": 30,
+    "similarity": 0.8,
+    "min_length": 10,
+}
+
+_NON_WORD_REGEX = re.compile(r"[\W_]+", re.UNICODE)
+
 
 @dataclass(slots=True)
 class AutomodViolation:
@@ -16,16 +51,413 @@ class AutomodViolation:
     reason: str
 
 
+@dataclass(frozen=True, slots=True)
+class HeavyRule:
+    """Aturan berat yang sudah dikompilasi dan aman untuk di-pickle."""
+
+    rule_type: str
+    patterns: tuple[re.Pattern[str], ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledRuleSet:
+    """Kumpulan aturan automod satu guild yang siap dievaluasi."""
+
+    cheap: tuple[AutomodRule, ...] = ()
+    heavy: tuple[HeavyRule, ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.cheap or self.heavy)
+
+
+def compile_regex_patterns(raw_patterns: object) -> tuple[re.Pattern[str], ...]:
+    if not isinstance(raw_patterns, list):
+        return ()
+    compiled: list[re.Pattern[str]] = []
+    for raw in raw_patterns[:MAX_REGEX_PATTERNS]:
+        if not isinstance(raw, str) or not raw.strip():
+            continue
+        try:
+            compiled.append(re.compile(raw, re.IGNORECASE))
+        except re.error:
+            continue
+    return tuple(compiled)
+
+
+_REPEAT_OPCODES = tuple(
+    getattr(_sre_constants, name)
+    for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+    if hasattr(_sre_constants, name)
+)
+
+
+def _contains_repeat(items: Any) -> bool:
+    for op, av in items:
+        if op in _REPEAT_OPCODES:
+            _, maximum, _ = av
+            if maximum > 1:
+                return True
+        if _contains_repeat(_sub_patterns(op, av)):
+            return True
+    return False
+
+
+def _sub_patterns(op: Any, av: Any) -> list[tuple[Any, Any]]:
+    if op in _REPEAT_OPCODES:
+        return list(av[2])
+    if op is _sre_constants.SUBPATTERN:
+        return list(av[-1])
+    if op is _sre_constants.BRANCH:
+        return [item for branch in av[1] for item in branch]
+    if op in (_sre_constants.ASSERT, _sre_constants.ASSERT_NOT):
+        return list(av[1])
+    return []
+
+
+def _has_nested_repeat(items: Any) -> bool:
+    for op, av in items:
+        if op in _REPEAT_OPCODES:
+            _, maximum, body = av
+            if maximum > 1 and _contains_repeat(body):
+                return True
+        if _has_nested_repeat(_sub_patterns(op, av)):
+            return True
+    return False
+
+
+def is_catastrophic_pattern(raw: str) -> bool:
+    """Deteksi pola rawan backtracking eksponensial seperti ``(a+)+`` atau ``(.*)*``.
+
+    Heuristiknya konservatif: kuantifier berulang (maksimum > 1) yang
+    membungkus kuantifier berulang lain ditolak, karena mesin regex Python
+    bisa mencoba kombinasi pembagian teks yang jumlahnya eksponensial.
+    """
+
+    try:
+        parsed = _sre_parser.parse(raw, re.IGNORECASE)
+    except (re.error, RecursionError):
+        return False
+    return _has_nested_repeat(parsed)
+
+
+def find_unsafe_regex_patterns(raw_patterns: Iterable[str]) -> list[str]:
+    return [raw for raw in raw_patterns if is_catastrophic_pattern(raw)]
+
+
+def normalize_for_fingerprint(content: str) -> str:
+    lowered = content[: FLOOD_MAX_CONTENT * 2].lower()
+    return " ".join(_NON_WORD_REGEX.sub(" ", lowered).split())[:FLOOD_MAX_CONTENT]
+
+
+def content_fingerprint(normalized: str) -> frozenset[int]:
+    """Sketch bottom-k dari shingle karakter; pesan yang mirip menghasilkan sketch yang beririsan."""
+
+    if not normalized:
+        return frozenset()
+    if len(normalized) <= FLOOD_SHINGLE_SIZE:
+        return frozenset({hash(normalized)})
+    shingles = {
+        hash(normalized[index : index + FLOOD_SHINGLE_SIZE])
+        for index in range(len(normalized) - FLOOD_SHINGLE_SIZE + 1)
+    }
+    return frozenset(heapq.nsmallest(FLOOD_SKETCH_SIZE, shingles))
+
+
+def fingerprint_similarity(first: frozenset[int], second: frozenset[int]) -> float:
+    if not first or not second:
+        return 0.0
+    if first == second:
+        return 1.0
+    shared = len(first & second)
+    if not shared:
+        return 0.0
+    return shared / len(first | second)
+
+
+@dataclass(slots=True)
+class _FloodEntry:
+    timestamp: float
+    user_id: int
+    fingerprint: frozenset[int]
+
+
+@dataclass(slots=True)
+class _FloodWindow:
+    entries: deque[_FloodEntry] = field(default_factory=deque)
+    postings: dict[int, list[_FloodEntry]] = field(default_factory=dict)
+
+    def append(self, entry: _FloodEntry) -> None:
+        self.entries.append(entry)
+        for value in entry.fingerprint:
+            self.postings.setdefault(value, []).append(entry)
+
+    def popleft(self) -> None:
+        entry = self.entries.popleft()
+        for value in entry.fingerprint:
+            bucket = self.postings.get(value)
+            if not bucket:
+                continue
+            # Entri tertua selalu berada di depan bucket karena urutan append terjaga.
+            if bucket[0] is entry:
+                bucket.pop(0)
+            else:
+                bucket.remove(entry)
+            if not bucket:
+                del self.postings[value]
+
+
+class DuplicateFloodTracker:
+    """Jendela bergulir fingerprint konten per guild dengan kapasitas tetap.
+
+    Fingerprint diindeks per nilai hash sehingga setiap pesan hanya dibandingkan
+    dengan entri yang berbagi minimal satu shingle, bukan seluruh jendela.
+    """
+
+    def __init__(self, *, capacity: int = FLOOD_WINDOW_CAPACITY) -> None:
+        self._capacity = max(1, capacity)
+        self._windows: dict[int, _FloodWindow] = {}
+
+    def observe(
+        self,
+        guild_id: int,
+        user_id: int,
+        content: str,
+        *,
+        timestamp: float,
+        payload: dict[str, object],
+    ) -> bool:
+        min_users = _payload_number(payload, "min_users", int, minimum=2)
+        window_seconds = _payload_number(payload, "window_seconds", float, minimum=1)
+        similarity = min(_payload_number(payload, "similarity", float, minimum=0.1), 1.0)
+        min_length = _payload_number(payload, "min_length", int, minimum=1)
+
+        window = self._windows.get(guild_id)
+        if window is None:
+            window = _FloodWindow()
+            self._windows[guild_id] = window
+        cutoff = timestamp - window_seconds
+        while window.entries and window.entries[0].timestamp < cutoff:
+            window.popleft()
+
+        normalized = normalize_for_fingerprint(content)
+        if len(normalized) < min_length:
+            return False
+        fingerprint = content_fingerprint(normalized)
+
+        users = {user_id}
+        seen: set[int] = set()
+        for value in fingerprint:
+            for entry in window.postings.get(value, ()):
+                marker = id(entry)
+                if marker in seen or entry.user_id in users:
+                    continue
+                seen.add(marker)
+                if fingerprint_similarity(entry.fingerprint, fingerprint) >= similarity:
+                    users.add(entry.user_id)
+
+        if len(window.entries) >= self._capacity:
+            window.popleft()
+        window.append(_FloodEntry(timestamp=timestamp, user_id=user_id, fingerprint=fingerprint))
+        return len(users) >= min_users
+
+    def reset(self, guild_id: int) -> None:
+        self._windows.pop(guild_id, None)
+
+
+def _payload_number(payload: dict[str, object], key: str, kind: type, *, minimum: float) -> Any:
+    value = payload.get(key, FLOOD_DEFAULTS[key])
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        value = FLOOD_DEFAULTS[key]
+    return kind(max(minimum, value))
+
+
+def evaluate_heavy_rules(rules: tuple[HeavyRule, ...], content: str) -> list[AutomodViolation]:
+    """Evaluasi aturan berat. Fungsi level modul agar bisa dipanggil dari worker process."""
+
+    violations: list[AutomodViolation] = []
+    if not content:
+        return violations
+    for rule in rules:
+        if rule.rule_type == "regex_pack":
+            if any(pattern.search(content) for pattern in rule.patterns):
+                violations.append(
+                    AutomodViolation(
+                        rule_type=rule.rule_type,
+                        reason="Pesan cocok dengan pola terlarang.",
+                    )
+                )
+    return violations
+
+
 class AutomodEngine:
+    def __init__(
+        self,
+        *,
+        heavy_workers: int = 0,
+        heavy_deadline: float = 0.25,
+        heavy_fallback: str = HEAVY_FALLBACK_ALLOW,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        self._heavy_workers = max(0, int(heavy_workers))
+        self._heavy_deadline = max(0.01, float(heavy_deadline))
+        self._heavy_fallback = heavy_fallback if heavy_fallback in {HEAVY_FALLBACK_ALLOW, HEAVY_FALLBACK_BLOCK} else HEAVY_FALLBACK_ALLOW
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._log = get_logger("AutomodEngine")
+        self.deadline_misses = 0
+        self.pool_restarts = 0
+        self.flood_tracker = DuplicateFloodTracker()
+
+    @property
+    def offload_enabled(self) -> bool:
+        return self._executor is not None or self._heavy_workers > 0
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self._executor is None and self._heavy_workers > 0:
+            self._executor = ProcessPoolExecutor(max_workers=self._heavy_workers)
+        return self._executor
+
+    def close(self) -> None:
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    def _recycle_executor(self) -> None:
+        """Hentikan pool yang worker-nya macet lalu biarkan :meth:`_get_executor` membuat yang baru.
+
+        ``wait_for`` hanya berhenti menunggu; worker tetap menjalankan regex
+        yang macet. Tanpa recycle, satu pola katastrofik bisa menyandera
+        seluruh worker sehingga setiap evaluasi berikutnya ikut timeout.
+        Executor dari luar tidak disentuh karena siklus hidupnya milik pemanggil.
+        """
+
+        executor = self._executor
+        if executor is None or not self._owns_executor:
+            return
+        self._executor = None
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            try:
+                process.terminate()
+            except Exception:  # noqa: BLE001
+                continue
+        self.pool_restarts += 1
+        self._log.warning("Process pool automod dihentikan dan akan dibuat ulang (%d worker)", len(processes))
+
+    def compile(self, rules: Iterable[AutomodRule]) -> CompiledRuleSet:
+        cheap: list[AutomodRule] = []
+        heavy: list[HeavyRule] = []
+        for rule in rules:
+            if not rule.is_active:
+                continue
+            if rule.rule_type in HEAVY_RULE_TYPES:
+                payload = rule.payload or {}
+                raw_patterns = payload.get("patterns")
+                if isinstance(raw_patterns, list):
+                    # Pola lama di database bisa lolos dari validasi /automod; jangan jalankan.
+                    unsafe = find_unsafe_regex_patterns(raw for raw in raw_patterns if isinstance(raw, str))
+                    if unsafe:
+                        self._log.warning(
+                            "Mengabaikan %d pola regex rawan backtracking di guild %s: %s",
+                            len(unsafe),
+                            rule.guild_id,
+                            unsafe,
+                        )
+                        raw_patterns = [raw for raw in raw_patterns if raw not in unsafe]
+                patterns = compile_regex_patterns(raw_patterns)
+                if patterns:
+                    heavy.append(HeavyRule(rule_type=rule.rule_type, patterns=patterns))
+            else:
+                cheap.append(rule)
+        return CompiledRuleSet(cheap=tuple(cheap), heavy=tuple(heavy))
+
     def evaluate(
         self,
         *,
         content: str,
         mention_count: int,
+        rules: Iterable[AutomodRule] | CompiledRuleSet,
+        author_id: Optional[int] = None,
+        timestamp: Optional[float] = None,
+    ) -> list[AutomodViolation]:
+        compiled = rules if isinstance(rules, CompiledRuleSet) else self.compile(rules)
+        violations = self._evaluate_cheap(
+            content.strip(),
+            mention_count,
+            compiled.cheap,
+            author_id=author_id,
+            timestamp=timestamp,
+        )
+        if compiled.heavy:
+            violations.extend(evaluate_heavy_rules(compiled.heavy, content))
+        return violations
+
+    async def evaluate_async(
+        self,
+        *,
+        content: str,
+        mention_count: int,
+        rules: CompiledRuleSet,
+        author_id: Optional[int] = None,
+        timestamp: Optional[float] = None,
+    ) -> list[AutomodViolation]:
+        """Evaluasi aturan murah inline dan aturan berat di process pool dengan batas waktu."""
+
+        violations = self._evaluate_cheap(
+            content.strip(),
+            mention_count,
+            rules.cheap,
+            author_id=author_id,
+            timestamp=timestamp,
+        )
+        if violations or not rules.heavy:
+            return violations
+
+        executor = self._get_executor()
+        if executor is None:
+            violations.extend(evaluate_heavy_rules(rules.heavy, content))
+            return violations
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(executor, evaluate_heavy_rules, rules.heavy, content)
+        try:
+            heavy_violations = await asyncio.wait_for(future, timeout=self._heavy_deadline)
+        except asyncio.TimeoutError:
+            self.deadline_misses += 1
+            self._log.warning(
+                "Evaluasi aturan automod berat melewati batas %.0f ms; memakai verdict '%s'",
+                self._heavy_deadline * 1000,
+                self._heavy_fallback,
+            )
+            self._recycle_executor()
+            return self._fallback_verdict(rules.heavy)
+        except Exception:  # noqa: BLE001
+            self._log.exception("Worker automod gagal mengevaluasi aturan berat")
+            return self._fallback_verdict(rules.heavy)
+        violations.extend(heavy_violations)
+        return violations
+
+    def _fallback_verdict(self, heavy: tuple[HeavyRule, ...]) -> list[AutomodViolation]:
+        if self._heavy_fallback != HEAVY_FALLBACK_BLOCK or not heavy:
+            return []
+        return [
+            AutomodViolation(
+                rule_type=heavy[0].rule_type,
+                reason="Pesan tidak dapat diverifikasi automod tepat waktu.",
+            )
+        ]
+
+    def _evaluate_cheap(
+        self,
+        normalized: str,
+        mention_count: int,
         rules: Iterable[AutomodRule],
+        *,
+        author_id: Optional[int] = None,
+        timestamp: Optional[float] = None,
     ) -> list[AutomodViolation]:
         violations: list[AutomodViolation] = []
-        normalized = content.strip()
 
         for rule in rules:
             if not rule.is_active:
@@ -55,6 +487,23 @@ class AutomodEngine:
                             reason="Pesan didominasi huruf kapital.",
                         )
                     )
+            elif rule.rule_type == "duplicate_flood":
+                if author_id is None:
+                    continue
+                observed_at = timestamp if timestamp is not None else time.time()
+                if self.flood_tracker.observe(
+                    rule.guild_id,
+                    author_id,
+                    normalized,
+                    timestamp=observed_at,
+                    payload=payload,
+                ):
+                    violations.append(
+                        AutomodViolation(
+                            rule_type=rule.rule_type,
+                            reason="Pesan serupa dikirim banyak akun dalam waktu singkat.",
+                        )
+                    )
         return violations
 
     def _violates_link_filter(self, content: str, payload: dict[str, object]) -> bool:
@@ -106,4 +555,16 @@ class AutomodEngine:
         return domain.lower()
 
 
-__all__ = ["AutomodEngine", "AutomodViolation"]
+__all__ = [
+    "AutomodEngine",
+    "AutomodViolation",
+    "CompiledRuleSet",
+    "DuplicateFloodTracker",
+    "HeavyRule",
+    "HEAVY_RULE_TYPES",
+    "content_fingerprint",
+    "evaluate_heavy_rules",
+    "find_unsafe_regex_patterns",
+    "fingerprint_similarity",
+    "is_catastrophic_pattern",
+]
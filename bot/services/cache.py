@@ -2,26 +2,93 @@ from __future__ import annotations
 
 import asyncio
 import time
+from collections import OrderedDict
 from typing import Any, Awaitable, Callable, Optional
 
 
+class SingleFlight:
+    """Gabungkan pemanggilan serentak untuk kunci yang sama menjadi satu.
+
+    Pemanggil pertama menjalankan ``factory``; pemanggil lain dengan kunci
+    yang sama selama permintaan itu belum selesai cukup menunggu future yang
+    sama. Jumlah panggilan dan yang digabung dicatat per kunci (maksimal
+    ``max_tracked`` kunci terakhir).
+    """
+
+    def __init__(self, *, max_tracked: int = 256) -> None:
+        self.max_tracked = max(1, max_tracked)
+        self._inflight: dict[str, asyncio.Future[Any]] = {}
+        self._stats: OrderedDict[str, list[int]] = OrderedDict()
+
+    def _track(self, key: str, coalesced: bool) -> None:
+        counters = self._stats.pop(key, None) or [0, 0]
+        counters[0] += 1
+        if coalesced:
+            counters[1] += 1
+        self._stats[key] = counters
+        while len(self._stats) > self.max_tracked:
+            self._stats.popitem(last=False)
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            self._track(key, False)
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self._track(key, True)
+        # shield: pembatalan satu pemanggil tidak boleh membatalkan pemanggil lain.
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Future[Any]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Tandai exception sudah dibaca jika semua pemanggil sudah pergi.
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {key: {"calls": calls, "coalesced": coalesced} for key, (calls, coalesced) in self._stats.items()}
+
+    def total_coalesced(self) -> int:
+        return sum(coalesced for _, coalesced in self._stats.values())
+
+
 class TTLCache:
-    """Cache sederhana dengan TTL (detik)."""
+    """Cache sederhana dengan TTL (detik).
+
+    Lock hanya menjaga akses ke penyimpanan; pemuatan nilai yang hilang
+    berjalan di luar lock dan digabung per kunci lewat :class:`SingleFlight`,
+    sehingga kunci berbeda dapat dimuat bersamaan.
+    """
 
     def __init__(self, ttl: int = 60) -> None:
         self._ttl = ttl
         self._store: dict[str, tuple[float, Any]] = {}
         self._lock = asyncio.Lock()
+        self.flights = SingleFlight()
 
-    async def get_or_set(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+    async def _lookup(self, key: str) -> tuple[bool, Any]:
         async with self._lock:
             value = self._store.get(key)
-            now = time.time()
-            if value and value[0] > now:
-                return value[1]
-            data = await factory()
-            self._store[key] = (now + self._ttl, data)
-            return data
+            if value and value[0] > time.time():
+                return True, value[1]
+            return False, None
+
+    async def _load(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        data = await factory()
+        await self.set(key, data)
+        return data
+
+    async def get_or_set(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        found, value = await self._lookup(key)
+        if found:
+            return value
+        return await self.flights.run(key, lambda: self._load(key, factory))
 
     async def set(self, key: str, value: Any) -> None:
         async with self._lock:
@@ -39,3 +106,18 @@ class TTLCache:
     async def invalidate(self, key: str) -> None:
         async with self._lock:
             self._store.pop(key, None)
+
+    async def remaining(self, key: str) -> Optional[float]:
+        """Sisa umur entri dalam detik, atau ``None`` jika tidak ada/kedaluwarsa."""
+
+        async with self._lock:
+            value = self._store.get(key)
+            if not value:
+                return None
+            left = value[0] - time.time()
+            return left if left > 0 else None
+
+    async def refresh(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Hitung ulang entri tanpa menahan lock, lalu ganti nilai lama."""
+
+        return await self.flights.run(key, lambda: self._load(key, factory))
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional
+
+from .logging import get_logger
+
+
+__all__ = ["ContentPool"]
+
+
+# Bobot EWMA untuk jarak antar permintaan pengguna.
+DEMAND_SMOOTHING = 0.3
+
+BatchFetcher = Callable[[], Awaitable[list[Any]]]
+
+
+class ContentPool:
+    """Buffer konten acak (meme, kutipan, lelucon) yang diisi di latar belakang.
+
+    Perintah mengambil item lewat :meth:`take` tanpa menunggu upstream. Task
+    latar belakang mengisi ulang buffer hingga ``capacity``: secepat
+    ``min_interval`` saat buffer di bawah ``low_watermark``, lalu mengikuti
+    laju permintaan (EWMA jarak antar ``take``) dan berhenti total saat buffer
+    penuh. ``min_interval`` adalah batas bawah jeda antar fetch agar tidak
+    melewati rate limit upstream; kegagalan memperpanjang jeda secara
+    eksponensial hingga ``max_interval``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: BatchFetcher,
+        *,
+        capacity: int = 10,
+        low_watermark: Optional[int] = None,
+        min_interval: float = 2.0,
+        max_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self._fetch = fetch
+        self.capacity = max(1, capacity)
+        self.low_watermark = self.capacity // 2 if low_watermark is None else max(0, low_watermark)
+        self.min_interval = max(0.0, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        self._clock = clock
+        self._items: deque[Any] = deque(maxlen=self.capacity)
+        self._wanted = asyncio.Event()
+        self._task: Optional[asyncio.Task[None]] = None
+        self._last_take: Optional[float] = None
+        self._demand_interval: Optional[float] = None
+        self._failures = 0
+        self._log = get_logger(f"ContentPool[{name}]")
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.fetch_failures = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def start(self) -> None:
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._loop(), name=f"forus-content-pool-{self.name}")
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def take(self) -> Optional[Any]:
+        """Ambil satu item, atau ``None`` jika buffer sedang kosong."""
+
+        now = self._clock()
+        if self._last_take is not None:
+            gap = now - self._last_take
+            if self._demand_interval is None:
+                self._demand_interval = gap
+            else:
+                self._demand_interval += DEMAND_SMOOTHING * (gap - self._demand_interval)
+        self._last_take = now
+        self._wanted.set()
+        if not self._items:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._items.popleft()
+
+    def add(self, items: list[Any]) -> int:
+        free = self.capacity - len(self._items)
+        accepted = items[:free]
+        self._items.extend(accepted)
+        return len(accepted)
+
+    async def fill_once(self) -> int:
+        """Jalankan satu fetch upstream dan masukkan hasilnya ke buffer."""
+
+        self.fetches += 1
+        try:
+            items = await self._fetch()
+        except Exception as exc:  # noqa: BLE001
+            self.fetch_failures += 1
+            self._failures += 1
+            self._log.warning("Gagal mengisi pool %s: %s", self.name, exc)
+            return 0
+        self._failures = 0
+        return self.add(items)
+
+    def next_delay(self) -> float:
+        if self._failures:
+            return min(self.max_interval, max(self.min_interval, 1.0) * (2 ** self._failures))
+        if len(self._items) < self.low_watermark or self._demand_interval is None:
+            return self.min_interval
+        # Isi sedikit lebih cepat dari laju konsumsi.
+        return min(self.max_interval, max(self.min_interval, self._demand_interval / 2))
+
+    async def _loop(self) -> None:
+        while True:
+            if len(self._items) >= self.capacity:
+                self._wanted.clear()
+                await self._wanted.wait()
+                continue
+            await self.fill_once()
+            await asyncio.sleep(self.next_delay())
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "size": len(self._items),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "fetches": self.fetches,
+            "fetch_failures": self.fetch_failures,
+        }
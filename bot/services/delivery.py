@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Generic, Hashable, Optional, Sequence, TypeVar
+
+from .logging import get_logger
+
+
+__all__ = ["DeliveryExecutor", "DeliveryResult"]
+
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class DeliveryResult(Generic[T]):
+    item: T
+    ok: bool
+    error: Optional[BaseException] = None
+
+
+class DeliveryExecutor:
+    """Pengirim batch konkuren dengan batas global dan batas per channel.
+
+    Dipakai saat banyak pengingat/pengumuman jatuh tempo bersamaan: semua
+    item dikirim paralel, tetapi tidak lebih dari ``global_limit`` sekaligus
+    dan tidak lebih dari ``per_channel_limit`` ke channel yang sama, sehingga
+    satu channel sibuk tidak memicu rate limit untuk channel lain. Hasil
+    dikembalikan per item agar pemanggil dapat mencatatnya dalam satu tulis.
+    """
+
+    def __init__(self, *, global_limit: int = 8, per_channel_limit: int = 1) -> None:
+        self.global_limit = max(1, global_limit)
+        self.per_channel_limit = max(1, per_channel_limit)
+        self._global = asyncio.Semaphore(self.global_limit)
+        self._log = get_logger("DeliveryExecutor")
+        self.delivered = 0
+        self.failed = 0
+
+    async def run(
+        self,
+        items: Sequence[T],
+        send: Callable[[T], Awaitable[Any]],
+        *,
+        channel_of: Callable[[T], Hashable],
+    ) -> list[DeliveryResult[T]]:
+        channel_limits: dict[Hashable, asyncio.Semaphore] = {}
+
+        async def _deliver(item: T) -> DeliveryResult[T]:
+            channel_key = channel_of(item)
+            channel_limit = channel_limits.setdefault(channel_key, asyncio.Semaphore(self.per_channel_limit))
+            async with channel_limit, self._global:
+                try:
+                    await send(item)
+                except Exception as exc:  # noqa: BLE001
+                    self.failed += 1
+                    self._log.warning("Gagal mengirim item terjadwal ke %s: %s", channel_key, exc)
+                    return DeliveryResult(item=item, ok=False, error=exc)
+            self.delivered += 1
+            return DeliveryResult(item=item, ok=True)
+
+        if not items:
+            return []
+        return list(await asyncio.gather(*(_deliver(item) for item in items)))
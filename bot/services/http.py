@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Mapping, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .logging import get_logger
+
+
+__all__ = [
+    "CircuitOpenError",
+    "DEFAULT_ENDPOINT_POLICIES",
+    "EndpointPolicy",
+    "HTTPClient",
+    "HTTPRequestError",
+]
+
+
+class HTTPRequestError(RuntimeError):
+    """Permintaan HTTP keluar gagal setelah semua percobaan ulang."""
+
+    def __init__(self, message: str, *, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(HTTPRequestError):
+    """Host sedang dianggap mati; permintaan ditolak tanpa menyentuh jaringan."""
+
+
+@dataclass(slots=True)
+class EndpointPolicy:
+    timeout: float = 10.0
+    retries: int = 2
+    failure_threshold: int = 5
+    reset_after: float = 30.0
+
+
+DEFAULT_ENDPOINT_POLICIES: dict[str, EndpointPolicy] = {
+    "api.myquran.com": EndpointPolicy(timeout=15.0),
+    "api.waktusolat.app": EndpointPolicy(timeout=15.0),
+    "meme-api.com": EndpointPolicy(timeout=8.0, retries=1),
+    "zenquotes.io": EndpointPolicy(timeout=8.0, retries=1),
+    "v2.jokeapi.dev": EndpointPolicy(timeout=8.0, retries=1),
+}
+
+
+@dataclass(slots=True)
+class _CircuitBreaker:
+    failures: int = 0
+    opened_at: Optional[float] = None
+    probing: bool = False
+
+    def allow(self, policy: EndpointPolicy, now: float) -> bool:
+        if self.opened_at is None:
+            return True
+        if now - self.opened_at < policy.reset_after or self.probing:
+            return False
+        # Half-open: izinkan satu permintaan uji setelah masa tunggu.
+        self.probing = True
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self, policy: EndpointPolicy, now: float) -> None:
+        self.failures += 1
+        self.probing = False
+        if self.opened_at is not None or self.failures >= policy.failure_threshold:
+            self.opened_at = now
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, status: int) -> None:
+        super().__init__(status)
+        self.status = status
+
+
+@dataclass(slots=True)
+class _HostStats:
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    rejected: int = 0
+    breaker: _CircuitBreaker = field(default_factory=_CircuitBreaker)
+
+
+class HTTPClient:
+    """Klien HTTP bersama milik ``ForUS`` untuk semua API eksternal.
+
+    Satu ``aiohttp.ClientSession`` dipakai ulang (keep-alive) dengan batas
+    koneksi total dan per host serta cache DNS. Setiap host punya
+    :class:`EndpointPolicy` untuk timeout, jumlah percobaan ulang GET dengan
+    backoff acak, dan circuit breaker yang langsung menolak permintaan selama
+    host tersebut berulang kali gagal.
+    """
+
+    def __init__(
+        self,
+        *,
+        limit: int = 64,
+        limit_per_host: int = 8,
+        dns_cache_ttl: int = 300,
+        policies: Optional[Mapping[str, EndpointPolicy]] = None,
+        default_policy: Optional[EndpointPolicy] = None,
+        backoff_base: float = 0.5,
+        backoff_max: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.policies = dict(DEFAULT_ENDPOINT_POLICIES if policies is None else policies)
+        self.default_policy = default_policy or EndpointPolicy()
+        self.backoff_base = max(0.0, backoff_base)
+        self.backoff_max = max(self.backoff_base, backoff_max)
+        self._clock = clock
+        self._sleep = sleep
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._hosts: dict[str, _HostStats] = {}
+        self._log = get_logger("HTTPClient")
+
+    def _ensure_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def policy_for(self, host: str) -> EndpointPolicy:
+        return self.policies.get(host, self.default_policy)
+
+    def _host(self, host: str) -> _HostStats:
+        stats = self._hosts.get(host)
+        if stats is None:
+            stats = self._hosts[host] = _HostStats()
+        return stats
+
+    def is_open(self, url: str) -> bool:
+        """``True`` jika circuit breaker host URL ini sedang terbuka."""
+
+        host = urlsplit(url).hostname or ""
+        stats = self._hosts.get(host)
+        return stats is not None and stats.breaker.opened_at is not None
+
+    def _backoff(self, attempt: int) -> float:
+        ceiling = min(self.backoff_max, self.backoff_base * (2**attempt))
+        return random.uniform(0, ceiling)
+
+    async def get_json(self, url: str, *, params: Optional[Mapping[str, str]] = None) -> Any:
+        host = urlsplit(url).hostname or ""
+        policy = self.policy_for(host)
+        stats = self._host(host)
+        breaker = stats.breaker
+        was_probing = breaker.probing
+        if not breaker.allow(policy, self._clock()):
+            stats.rejected += 1
+            raise CircuitOpenError(f"Layanan {host} sedang tidak tersedia.")
+        is_probe = breaker.probing and not was_probing
+
+        try:
+            return await self._get_json_attempts(url, host, policy, stats, params)
+        finally:
+            # Permintaan uji yang berakhir tanpa hasil (dibatalkan atau error tak
+            # terduga) harus melepas slot probe; jika tidak breaker menolak selamanya.
+            if is_probe and breaker.probing:
+                breaker.probing = False
+
+    async def _get_json_attempts(
+        self,
+        url: str,
+        host: str,
+        policy: EndpointPolicy,
+        stats: _HostStats,
+        params: Optional[Mapping[str, str]],
+    ) -> Any:
+        session = self._ensure_session()
+        timeout = aiohttp.ClientTimeout(total=policy.timeout)
+        last_error: Optional[BaseException] = None
+        status: Optional[int] = None
+        for attempt in range(policy.retries + 1):
+            stats.requests += 1
+            try:
+                async with session.get(url, params=params, timeout=timeout) as response:
+                    if response.status >= 500 or response.status == 429:
+                        raise _RetryableStatus(response.status)
+                    if response.status >= 400:
+                        # Kesalahan klien bukan tanda host mati; jangan hitung ke breaker.
+                        stats.breaker.record_success()
+                        raise HTTPRequestError(
+                            f"Permintaan ke {host} gagal dengan status {response.status}.",
+                            status=response.status,
+                        )
+                    try:
+                        data = await response.json(content_type=None)
+                    except ValueError as exc:
+                        # Halaman HTML/maintenance dengan status 200: host tidak sehat.
+                        stats.failures += 1
+                        stats.breaker.record_failure(policy, self._clock())
+                        raise HTTPRequestError(
+                            f"Respons dari {host} bukan JSON yang valid.",
+                            status=response.status,
+                        ) from exc
+            except (aiohttp.ClientError, asyncio.TimeoutError, _RetryableStatus) as exc:
+                last_error = exc
+                status = exc.status if isinstance(exc, _RetryableStatus) else None
+                if attempt < policy.retries:
+                    stats.retries += 1
+                    await self._sleep(self._backoff(attempt))
+                continue
+            stats.breaker.record_success()
+            return data
+
+        stats.failures += 1
+        stats.breaker.record_failure(policy, self._clock())
+        self._log.warning("Permintaan GET ke %s gagal setelah %s percobaan: %r", host, policy.retries + 1, last_error)
+        message = f"Permintaan ke {host} gagal dengan status {status}." if status else f"Tidak dapat terhubung ke {host}."
+        raise HTTPRequestError(message, status=status) from last_error
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        return {
+            host: {
+                "requests": host_stats.requests,
+                "retries": host_stats.retries,
+                "failures": host_stats.failures,
+                "rejected": host_stats.rejected,
+                "circuit_open": host_stats.breaker.opened_at is not None,
+            }
+            for host, host_stats in sorted(self._hosts.items())
+        }
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import re
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable, Optional, Sequence
+
+from bot.database.repositories import PrayerLocationRepository
+
+from .logging import get_logger
+
+
+__all__ = ["LocationEntry", "LocationIndex", "PrayerLocationCatalog"]
+
+
+MAX_PREFIX_LENGTH = 12
+_TOKEN_PATTERN = re.compile(r"[0-9a-z]+")
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+@dataclass(slots=True)
+class LocationEntry:
+    location_id: str
+    label: str
+    payload: dict[str, Any]
+    search_text: str = ""
+    tokens: tuple[str, ...] = ()
+
+
+class LocationIndex:
+    """Indeks prefix token di memori untuk autocomplete lokasi.
+
+    Setiap token label (mis. ``kota``, ``kediri``) didaftarkan untuk semua
+    prefix-nya, sehingga pencarian cukup mengiris himpunan kandidat per token
+    kueri. Jika tidak ada hasil prefix, dipakai pencocokan substring pada teks
+    yang sudah di-lowercase saat indeks dibangun.
+    """
+
+    def __init__(self, entries: Iterable[LocationEntry]) -> None:
+        self._entries: list[LocationEntry] = []
+        self._prefixes: dict[str, set[int]] = {}
+        for entry in entries:
+            entry.search_text = " ".join(_tokens(f"{entry.location_id} {entry.label}"))
+            entry.tokens = tuple(dict.fromkeys(entry.search_text.split()))
+            position = len(self._entries)
+            self._entries.append(entry)
+            for token in entry.tokens:
+                for length in range(1, min(len(token), MAX_PREFIX_LENGTH) + 1):
+                    self._prefixes.setdefault(token[:length], set()).add(position)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _prefix_candidates(self, query_tokens: Sequence[str]) -> set[int]:
+        candidates: Optional[set[int]] = None
+        for token in query_tokens:
+            matches = self._prefixes.get(token[:MAX_PREFIX_LENGTH], set())
+            if len(token) > MAX_PREFIX_LENGTH:
+                matches = {pos for pos in matches if any(t.startswith(token) for t in self._entries[pos].tokens)}
+            candidates = set(matches) if candidates is None else candidates & matches
+            if not candidates:
+                return set()
+        return candidates or set()
+
+    def _score(self, entry: LocationEntry, query: str, query_tokens: Sequence[str]) -> tuple[int, int, str]:
+        score = 0
+        if entry.location_id.lower() == query:
+            score += 100
+        if entry.search_text.startswith(query) or entry.label.lower().startswith(query):
+            score += 40
+        score += 10 * sum(1 for token in query_tokens if token in entry.tokens)
+        return (-score, len(entry.label), entry.label)
+
+    def search(self, query: str, limit: int = 25) -> list[dict[str, Any]]:
+        normalized = " ".join(_tokens(query))
+        if not normalized:
+            return []
+        query_tokens = normalized.split()
+        positions = self._prefix_candidates(query_tokens)
+        if not positions:
+            positions = {pos for pos, entry in enumerate(self._entries) if normalized in entry.search_text}
+        ranked = sorted(
+            (self._entries[pos] for pos in positions),
+            key=lambda entry: self._score(entry, normalized, query_tokens),
+        )
+        return [entry.payload for entry in ranked[:limit]]
+
+
+LocationLoader = Callable[[], Awaitable[list[dict[str, Any]]]]
+EntryBuilder = Callable[[dict[str, Any]], Optional[LocationEntry]]
+
+
+class PrayerLocationCatalog:
+    """Daftar lokasi jadwal sholat per negara yang dipegang lokal.
+
+    Indeks dibangun dari SQLite saat pertama dipakai (tanpa jaringan) dan
+    diperbarui berkala dari upstream lewat ``refresh``; hasil refresh
+    disimpan kembali ke database agar restart tidak perlu mengunduh ulang.
+    """
+
+    def __init__(
+        self,
+        repo: Optional[PrayerLocationRepository],
+        loaders: dict[str, LocationLoader],
+        builders: dict[str, EntryBuilder],
+    ) -> None:
+        self.repo = repo
+        self._loaders = loaders
+        self._builders = builders
+        self._indexes: dict[str, LocationIndex] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._log = get_logger("PrayerLocationCatalog")
+
+    def _build(self, negara: str, rows: Iterable[dict[str, Any]]) -> LocationIndex:
+        builder = self._builders[negara]
+        return LocationIndex(entry for entry in (builder(row) for row in rows) if entry is not None)
+
+    async def index(self, negara: str) -> Optional[LocationIndex]:
+        """Indeks negara ini; dimuat dari database jika belum ada di memori."""
+
+        index = self._indexes.get(negara)
+        if index is not None:
+            return index
+        lock = self._locks.setdefault(negara, asyncio.Lock())
+        async with lock:
+            index = self._indexes.get(negara)
+            if index is None and self.repo is not None:
+                rows = await self.repo.list_all(negara)
+                if rows:
+                    index = self._indexes[negara] = self._build(negara, rows)
+        return index
+
+    async def search(self, negara: str, query: str, limit: int = 25) -> Optional[list[dict[str, Any]]]:
+        """Hasil pencarian lokal, atau ``None`` jika indeks belum tersedia."""
+
+        index = await self.index(negara)
+        if index is None:
+            return None
+        return index.search(query, limit)
+
+    async def refresh(self, negara: str) -> int:
+        rows = await self._loaders[negara]()
+        index = self._build(negara, rows)
+        if not len(index):
+            return 0
+        self._indexes[negara] = index
+        if self.repo is not None:
+            builder = self._builders[negara]
+            entries = [entry for entry in (builder(row) for row in rows) if entry is not None]
+            await self.repo.replace(negara, [(entry.location_id, entry.label, entry.payload) for entry in entries])
+        return len(index)
+
+    async def refresh_all(self) -> None:
+        for negara in self._loaders:
+            try:
+                await self.refresh(negara)
+            except Exception as exc:  # noqa: BLE001
+                self._log.warning("Gagal memperbarui daftar lokasi %s: %s", negara, exc)
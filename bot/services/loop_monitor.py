@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .logging import get_logger
+from .stats import RollingHistogram
+
+
+__all__ = ["LoopMonitor", "SlowCallback"]
+
+
+STACK_DEPTH = 12
+_ASYNCIO_INTERNALS = ("asyncio/events.py", "asyncio/base_events.py", "asyncio\\events.py", "asyncio\\base_events.py")
+
+
+@dataclass(slots=True)
+class SlowCallback:
+    detected_at: float
+    blocked_for: float
+    handler: str
+    stack: str
+
+
+def _describe_blocker(frame: Any) -> tuple[str, str]:
+    """Nama handler yang sedang berjalan di loop dan potongan stack-nya."""
+
+    entries = traceback.extract_stack(frame)
+    # Frame pertama setelah ``Handle._run`` milik asyncio adalah callback/coroutine pelakunya.
+    start = 0
+    for index, entry in enumerate(entries):
+        if entry.filename.endswith(_ASYNCIO_INTERNALS):
+            start = index + 1
+    culprit = entries[start] if start < len(entries) else entries[-1]
+    handler = f"{culprit.name} ({culprit.filename}:{culprit.lineno})"
+    stack = "".join(traceback.format_list(entries[start:][-STACK_DEPTH:]))
+    return handler, stack
+
+
+class LoopMonitor:
+    """Pemantau lag event loop dan pendeteksi callback yang memblokir.
+
+    Task probe tidur ``interval`` detik lalu mencatat selisih bangun aktual
+    dengan jadwalnya ke histogram (lag penjadwalan). Thread watchdog terpisah
+    memeriksa detak probe; jika loop tidak berdetak lebih dari ``interval +
+    slow_threshold``, stack thread loop diambil lewat ``sys._current_frames``
+    dan handler pelakunya dicatat ke log satu kali per kejadian.
+    """
+
+    def __init__(
+        self,
+        *,
+        interval: float = 0.5,
+        slow_threshold: float = 0.25,
+        maxlen: int = 512,
+        history: int = 10,
+    ) -> None:
+        self.interval = max(0.01, interval)
+        self.slow_threshold = max(0.001, slow_threshold)
+        self.lag = RollingHistogram(maxlen=maxlen)
+        self.slow_callbacks = 0
+        self.recent: deque[SlowCallback] = deque(maxlen=max(1, history))
+        self.max_lag = 0.0
+        self._heartbeat = time.monotonic()
+        self._reported_heartbeat: Optional[float] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task[None]] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._log = get_logger("LoopMonitor")
+
+    def start(self) -> None:
+        if self._task and not self._task.done():
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._probe(), name="forus-loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="forus-loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def close(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    async def _probe(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            self._heartbeat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.record_lag(max(loop.time() - expected, 0.0))
+
+    def record_lag(self, lag: float) -> None:
+        self._heartbeat = time.monotonic()
+        self.lag.add(lag)
+        self.max_lag = max(self.max_lag, lag)
+
+    def _watch(self) -> None:
+        period = min(self.slow_threshold, self.interval) / 2
+        while not self._stopping.wait(period):
+            self.check(time.monotonic())
+
+    def check(self, now: float) -> Optional[SlowCallback]:
+        """Periksa detak probe; kembalikan :class:`SlowCallback` jika loop tersendat."""
+
+        heartbeat = self._heartbeat
+        blocked_for = now - heartbeat - self.interval
+        if blocked_for < self.slow_threshold or self._reported_heartbeat == heartbeat:
+            return None
+        frame = sys._current_frames().get(self._loop_thread_id) if self._loop_thread_id else None
+        if frame is None:
+            return None
+        handler, stack = _describe_blocker(frame)
+        self._reported_heartbeat = heartbeat
+        event = SlowCallback(detected_at=time.time(), blocked_for=blocked_for, handler=handler, stack=stack)
+        self.slow_callbacks += 1
+        self.recent.append(event)
+        self._log.warning(
+            "Event loop terblokir >= %.0f ms oleh %s\n%s",
+            blocked_for * 1000,
+            handler,
+            stack,
+        )
+        return event
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "samples": self.lag.count,
+            "p50": self.lag.percentile(50),
+            "p95": self.lag.percentile(95),
+            "p99": self.lag.percentile(99),
+            "max": self.max_lag,
+            "slow_callbacks": self.slow_callbacks,
+            "last_slow": self.recent[-1].handler if self.recent else None,
+        }
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional
+
+import interactions
+
+from .cache import TTLCache
+from .logging import get_logger
+
+if TYPE_CHECKING:
+    from bot.database.repositories import GuildSettings
+
+
+__all__ = [
+    "GuardAction",
+    "MessageContext",
+    "MessagePipeline",
+]
+
+
+GuardAction = Callable[[], Awaitable[None]]
+GuardCallback = Callable[["MessageContext"], Awaitable[Optional[GuardAction]]]
+StageCallback = Callable[["MessageContext"], Awaitable[None]]
+ProviderCallback = Callable[["MessageContext"], Awaitable[Any]]
+
+
+@dataclass(slots=True)
+class MessageContext:
+    """Konteks tunggal per pesan yang dibagi ke semua tahap pipeline.
+
+    Data mahal (pengaturan guild, aturan automod, channel log) dimuat lewat
+    provider paling banyak sekali per pesan, walaupun diminta beberapa tahap
+    secara bersamaan.
+    """
+
+    message: interactions.Message
+    guild: interactions.Guild
+    _pipeline: "MessagePipeline"
+    _resolved: dict[str, asyncio.Future[Any]] = field(default_factory=dict)
+    moderated_by: Optional[str] = None
+
+    @property
+    def author(self) -> Any:
+        return self.message.author
+
+    @property
+    def is_bot(self) -> bool:
+        return bool(getattr(self.message.author, "bot", False))
+
+    @property
+    def moderated(self) -> bool:
+        return self.moderated_by is not None
+
+    async def get(self, key: str) -> Any:
+        future = self._resolved.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._pipeline._provide(key, self))
+            self._resolved[key] = future
+        return await asyncio.shield(future)
+
+    async def settings(self) -> Optional[GuildSettings]:
+        return await self.get("settings")
+
+    async def log_channel(self) -> Optional[interactions.GuildText]:
+        return await self.get("log_channel")
+
+
+@dataclass(slots=True)
+class _Guard:
+    name: str
+    callback: GuardCallback
+    priority: int
+
+
+@dataclass(slots=True)
+class _Stage:
+    name: str
+    callback: StageCallback
+    skip_if_moderated: bool
+
+
+class MessagePipeline:
+    """Satu jalur pemrosesan pesan untuk seluruh cog.
+
+    Guard (banned words, anti-spam, automod) memutuskan verdict secara paralel;
+    guard dengan prioritas terendah yang menandai pesan menjalankan aksinya.
+    Tahap independen (activity log) berjalan sejak awal, sedangkan tahap yang
+    ditandai ``skip_if_moderated`` (XP) langsung jalan begitu verdict diketahui,
+    bersamaan dengan aksi moderasi, tanpa menunggu penghapusan/log selesai.
+    """
+
+    def __init__(self, bot: Any, *, settings_ttl: int = 30) -> None:
+        self.bot = bot
+        self._guards: list[_Guard] = []
+        self._stages: list[_Stage] = []
+        self._providers: dict[str, ProviderCallback] = {
+            "settings": self._load_settings,
+            "log_channel": self._load_log_channel,
+        }
+        self._settings_cache = TTLCache(ttl=settings_ttl)
+        self._log = get_logger("MessagePipeline")
+
+    def register_guard(self, name: str, callback: GuardCallback, *, priority: int = 100) -> None:
+        self._guards = [guard for guard in self._guards if guard.name != name]
+        self._guards.append(_Guard(name=name, callback=callback, priority=priority))
+        self._guards.sort(key=lambda guard: guard.priority)
+
+    def register_stage(self, name: str, callback: StageCallback, *, skip_if_moderated: bool = False) -> None:
+        self._stages = [stage for stage in self._stages if stage.name != name]
+        self._stages.append(_Stage(name=name, callback=callback, skip_if_moderated=skip_if_moderated))
+
+    def register_provider(self, key: str, callback: ProviderCallback) -> None:
+        self._providers[key] = callback
+
+    def unregister(self, *names: str) -> None:
+        targets = set(names)
+        self._guards = [guard for guard in self._guards if guard.name not in targets]
+        self._stages = [stage for stage in self._stages if stage.name not in targets]
+
+    async def invalidate_settings(self, guild_id: int) -> None:
+        await self._settings_cache.invalidate(f"settings:{guild_id}")
+
+    async def _provide(self, key: str, context: MessageContext) -> Any:
+        provider = self._providers.get(key)
+        if provider is None:
+            raise KeyError(f"Provider konteks '{key}' belum terdaftar.")
+        return await provider(context)
+
+    async def _load_settings(self, context: MessageContext) -> Optional[GuildSettings]:
+        repo = getattr(self.bot, "guild_repo", None)
+        if repo is None:
+            return None
+        cache_key = f"settings:{context.guild.id}"
+        cached = await self._settings_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        settings = await repo.get(context.guild.id)
+        if settings is not None:
+            await self._settings_cache.set(cache_key, settings)
+        return settings
+
+    async def _load_log_channel(self, context: MessageContext) -> Optional[interactions.GuildText]:
+        settings = await context.settings()
+        if settings is None or not settings.log_channel_id:
+            return None
+        channel = context.guild.get_channel(settings.log_channel_id)
+        if isinstance(channel, interactions.GuildText):
+            return channel
+        return None
+
+    async def process(self, message: interactions.Message) -> Optional[MessageContext]:
+        guild = getattr(message, "guild", None)
+        if guild is None:
+            return None
+        context = MessageContext(message=message, guild=guild, _pipeline=self)
+
+        independent = [
+            asyncio.create_task(self._run_stage(stage, context))
+            for stage in self._stages
+            if not stage.skip_if_moderated
+        ]
+
+        action = await self._run_guards(context)
+        followups: list[Awaitable[None]] = []
+        if action is not None:
+            followups.append(self._run_action(context, action))
+        else:
+            followups.extend(
+                self._run_stage(stage, context)
+                for stage in self._stages
+                if stage.skip_if_moderated
+            )
+
+        await asyncio.gather(*independent, *followups)
+        return context
+
+    async def _run_guards(self, context: MessageContext) -> Optional[GuardAction]:
+        if not self._guards:
+            return None
+        guards = list(self._guards)
+        results = await asyncio.gather(
+            *(guard.callback(context) for guard in guards),
+            return_exceptions=True,
+        )
+        for guard, result in zip(guards, results):
+            if isinstance(result, BaseException):
+                self._log.error("Guard pesan '%s' gagal", guard.name, exc_info=result)
+                continue
+            if result is not None:
+                context.moderated_by = guard.name
+                return result
+        return None
+
+    async def _run_action(self, context: MessageContext, action: GuardAction) -> None:
+        try:
+            await action()
+        except Exception:  # noqa: BLE001
+            self._log.exception("Aksi guard '%s' gagal", context.moderated_by)
+
+    async def _run_stage(self, stage: _Stage, context: MessageContext) -> None:
+        try:
+            await stage.callback(context)
+        except Exception:  # noqa: BLE001
+            self._log.exception("Tahap pesan '%s' gagal", stage.name)
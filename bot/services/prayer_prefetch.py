@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import asyncio
+import calendar
+from datetime import date, datetime, tzinfo
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from .cache import TTLCache
+from .logging import get_logger
+
+
+__all__ = ["PrayerPrefetcher"]
+
+
+# Bobot popularitas dikali faktor ini setiap putaran agar lokasi yang sudah
+# tidak dicari perlahan keluar dari daftar prefetch.
+POPULARITY_DECAY = 0.95
+MIN_POPULARITY = 0.5
+# Jadwal bulan depan ikut diambil beberapa hari sebelum pergantian bulan.
+ROLLOVER_WINDOW_DAYS = 2
+
+RefreshFunc = Callable[[str, str, int, int], Awaitable[Any]]
+KeyFunc = Callable[[str, str, int, int], str]
+
+
+def _months_to_warm(today: date) -> list[tuple[int, int]]:
+    months = [(today.year, today.month)]
+    last_day = calendar.monthrange(today.year, today.month)[1]
+    if last_day - today.day < ROLLOVER_WINDOW_DAYS:
+        if today.month == 12:
+            months.append((today.year + 1, 1))
+        else:
+            months.append((today.year, today.month + 1))
+    return months
+
+
+class PrayerPrefetcher:
+    """Prefetch jadwal sholat bulanan untuk lokasi yang paling sering dicari.
+
+    ``record`` dipanggil setiap kali ``/jadwalsholat`` berhasil. ``run_once``
+    (dijalankan berkala oleh scheduler) menyegarkan entri cache lokasi
+    terpopuler sebelum TTL-nya habis, termasuk bulan berikutnya menjelang
+    pergantian bulan. Permintaan ke upstream diberi jeda ``spacing`` detik
+    agar tidak melewati batas API.
+    """
+
+    def __init__(
+        self,
+        cache: TTLCache,
+        refresh: RefreshFunc,
+        key_for: KeyFunc,
+        *,
+        timezones: dict[str, tzinfo],
+        top_n: int = 25,
+        refresh_margin: float = 30 * 60,
+        spacing: float = 1.5,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ) -> None:
+        self.cache = cache
+        self._refresh = refresh
+        self._key_for = key_for
+        self.timezones = timezones
+        self.top_n = max(0, top_n)
+        self.refresh_margin = max(0.0, refresh_margin)
+        self.spacing = max(0.0, spacing)
+        self._sleep = sleep
+        self._popularity: dict[tuple[str, str], float] = {}
+        self._log = get_logger("PrayerPrefetcher")
+        self.refreshed = 0
+        self.failed = 0
+
+    def record(self, negara: str, lokasi: str) -> None:
+        # Kunci harus sama persis dengan yang dipakai cache jadwal.
+        key = (negara, lokasi)
+        self._popularity[key] = self._popularity.get(key, 0.0) + 1.0
+
+    def popular(self) -> list[tuple[str, str]]:
+        ranked = sorted(self._popularity.items(), key=lambda item: item[1], reverse=True)
+        return [location for location, _ in ranked[: self.top_n]]
+
+    def _decay(self) -> None:
+        for location in list(self._popularity):
+            score = self._popularity[location] * POPULARITY_DECAY
+            if score < MIN_POPULARITY:
+                del self._popularity[location]
+            else:
+                self._popularity[location] = score
+
+    async def _stale_targets(
+        self,
+        locations: Iterable[tuple[str, str]],
+        now: Optional[datetime],
+    ) -> list[tuple[str, str, int, int]]:
+        targets: list[tuple[str, str, int, int]] = []
+        for negara, lokasi in locations:
+            tz = self.timezones.get(negara)
+            if tz is None:
+                continue
+            today = (now or datetime.now(tz)).astimezone(tz).date()
+            for year, month in _months_to_warm(today):
+                remaining = await self.cache.remaining(self._key_for(negara, lokasi, year, month))
+                if remaining is None or remaining <= self.refresh_margin:
+                    targets.append((negara, lokasi, year, month))
+        return targets
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        """Segarkan entri yang akan kedaluwarsa; kembalikan jumlah yang diambil ulang."""
+
+        targets = await self._stale_targets(self.popular(), now)
+        refreshed = 0
+        for index, (negara, lokasi, year, month) in enumerate(targets):
+            if index and self.spacing:
+                await self._sleep(self.spacing)
+            try:
+                await self._refresh(negara, lokasi, year, month)
+            except Exception as exc:  # noqa: BLE001
+                self.failed += 1
+                self._log.warning("Prefetch jadwal %s %s %04d-%02d gagal: %s", negara, lokasi, year, month, exc)
+                continue
+            refreshed += 1
+        self.refreshed += refreshed
+        self._decay()
+        return refreshed
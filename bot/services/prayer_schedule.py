@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import calendar
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime, tzinfo
+from typing import Any, Iterable, Optional
+
+
+__all__ = [
+    "INDONESIA_PRAYERS",
+    "MALAYSIA_PRAYERS",
+    "MonthSchedule",
+    "compact_indonesia_month",
+    "compact_malaysia_month",
+    "indonesian_date_label",
+]
+
+
+INDONESIA_PRAYERS = ("imsak", "subuh", "terbit", "dhuha", "dzuhur", "ashar", "maghrib", "isya")
+MALAYSIA_PRAYERS = ("fajr", "syuruk", "dhuhr", "asr", "maghrib", "isha")
+MISSING = -1
+
+_HARI = ("Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu")
+
+
+def _parse_hhmm(value: Any) -> int:
+    if not isinstance(value, str):
+        return MISSING
+    hours, _, minutes = value.strip().partition(":")
+    try:
+        total = int(hours) * 60 + int(minutes[:2])
+    except ValueError:
+        return MISSING
+    return total if 0 <= total < 24 * 60 else MISSING
+
+
+def _format_minutes(total: int) -> str:
+    return f"{total // 60:02d}:{total % 60:02d}"
+
+
+@dataclass(slots=True)
+class MonthSchedule:
+    """Jadwal sholat satu bulan dalam bentuk ringkas.
+
+    Waktu disimpan sebagai menit sejak tengah malam (waktu lokal) dalam satu
+    ``array`` datar berukuran ``hari × jumlah waktu sholat``; hari ke-``n``
+    ada di baris ``n - 1`` sehingga pencarian per tanggal O(1). Field lain
+    dari respons upstream dibuang, kecuali label lokasi dan catatan pendek per
+    hari (mis. tanggal Hijriah).
+    """
+
+    year: int
+    month: int
+    prayers: tuple[str, ...]
+    times: array
+    label: str = ""
+    region: Optional[str] = None
+    notes: tuple[Optional[str], ...] = ()
+
+    @property
+    def days(self) -> int:
+        return calendar.monthrange(self.year, self.month)[1]
+
+    def minutes(self, day: int) -> Optional[tuple[int, ...]]:
+        if not 1 <= day <= self.days:
+            return None
+        width = len(self.prayers)
+        row = tuple(self.times[(day - 1) * width : day * width])
+        if all(value == MISSING for value in row):
+            return None
+        return row
+
+    def day(self, day: int) -> Optional[dict[str, str]]:
+        """Waktu sholat ``HH:MM`` untuk tanggal ``day``, atau ``None`` jika tidak ada."""
+
+        row = self.minutes(day)
+        if row is None:
+            return None
+        return {name: _format_minutes(value) for name, value in zip(self.prayers, row) if value != MISSING}
+
+    def note(self, day: int) -> Optional[str]:
+        if 1 <= day <= len(self.notes):
+            return self.notes[day - 1]
+        return None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Bentuk JSON untuk disimpan di tier cache persisten."""
+
+        return {
+            "year": self.year,
+            "month": self.month,
+            "prayers": list(self.prayers),
+            "times": self.times.tolist(),
+            "label": self.label,
+            "region": self.region,
+            "notes": list(self.notes),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> MonthSchedule:
+        return cls(
+            year=int(data["year"]),
+            month=int(data["month"]),
+            prayers=tuple(data["prayers"]),
+            times=array("h", data["times"]),
+            label=data.get("label", ""),
+            region=data.get("region"),
+            notes=tuple(data.get("notes") or ()),
+        )
+
+
+def _empty_times(year: int, month: int, width: int) -> array:
+    return array("h", [MISSING]) * (calendar.monthrange(year, month)[1] * width)
+
+
+def _fill(times: array, width: int, day: int, values: Iterable[int]) -> None:
+    offset = (day - 1) * width
+    for index, value in enumerate(values):
+        times[offset + index] = value
+
+
+def compact_indonesia_month(data: dict[str, Any], year: int, month: int) -> MonthSchedule:
+    """Ringkas ``data`` dari API MyQuran (``lokasi``, ``daerah``, ``jadwal``)."""
+
+    width = len(INDONESIA_PRAYERS)
+    times = _empty_times(year, month, width)
+    for item in data.get("jadwal", []):
+        try:
+            item_date = date.fromisoformat(str(item.get("date")))
+        except ValueError:
+            continue
+        if (item_date.year, item_date.month) != (year, month):
+            continue
+        _fill(times, width, item_date.day, (_parse_hhmm(item.get(name)) for name in INDONESIA_PRAYERS))
+    return MonthSchedule(
+        year=year,
+        month=month,
+        prayers=INDONESIA_PRAYERS,
+        times=times,
+        label=str(data.get("lokasi") or ""),
+        region=data.get("daerah") or None,
+    )
+
+
+def compact_malaysia_month(
+    payload: dict[str, Any],
+    year: int,
+    month: int,
+    tz: tzinfo,
+    *,
+    zone_detail: Optional[dict[str, Any]] = None,
+) -> MonthSchedule:
+    """Ringkas respons WaktuSolat; epoch diubah ke menit waktu lokal ``tz``."""
+
+    width = len(MALAYSIA_PRAYERS)
+    days = calendar.monthrange(year, month)[1]
+    times = _empty_times(year, month, width)
+    notes: list[Optional[str]] = [None] * days
+    for item in payload.get("prayers", []):
+        day = item.get("day")
+        if not isinstance(day, int) or not 1 <= day <= days:
+            continue
+        row = []
+        for name in MALAYSIA_PRAYERS:
+            raw = item.get(name)
+            if isinstance(raw, (int, float)):
+                local = datetime.fromtimestamp(raw, tz)
+                row.append(local.hour * 60 + local.minute)
+            else:
+                row.append(MISSING)
+        _fill(times, width, day, row)
+        notes[day - 1] = item.get("hijri") or None
+
+    negeri = daerah = None
+    if isinstance(zone_detail, dict):
+        negeri = str(zone_detail.get("negeri", "")).strip() or None
+        daerah = str(zone_detail.get("daerah", "")).strip() or None
+    return MonthSchedule(
+        year=year,
+        month=month,
+        prayers=MALAYSIA_PRAYERS,
+        times=times,
+        label=negeri or str(payload.get("zone") or ""),
+        region=daerah,
+        notes=tuple(notes),
+    )
+
+
+def indonesian_date_label(target: date) -> str:
+    """Format tanggal seperti API MyQuran, mis. ``Senin, 03/06/2024``."""
+
+    return f"{_HARI[target.weekday()]}, {target:%d/%m/%Y}"
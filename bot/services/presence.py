@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import asyncio
+import re
+import string
+import time
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Optional
 
 import interactions
 
@@ -27,31 +31,112 @@ class PresenceSnapshot:
     uptime: timedelta
     database_connected: bool
     version: str
+    job_lag_ms: float = 0.0
+    job_misfires: int = 0
+    loop_lag_ms: float = 0.0
+    # Kunci konteks yang benar-benar dihitung; ``None`` berarti snapshot lengkap.
+    # Metrik di luar kunci ini bernilai nol, bukan nilai sebenarnya.
+    keys: Optional[frozenset[str]] = None
+
+    @property
+    def is_complete(self) -> bool:
+        return self.keys is None
 
     @property
     def uptime_seconds(self) -> int:
         return int(self.uptime.total_seconds())
 
-    def to_context(self) -> dict[str, Any]:
-        uptime_human = _humanize_timedelta(self.uptime)
-        return {
-            "guild_count": self.guild_count,
-            "member_count": self.member_count,
-            "human_count": self.human_count,
-            "bot_count": self.bot_count,
-            "commands_count": self.commands_count,
-            "cog_count": self.cog_count,
-            "latency_ms": round(self.latency_ms, 2),
-            "shard_count": self.shard_count,
-            "scheduler_jobs": self.scheduler_jobs,
-            "pending_reminders": self.pending_reminders,
-            "owner_count": self.owner_count,
-            "uptime_seconds": self.uptime_seconds,
-            "uptime_human": uptime_human,
-            "database_status": "🟢 tersambung" if self.database_connected else "🔴 putus",
-            "version": self.version,
-            "activity_pool": self.scheduler_jobs + self.pending_reminders,
-        }
+    def to_context(self, keys: Optional[Iterable[str]] = None) -> dict[str, Any]:
+        if keys is None:
+            return {key: getter(self) for key, getter in _CONTEXT_FIELDS.items()}
+        return {key: _CONTEXT_FIELDS[key](self) for key in keys if key in _CONTEXT_FIELDS}
+
+
+_CONTEXT_FIELDS: dict[str, Callable[[PresenceSnapshot], Any]] = {
+    "guild_count": lambda snap: snap.guild_count,
+    "member_count": lambda snap: snap.member_count,
+    "human_count": lambda snap: snap.human_count,
+    "bot_count": lambda snap: snap.bot_count,
+    "commands_count": lambda snap: snap.commands_count,
+    "cog_count": lambda snap: snap.cog_count,
+    "latency_ms": lambda snap: round(snap.latency_ms, 2),
+    "shard_count": lambda snap: snap.shard_count,
+    "scheduler_jobs": lambda snap: snap.scheduler_jobs,
+    "pending_reminders": lambda snap: snap.pending_reminders,
+    "owner_count": lambda snap: snap.owner_count,
+    "uptime_seconds": lambda snap: snap.uptime_seconds,
+    "uptime_human": lambda snap: _humanize_timedelta(snap.uptime),
+    "database_status": lambda snap: "🟢 tersambung" if snap.database_connected else "🔴 putus",
+    "version": lambda snap: snap.version,
+    "activity_pool": lambda snap: snap.scheduler_jobs + snap.pending_reminders,
+    "job_lag_ms": lambda snap: round(snap.job_lag_ms),
+    "job_misfires": lambda snap: snap.job_misfires,
+    "loop_lag_ms": lambda snap: round(snap.loop_lag_ms, 1),
+}
+
+# Metrik yang mahal (iterasi guild, scheduler, query DB) hanya dihitung jika
+# salah satu kunci konteks berikut dipakai oleh template yang akan dirender.
+_GUILD_KEYS = frozenset({"guild_count", "member_count", "human_count", "bot_count"})
+_SCHEDULER_KEYS = frozenset({"scheduler_jobs", "activity_pool", "job_lag_ms", "job_misfires"})
+_LOOP_KEYS = frozenset({"loop_lag_ms"})
+_REMINDER_KEYS = frozenset({"pending_reminders", "activity_pool"})
+
+
+class PresenceTemplate:
+    """Template presence yang sudah di-parse sekali beserta kunci konteksnya."""
+
+    __slots__ = ("source", "keys", "_parts")
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        parts: list[tuple[str, Optional[str], str, Optional[str]]] = []
+        keys: set[str] = set()
+        for literal, field_name, format_spec, conversion in _FORMATTER.parse(source):
+            if field_name is not None:
+                root = _field_root(field_name)
+                keys.add(root)
+            parts.append((literal, field_name, format_spec or "", conversion))
+        self.keys = frozenset(keys)
+        self._parts = tuple(parts)
+
+    def render(self, context: dict[str, Any]) -> str:
+        pieces: list[str] = []
+        for literal, field_name, format_spec, conversion in self._parts:
+            pieces.append(literal)
+            if field_name is None:
+                continue
+            root = _field_root(field_name)
+            if root not in context:
+                pieces.append("{" + field_name + "}")
+                continue
+            value, _ = _FORMATTER.get_field(field_name, (), context)
+            value = _FORMATTER.convert_field(value, conversion)
+            pieces.append(_FORMATTER.format_field(value, format_spec))
+        return "".join(pieces)
+
+
+@dataclass(slots=True)
+class _CompiledActivity:
+    config: PresenceActivityConfig
+    text: PresenceTemplate
+    details: Optional[PresenceTemplate]
+    state: Optional[PresenceTemplate]
+    keys: frozenset[str]
+
+
+def _field_root(field_name: str) -> str:
+    return _FIELD_ROOT.split(field_name, 1)[0]
+
+
+_FORMATTER = string.Formatter()
+_FIELD_ROOT = re.compile(r"[.\[]")
+
+
+@lru_cache(maxsize=256)
+def compile_template(source: str) -> PresenceTemplate:
+    """Parse template ``str.format`` sekali; hasilnya di-cache per teks."""
+
+    return PresenceTemplate(source)
 
 
 class RichPresenceManager:
@@ -65,6 +150,12 @@ class RichPresenceManager:
         self._refresh_event = asyncio.Event()
         self._refresh_event.set()
         self._last_snapshot: PresenceSnapshot | None = None
+        self._compiled = [self._compile_activity(activity) for activity in config.activities]
+        self._last_update_at: float | None = None
+        self._last_signature: tuple[Any, ...] | None = None
+        self.updates_sent = 0
+        self.updates_suppressed = 0
+        self.refreshes_coalesced = 0
 
     def start(self) -> None:
         if not self.config.enabled:
@@ -91,8 +182,24 @@ class RichPresenceManager:
     def request_refresh(self) -> None:
         if not self.config.enabled:
             return
+        if self._refresh_event.is_set():
+            self.refreshes_coalesced += 1
+            return
         self._refresh_event.set()
 
+    def stats(self) -> dict[str, int]:
+        return {
+            "updates_sent": self.updates_sent,
+            "updates_suppressed": self.updates_suppressed,
+            "refreshes_coalesced": self.refreshes_coalesced,
+        }
+
+    def _debounce_delay(self) -> float:
+        if self._last_update_at is None:
+            return 0.0
+        elapsed = time.monotonic() - self._last_update_at
+        return max(0.0, self.config.min_update_seconds - elapsed)
+
     async def _loop(self) -> None:
         await self.bot.wait_until_ready()
         self.log.info("Memulai loop rich presence (%d aktivitas, interval %d detik)", len(self.config.activities), self.config.rotation_seconds)
@@ -103,15 +210,36 @@ class RichPresenceManager:
                 await asyncio.wait_for(self._refresh_event.wait(), timeout=timeout)
             except asyncio.TimeoutError:
                 continue
-            else:
-                self._refresh_event.clear()
+            # Permintaan refresh yang datang selama jeda minimum digabung
+            # menjadi satu pembaruan agar gateway tidak dibanjiri.
+            delay = self._debounce_delay()
+            if delay:
+                await asyncio.sleep(delay)
+            self._refresh_event.clear()
+
+    def _compile_activity(self, activity: PresenceActivityConfig) -> _CompiledActivity:
+        def _compile(source: Optional[str]) -> Optional[PresenceTemplate]:
+            if not source:
+                return None
+            try:
+                return compile_template(source)
+            except ValueError:
+                self.log.warning("Template rich presence tidak valid, dipakai apa adanya: %r", source)
+                return compile_template(source.replace("{", "{{").replace("}", "}}"))
+
+        text = _compile(activity.text) or compile_template("")
+        details = _compile(activity.details)
+        state = _compile(activity.state)
+        keys = text.keys.union(*(part.keys for part in (details, state) if part is not None))
+        return _CompiledActivity(config=activity, text=text, details=details, state=state, keys=keys)
 
     async def _apply_next_presence(self) -> None:
-        template = self._pick_next_activity()
-        context = await self._build_context()
-        name = _format_template(template.text, context)
-        details = _format_template(template.details, context)
-        state = _format_template(template.state, context)
+        compiled = self._pick_next_activity()
+        template = compiled.config
+        context = await self._build_context(compiled.keys)
+        name = compiled.text.render(context)
+        details = compiled.details.render(context) if compiled.details else ""
+        state = compiled.state.render(context) if compiled.state else ""
         status = _resolve_status(template.status) or _resolve_status(self.config.default_status)
         try:
             activity = _build_activity(template, name, details, state)
@@ -119,40 +247,63 @@ class RichPresenceManager:
             self.log.exception("Gagal membuat aktivitas rich presence dari template %s", template.type)
             return
 
+        signature = (template.type, name, activity.url, status)
+        if signature == self._last_signature:
+            self.updates_suppressed += 1
+            return
+
         try:
             await self.bot.change_presence(activity=activity, status=status)
         except Exception:  # noqa: BLE001
             self.log.exception("Gagal memperbarui rich presence menjadi '%s'", name)
+            return
+        self._last_signature = signature
+        self._last_update_at = time.monotonic()
+        self.updates_sent += 1
 
-    def _pick_next_activity(self) -> PresenceActivityConfig:
-        total = len(self.config.activities)
+    def _pick_next_activity(self) -> _CompiledActivity:
+        total = len(self._compiled)
         if total == 0:
             raise RuntimeError("Tidak ada aktivitas rich presence yang tersedia.")
-        template = self.config.activities[self._current_index % total]
+        template = self._compiled[self._current_index % total]
         self._current_index = (self._current_index + 1) % total
         return template
 
-    async def _build_context(self) -> dict[str, Any]:
-        snapshot = await self._collect_snapshot()
+    async def _build_context(self, keys: Optional[frozenset[str]] = None) -> dict[str, Any]:
+        snapshot = await self._collect_snapshot(keys)
         self._last_snapshot = snapshot
-        base_context = snapshot.to_context()
+        base_context = snapshot.to_context(keys)
         base_context.update({
             "activity_index": (self._current_index or len(self.config.activities)) ,
             "activity_total": len(self.config.activities),
         })
         return base_context
 
-    async def _collect_snapshot(self) -> PresenceSnapshot:
-        guilds = list(getattr(self.bot, "guilds", []))
-        guild_count = len(guilds)
-        total_members = 0
-        human_members = 0
-        bot_members = 0
-        for guild in guilds:
-            total, human, bots = _resolve_guild_counts(guild)
-            total_members += total
-            human_members += human
-            bot_members += bots
+    async def _collect_snapshot(self, keys: Optional[frozenset[str]] = None) -> PresenceSnapshot:
+        """Kumpulkan metrik presence; jika ``keys`` diberikan, hanya metrik yang dipakai."""
+
+        def wants(group: frozenset[str]) -> bool:
+            return keys is None or not group.isdisjoint(keys)
+
+        stats = getattr(self.bot, "stats", None)
+        if not wants(_GUILD_KEYS):
+            guild_count = total_members = human_members = bot_members = 0
+        elif stats is not None:
+            guild_count = stats.guild_count
+            total_members = stats.member_count
+            human_members = stats.human_count
+            bot_members = stats.bot_count
+        else:
+            guilds = list(getattr(self.bot, "guilds", []))
+            guild_count = len(guilds)
+            total_members = 0
+            human_members = 0
+            bot_members = 0
+            for guild in guilds:
+                total, human, bots = _resolve_guild_counts(guild)
+                total_members += total
+                human_members += human
+                bot_members += bots
 
         commands_count = 0
         try:
@@ -167,9 +318,23 @@ class RichPresenceManager:
         shard_count = int(getattr(self.bot, "shard_count", 1) or 1)
 
         scheduler = getattr(self.bot, "scheduler", None)
-        scheduler_jobs = scheduler.job_count() if scheduler is not None else 0
-
-        pending_reminders = await _count_pending_reminders(getattr(self.bot, "reminder_repo", None))
+        scheduler_jobs = 0
+        job_lag_ms = 0.0
+        job_misfires = 0
+        if scheduler is not None and wants(_SCHEDULER_KEYS):
+            scheduler_jobs = scheduler.job_count()
+            if hasattr(scheduler, "worst_lag"):
+                job_lag_ms = scheduler.worst_lag() * 1000
+                job_misfires = scheduler.total_misfires()
+
+        loop_lag_ms = 0.0
+        loop_monitor = getattr(self.bot, "loop_monitor", None)
+        if loop_monitor is not None and wants(_LOOP_KEYS):
+            loop_lag_ms = loop_monitor.lag.percentile(95) * 1000
+
+        pending_reminders = 0
+        if wants(_REMINDER_KEYS):
+            pending_reminders = await _count_pending_reminders(getattr(self.bot, "reminder_repo", None))
 
         owner_ids = getattr(getattr(self.bot, "config", None), "owner_ids", []) or []
         owner_count = len(owner_ids)
@@ -198,10 +363,26 @@ class RichPresenceManager:
             uptime=uptime,
             database_connected=database_connected,
             version=self.version,
+            job_lag_ms=job_lag_ms,
+            job_misfires=job_misfires,
+            loop_lag_ms=loop_lag_ms,
+            keys=keys,
         )
 
+    async def collect_snapshot(self) -> PresenceSnapshot:
+        """Snapshot lengkap semua metrik, untuk pemanggil yang butuh data utuh."""
+
+        return await self._collect_snapshot()
+
     @property
     def last_snapshot(self) -> PresenceSnapshot | None:
+        """Snapshot terakhir yang dipakai merender presence; bisa parsial.
+
+        Hanya metrik yang dipakai template aktif saat itu yang dihitung (lihat
+        :attr:`PresenceSnapshot.keys`); metrik lain bernilai nol. Pemanggil
+        yang butuh data utuh sebaiknya memakai :meth:`collect_snapshot`.
+        """
+
         return self._last_snapshot
 
 
@@ -266,6 +447,9 @@ async def _count_pending_reminders(repository: Any) -> int:
     if repository is None:
         return 0
     try:
+        count_pending = getattr(repository, "count_pending", None)
+        if count_pending is not None:
+            return int(await count_pending())
         pending = await repository.all_pending()
     except Exception:  # noqa: BLE001
         return 0
@@ -286,13 +470,7 @@ def _resolve_guild_counts(guild: Any) -> tuple[int, int, int]:
 def _format_template(template: Optional[str], context: dict[str, Any]) -> str:
     if not template:
         return ""
-    formatter = _PresenceDict(context)
-    return template.format_map(formatter)
-
-
-class _PresenceDict(dict[str, Any]):
-    def __missing__(self, key: str) -> str:
-        return "{" + key + "}"
+    return compile_template(template).render(context)
 
 
 def _humanize_timedelta(delta: timedelta) -> str:
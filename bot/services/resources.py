@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import asyncio
+import gc
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from .logging import get_logger
+
+
+__all__ = ["ResourceSample", "ResourceSampler", "read_proc_status"]
+
+
+PROC_STATUS = "/proc/self/status"
+PROC_STAT = "/proc/self/stat"
+PROC_FD = "/proc/self/fd"
+
+try:
+    _CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):
+    _CLOCK_TICKS = 100
+
+
+def read_proc_status(path: str = PROC_STATUS) -> dict[str, int]:
+    """Ambil ``VmRSS``/``VmHWM`` (KiB) dan ``Threads`` dari ``/proc/self/status``."""
+
+    values: dict[str, int] = {}
+    try:
+        with open(path, encoding="ascii") as handle:
+            for line in handle:
+                key, _, rest = line.partition(":")
+                if key in {"VmRSS", "VmHWM", "Threads"}:
+                    values[key] = int(rest.split()[0])
+    except (OSError, ValueError, IndexError):
+        return {}
+    return values
+
+
+def _read_cpu_seconds(path: str = PROC_STAT) -> Optional[float]:
+    try:
+        with open(path, encoding="ascii") as handle:
+            raw = handle.read()
+    except OSError:
+        return None
+    # Nama proses (field 2) bisa berisi spasi; field berikutnya dimulai setelah ")".
+    fields = raw.rpartition(")")[2].split()
+    try:
+        utime, stime = int(fields[11]), int(fields[12])
+    except (IndexError, ValueError):
+        return None
+    return (utime + stime) / _CLOCK_TICKS
+
+
+def _count_open_fds(path: str = PROC_FD) -> Optional[int]:
+    try:
+        return len(os.listdir(path))
+    except OSError:
+        return None
+
+
+@dataclass(slots=True)
+class ResourceSample:
+    taken_at: float
+    rss_mb: Optional[float]
+    cpu_seconds: Optional[float]
+    cpu_percent: Optional[float]
+    open_fds: Optional[int]
+    threads: int
+    tasks: int
+    gc_collections: int
+    gc_pause_ms: float
+
+
+class ResourceSampler:
+    """Sampel sumber daya proses berkala dalam ring buffer.
+
+    Setiap :meth:`sample` membaca RSS saat ini dan jumlah thread dari
+    ``/proc/self/status``, waktu CPU dari ``/proc/self/stat`` (selisih dengan
+    sampel sebelumnya menjadi persentase CPU), jumlah file descriptor,
+    jumlah task asyncio, serta jumlah dan total jeda GC sejak sampel
+    sebelumnya (diukur lewat ``gc.callbacks``). Di luar Linux field berbasis
+    ``/proc`` bernilai ``None``.
+    """
+
+    def __init__(
+        self,
+        *,
+        maxlen: int = 120,
+        clock: Callable[[], float] = time.monotonic,
+        cpu_reader: Callable[[], Optional[float]] = _read_cpu_seconds,
+        status_reader: Callable[[], dict[str, int]] = read_proc_status,
+        fd_counter: Callable[[], Optional[int]] = _count_open_fds,
+    ) -> None:
+        self._samples: deque[ResourceSample] = deque(maxlen=max(2, maxlen))
+        self._clock = clock
+        self._cpu_reader = cpu_reader
+        self._status_reader = status_reader
+        self._fd_counter = fd_counter
+        self._gc_started: Optional[float] = None
+        self._gc_collections = 0
+        self._gc_pause = 0.0
+        self._installed = False
+        self._log = get_logger("ResourceSampler")
+
+    def start(self) -> None:
+        if not self._installed:
+            gc.callbacks.append(self._on_gc)
+            self._installed = True
+
+    def close(self) -> None:
+        if self._installed:
+            try:
+                gc.callbacks.remove(self._on_gc)
+            except ValueError:
+                pass
+            self._installed = False
+
+    def _on_gc(self, phase: str, info: dict[str, Any]) -> None:
+        if phase == "start":
+            self._gc_started = time.perf_counter()
+        elif phase == "stop" and self._gc_started is not None:
+            self._gc_pause += time.perf_counter() - self._gc_started
+            self._gc_collections += 1
+            self._gc_started = None
+
+    def sample(self) -> ResourceSample:
+        now = self._clock()
+        status = self._status_reader()
+        cpu_seconds = self._cpu_reader()
+        previous = self._samples[-1] if self._samples else None
+        cpu_percent: Optional[float] = None
+        if previous is not None and cpu_seconds is not None and previous.cpu_seconds is not None:
+            elapsed = now - previous.taken_at
+            if elapsed > 0:
+                cpu_percent = max(cpu_seconds - previous.cpu_seconds, 0.0) / elapsed * 100
+
+        try:
+            tasks = len(asyncio.all_tasks())
+        except RuntimeError:
+            tasks = 0
+
+        rss_kib = status.get("VmRSS")
+        sample = ResourceSample(
+            taken_at=now,
+            rss_mb=rss_kib / 1024 if rss_kib is not None else None,
+            cpu_seconds=cpu_seconds,
+            cpu_percent=cpu_percent,
+            open_fds=self._fd_counter(),
+            threads=status.get("Threads") or threading.active_count(),
+            tasks=tasks,
+            gc_collections=self._gc_collections,
+            gc_pause_ms=self._gc_pause * 1000,
+        )
+        self._gc_collections = 0
+        self._gc_pause = 0.0
+        self._samples.append(sample)
+        return sample
+
+    async def run_once(self) -> None:
+        self.sample()
+
+    def latest(self) -> Optional[ResourceSample]:
+        return self._samples[-1] if self._samples else None
+
+    def samples(self) -> list[ResourceSample]:
+        return list(self._samples)
+
+    def summary(self) -> dict[str, Any]:
+        """Ringkasan tren di seluruh jendela sampel untuk ``/botstats``."""
+
+        samples = list(self._samples)
+        if not samples:
+            return {}
+        first, last = samples[0], samples[-1]
+        cpu_values = [s.cpu_percent for s in samples if s.cpu_percent is not None]
+        rss_values = [s.rss_mb for s in samples if s.rss_mb is not None]
+        return {
+            "window_seconds": last.taken_at - first.taken_at,
+            "samples": len(samples),
+            "rss_mb": last.rss_mb,
+            "rss_delta_mb": (last.rss_mb - first.rss_mb) if last.rss_mb is not None and first.rss_mb is not None else None,
+            "rss_max_mb": max(rss_values) if rss_values else None,
+            "cpu_percent_avg": sum(cpu_values) / len(cpu_values) if cpu_values else None,
+            "cpu_percent_last": last.cpu_percent,
+            "open_fds": last.open_fds,
+            "threads": last.threads,
+            "tasks": last.tasks,
+            "gc_collections": sum(s.gc_collections for s in samples),
+            "gc_pause_ms": sum(s.gc_pause_ms for s in samples),
+        }
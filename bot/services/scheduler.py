@@ -1,27 +1,446 @@
 from __future__ import annotations
 
-from typing import Any, Awaitable, Callable
+import asyncio
+import heapq
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional
 
+from apscheduler.events import (
+    EVENT_ALL_JOBS_REMOVED,
+    EVENT_JOB_ADDED,
+    EVENT_JOB_MISSED,
+    EVENT_JOB_REMOVED,
+    EVENT_JOB_SUBMITTED,
+    JobEvent,
+    JobSubmissionEvent,
+    SchedulerEvent,
+)
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
+from bot.database.repositories import ScheduledJob, ScheduledJobRepository
+
+from .logging import get_logger
+from .stats import JobMetrics
+
+
+# Hanya job dalam jendela ini yang dipegang di memori; sisanya tetap di SQLite
+# dan diambil dengan satu query rentang ``run_at`` saat jendela habis.
+DEFAULT_HORIZON_SECONDS = 600.0
+WINDOW_LIMIT = 500
+# Jeda minimum sebelum jendela yang terpotong limit dimuat ulang.
+WINDOW_REFILL_FLOOR = 1.0
+# Handler yang gagal dicoba ulang dengan backoff; barisnya tetap di SQLite
+# sampai berhasil atau percobaan habis.
+JOB_RETRY_SECONDS = 30.0
+MAX_JOB_ATTEMPTS = 5
+
+JobHandler = Callable[..., Awaitable[None]]
+MisfireHandler = Callable[[list[ScheduledJob]], Awaitable[None]]
+
+
+@dataclass(slots=True)
+class JobPolicy:
+    """Kebijakan eksekusi untuk satu jenis job persisten.
+
+    ``misfire_grace_time`` adalah keterlambatan maksimum (detik) sebelum job
+    dianggap terlewat dan diserahkan ke ``on_misfire`` alih-alih dijalankan;
+    ``None`` berarti job selalu dijalankan berapa pun terlambatnya. Jika
+    ``coalesce`` aktif, semua job jenis ini yang jatuh tempo pada tick yang
+    sama diberikan ke ``handler`` sekaligus sebagai satu daftar.
+    """
+
+    handler: JobHandler
+    misfire_grace_time: Optional[float] = None
+    coalesce: bool = False
+    on_misfire: Optional[MisfireHandler] = None
+
 
 class Scheduler:
-    """Wrapper sederhana untuk APScheduler."""
+    """Wrapper sederhana untuk APScheduler.
+
+    Selain job APScheduler di memori, scheduler dapat memakai
+    :class:`ScheduledJobRepository` sebagai penyimpanan job satu kali yang
+    persisten. Hanya job yang jatuh tempo dalam ``horizon_seconds`` ke depan
+    yang dimuat ke heap di memori, dan semua job yang jatuh tempo pada tick
+    yang sama dijalankan sebagai satu batch, sehingga memori tetap datar
+    berapa pun jumlah jadwal yang tersimpan.
 
-    def __init__(self) -> None:
+    Baris job baru dihapus setelah handler selesai, jadi job yang sedang
+    berjalan saat bot mati akan dijalankan ulang setelah restart; handler
+    persisten harus idempoten (mis. memeriksa status sebelum mengirim).
+    """
+
+    def __init__(
+        self,
+        *,
+        horizon_seconds: float = DEFAULT_HORIZON_SECONDS,
+        retry_seconds: float = JOB_RETRY_SECONDS,
+        max_attempts: int = MAX_JOB_ATTEMPTS,
+    ) -> None:
         self._scheduler = AsyncIOScheduler()
+        self._job_ids: set[str] = set()
+        self._store: Optional[ScheduledJobRepository] = None
+        self._policies: dict[str, JobPolicy] = {}
+        self._wakeup = asyncio.Event()
+        self._persistent_task: Optional[asyncio.Task[None]] = None
+        self._persistent_count = 0
+        self.horizon_seconds = max(1.0, horizon_seconds)
+        self._heap: list[tuple[float, str]] = []
+        self._window: dict[str, ScheduledJob] = {}
+        self._window_end = 0.0
+        self._window_truncated = False
+        # Menyerialkan refill jendela dengan upsert/cancel agar hasil baca store
+        # yang lebih lama tidak menimpa job yang baru saja dijadwalkan.
+        self._window_lock = asyncio.Lock()
+        self.retry_seconds = max(0.0, retry_seconds)
+        self.max_attempts = max(1, max_attempts)
+        # job_id -> (waktu coba ulang, jumlah percobaan gagal)
+        self._retries: dict[str, tuple[float, int]] = {}
+        self._metrics: dict[str, JobMetrics] = {}
+        # Waktu jadwal eksekusi job interval yang baru diserahkan ke executor;
+        # diambil saat job mulai berjalan untuk menghitung lag.
+        self._interval_jobs: set[str] = set()
+        self._submitted_run_times: dict[str, datetime] = {}
+        self._log = get_logger("Scheduler")
+        self._scheduler.add_listener(
+            self._track_jobs,
+            EVENT_JOB_ADDED | EVENT_JOB_REMOVED | EVENT_ALL_JOBS_REMOVED,
+        )
+        self._scheduler.add_listener(self._record_missed, EVENT_JOB_MISSED)
+        self._scheduler.add_listener(self._record_submitted, EVENT_JOB_SUBMITTED)
+
+    def _record_missed(self, event: SchedulerEvent) -> None:
+        if isinstance(event, JobEvent):
+            self.metrics_for(_job_kind(event.job_id)).misfires += 1
+
+    def _record_submitted(self, event: SchedulerEvent) -> None:
+        if not isinstance(event, JobSubmissionEvent) or event.job_id not in self._interval_jobs:
+            return
+        if event.scheduled_run_times:
+            # Dengan coalesce beberapa jadwal digabung; lag dihitung dari yang terakhir.
+            self._submitted_run_times[event.job_id] = max(event.scheduled_run_times)
+
+    def metrics_for(self, kind: str) -> JobMetrics:
+        metrics = self._metrics.get(kind)
+        if metrics is None:
+            metrics = self._metrics[kind] = JobMetrics()
+        return metrics
+
+    def metrics_summary(self) -> dict[str, dict[str, Any]]:
+        """Ringkasan lag, durasi, kegagalan, dan misfire per jenis job."""
+
+        return {kind: metrics.to_dict() for kind, metrics in sorted(self._metrics.items())}
+
+    def worst_lag(self) -> float:
+        """Lag p95 terbesar di antara semua jenis job (detik)."""
+
+        return max((metrics.lag.percentile(95) for metrics in self._metrics.values()), default=0.0)
+
+    def total_misfires(self) -> int:
+        return sum(metrics.misfires for metrics in self._metrics.values())
+
+    def _track_jobs(self, event: SchedulerEvent) -> None:
+        if event.code == EVENT_ALL_JOBS_REMOVED:
+            self._job_ids.clear()
+        elif isinstance(event, JobEvent):
+            if event.code == EVENT_JOB_ADDED:
+                self._job_ids.add(event.job_id)
+            else:
+                self._job_ids.discard(event.job_id)
 
     def start(self) -> None:
         if not self._scheduler.running:
             self._scheduler.start()
+        self._ensure_persistent_loop()
 
     def shutdown(self, wait: bool = True) -> None:
+        if self._persistent_task is not None:
+            self._persistent_task.cancel()
+            self._persistent_task = None
         if self._scheduler.running:
             self._scheduler.shutdown(wait=wait)
 
-    def schedule_once(self, job_id: str, run_time, func: Callable[..., Awaitable[Any]], *args: Any) -> None:
+    def attach_store(self, store: ScheduledJobRepository) -> None:
+        self._store = store
+        if self._scheduler.running:
+            self._ensure_persistent_loop()
+
+    def register_job_type(
+        self,
+        kind: str,
+        handler: JobHandler,
+        *,
+        misfire_grace_time: Optional[float] = None,
+        coalesce: bool = False,
+        on_misfire: Optional[MisfireHandler] = None,
+    ) -> None:
+        """Daftarkan handler job persisten; job jenis ini baru dieksekusi setelah terdaftar.
+
+        ``handler`` menerima satu :class:`ScheduledJob`, atau ``list`` job jika
+        ``coalesce`` aktif.
+        """
+
+        self._policies[kind] = JobPolicy(
+            handler=handler,
+            misfire_grace_time=misfire_grace_time,
+            coalesce=coalesce,
+            on_misfire=on_misfire,
+        )
+        # Jendela saat ini belum memuat job jenis baru ini.
+        self._window_end = 0.0
+        self._wakeup.set()
+
+    async def schedule_persistent(
+        self,
+        kind: str,
+        key: str | int,
+        run_time: datetime,
+        payload: Optional[dict[str, Any]] = None,
+    ) -> str:
+        if self._store is None:
+            raise RuntimeError("Penyimpanan job persisten belum dipasang.")
+        job = ScheduledJob(
+            job_id=f"{kind}-{key}",
+            kind=kind,
+            key=str(key),
+            run_at=run_time.timestamp(),
+            payload=payload or {},
+        )
+        async with self._window_lock:
+            inserted = await self._store.upsert(job)
+            self._retries.pop(job.job_id, None)
+            if inserted:
+                self._persistent_count += 1
+            if job.kind in self._policies and job.run_at <= self._window_end:
+                self._window[job.job_id] = job
+                heapq.heappush(self._heap, (job.run_at, job.job_id))
+                self._wakeup.set()
+            else:
+                self._window.pop(job.job_id, None)
+        return job.job_id
+
+    async def cancel_persistent(self, job_id: str) -> None:
+        if self._store is None:
+            return
+        async with self._window_lock:
+            removed = await self._store.delete(job_id)
+            self._persistent_count = max(self._persistent_count - removed, 0)
+            # Entri heap yang tertinggal diabaikan saat di-pop.
+            self._window.pop(job_id, None)
+            self._retries.pop(job_id, None)
+
+    def _ensure_persistent_loop(self) -> None:
+        if self._store is None:
+            return
+        if self._persistent_task is None or self._persistent_task.done():
+            self._persistent_task = asyncio.create_task(self._run_persistent(), name="forus-scheduler-store")
+
+    async def _run_persistent(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                delay = await self._tick()
+            except Exception:  # noqa: BLE001
+                self._log.exception("Gagal memproses job terjadwal persisten")
+                self._window_end = 0.0
+                delay = self.horizon_seconds
+            if delay <= 0:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _refill(self, now: float) -> None:
+        assert self._store is not None
+        async with self._window_lock:
+            until = now + self.horizon_seconds
+            # Job yang sedang menunggu backoff retry tidak dihitung ke limit agar
+            # tidak menutupi baris lain yang sudah jatuh tempo.
+            limit = WINDOW_LIMIT + len(self._retries)
+            jobs = await self._store.window(list(self._policies), until, limit=limit)
+            self._window = {job.job_id: job for job in jobs}
+            self._heap = [(self._due_at(job), job.job_id) for job in jobs]
+            heapq.heapify(self._heap)
+            self._window_truncated = len(jobs) >= limit
+            if self._window_truncated:
+                # Jendela terpotong: muat ulang setelah job terakhir, tetapi jangan
+                # lebih cepat dari WINDOW_REFILL_FLOOR agar tidak query terus-menerus.
+                self._window_end = max(jobs[-1].run_at, now + WINDOW_REFILL_FLOOR)
+            else:
+                self._window_end = until
+            self._persistent_count = await self._store.count()
+
+    def _due_at(self, job: ScheduledJob) -> float:
+        retry = self._retries.get(job.job_id)
+        return max(job.run_at, retry[0]) if retry is not None else job.run_at
+
+    def _pop_due(self, now: float) -> list[ScheduledJob]:
+        due: list[ScheduledJob] = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, job_id = heapq.heappop(self._heap)
+            job = self._window.get(job_id)
+            if job is None or self._due_at(job) != due_at:
+                continue
+            del self._window[job_id]
+            due.append(job)
+        return due
+
+    async def _tick(self) -> float:
+        """Jalankan job yang jatuh tempo; kembalikan jeda hingga tick berikutnya."""
+
+        assert self._store is not None
+        now = time.time()
+        if now >= self._window_end:
+            await self._refill(now)
+        jobs = self._pop_due(now)
+        if jobs:
+            failed = await self._execute(jobs, now)
+            finished = [job for job in jobs if job.job_id not in failed]
+            retried = [job for job in jobs if job.job_id in failed]
+            finished.extend(self._schedule_retries(retried, now))
+            if retried and self._window_truncated:
+                # Job yang masuk backoff membebaskan slot limit; muat baris berikutnya.
+                self._window_end = 0.0
+            # Baris baru dihapus setelah handler selesai; baris yang dijadwalkan
+            # ulang oleh handler (``run_at`` berubah) tidak ikut terhapus.
+            removed = await self._store.complete(finished)
+            self._persistent_count = max(self._persistent_count - removed, 0)
+        wake_at = self._window_end
+        if self._heap:
+            wake_at = min(wake_at, self._heap[0][0])
+        return max(wake_at - time.time(), 0.0)
+
+    def _schedule_retries(self, failed: list[ScheduledJob], now: float) -> list[ScheduledJob]:
+        """Jadwalkan ulang job gagal di heap; kembalikan job yang percobaannya sudah habis."""
+
+        exhausted: list[ScheduledJob] = []
+        for job in failed:
+            attempts = self._retries.get(job.job_id, (0.0, 0))[1] + 1
+            if attempts >= self.max_attempts:
+                self._retries.pop(job.job_id, None)
+                self._log.error("Job %s gagal %s kali; dihapus dari antrean", job.job_id, attempts)
+                exhausted.append(job)
+                continue
+            if job.job_id in self._window:
+                # Handler sudah menjadwalkan ulang job ini sendiri.
+                continue
+            retry_at = now + self.retry_seconds * (2 ** (attempts - 1))
+            self._retries[job.job_id] = (retry_at, attempts)
+            self._window[job.job_id] = job
+            heapq.heappush(self._heap, (retry_at, job.job_id))
+            self._log.warning("Job %s gagal (percobaan %s); dicoba lagi dalam %.0f detik", job.job_id, attempts, retry_at - now)
+        return exhausted
+
+    async def _execute(self, jobs: list[ScheduledJob], now: float) -> set[str]:
+        """Jalankan job per jenis; kembalikan ID job yang handler-nya gagal."""
+
+        failed: set[str] = set()
+        grouped: dict[str, list[ScheduledJob]] = {}
+        for job in jobs:
+            grouped.setdefault(job.kind, []).append(job)
+
+        for kind, kind_jobs in grouped.items():
+            policy = self._policies[kind]
+            metrics = self.metrics_for(kind)
+            runnable: list[ScheduledJob] = []
+            missed: list[ScheduledJob] = []
+            for job in kind_jobs:
+                late = now - job.run_at
+                if policy.misfire_grace_time is not None and late > policy.misfire_grace_time:
+                    missed.append(job)
+                else:
+                    runnable.append(job)
+
+            if missed:
+                metrics.misfires += len(missed)
+                self._log.warning("%s job %s terlewat melebihi batas toleransi", len(missed), kind)
+                if policy.on_misfire is not None and not await self._invoke(kind, policy.on_misfire, missed):
+                    failed.update(job.job_id for job in missed)
+            if not runnable:
+                continue
+            started = time.time()
+            for job in runnable:
+                metrics.lag.add(max(started - self._due_at(job), 0.0))
+            metrics.runs += len(runnable)
+            if policy.coalesce:
+                if not await self._invoke(kind, policy.handler, runnable, metrics=metrics):
+                    failed.update(job.job_id for job in runnable)
+            else:
+                for job in runnable:
+                    if not await self._invoke(kind, policy.handler, job, metrics=metrics):
+                        failed.add(job.job_id)
+        return failed
+
+    async def _invoke(
+        self,
+        kind: str,
+        func: Callable[..., Awaitable[None]],
+        argument: Any,
+        *,
+        metrics: Optional[JobMetrics] = None,
+    ) -> bool:
+        started = time.perf_counter()
+        try:
+            await func(argument)
+            return True
+        except Exception:  # noqa: BLE001
+            self._log.exception("Handler job %s gagal", kind)
+            if metrics is not None:
+                metrics.failures += 1
+            return False
+        finally:
+            if metrics is not None:
+                metrics.runtime.add(time.perf_counter() - started)
+
+    def _instrument(
+        self,
+        kind: str,
+        run_time: Optional[datetime],
+        func: Callable[..., Awaitable[Any]],
+        *,
+        job_id: Optional[str] = None,
+    ) -> Callable[..., Awaitable[Any]]:
+        """Bungkus ``func`` dengan pencatatan lag, durasi, dan kegagalan.
+
+        Lag job satu kali dihitung dari ``run_time``; job interval memakai
+        waktu jadwal dari event ``EVENT_JOB_SUBMITTED`` milik ``job_id``.
+        """
+
+        metrics = self.metrics_for(kind)
+        fixed_at = run_time.timestamp() if run_time is not None else None
+
+        async def _run(*args: Any) -> Any:
+            scheduled_at = fixed_at
+            if scheduled_at is None and job_id is not None:
+                submitted = self._submitted_run_times.pop(job_id, None)
+                scheduled_at = submitted.timestamp() if submitted is not None else None
+            if scheduled_at is not None:
+                metrics.lag.add(max(time.time() - scheduled_at, 0.0))
+            metrics.runs += 1
+            started = time.perf_counter()
+            try:
+                return await func(*args)
+            except Exception:
+                metrics.failures += 1
+                raise
+            finally:
+                metrics.runtime.add(time.perf_counter() - started)
+
+        return _run
+
+    def schedule_once(
+        self,
+        job_id: str,
+        run_time,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+        kind: Optional[str] = None,
+    ) -> None:
         self._scheduler.add_job(
-            func,
+            self._instrument(kind or _job_kind(job_id), run_time, func),
             "date",
             run_date=run_time,
             args=list(args),
@@ -29,6 +448,34 @@ class Scheduler:
             replace_existing=True,
         )
 
+    def schedule_interval(
+        self,
+        job_id: str,
+        seconds: float,
+        func: Callable[..., Awaitable[Any]],
+        *args: Any,
+        kind: Optional[str] = None,
+        jitter: Optional[int] = None,
+        first_run: Optional[datetime] = None,
+    ) -> None:
+        options: dict[str, Any] = {}
+        if first_run is not None:
+            options["next_run_time"] = first_run
+        self._interval_jobs.add(job_id)
+        self._submitted_run_times.pop(job_id, None)
+        self._scheduler.add_job(
+            self._instrument(kind or _job_kind(job_id), None, func, job_id=job_id),
+            "interval",
+            seconds=seconds,
+            args=list(args),
+            id=job_id,
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1,
+            jitter=jitter,
+            **options,
+        )
+
     def schedule_reminder(self, reminder_id: int, run_time, func: Callable[[int], Awaitable[None]]) -> None:
         self.schedule_once(f"reminder-{reminder_id}", run_time, func, reminder_id)
 
@@ -36,12 +483,22 @@ class Scheduler:
         return self._scheduler.get_job(job_id) is not None
 
     def cancel(self, job_id: str) -> None:
+        self._interval_jobs.discard(job_id)
+        self._submitted_run_times.pop(job_id, None)
         job = self._scheduler.get_job(job_id)
         if job:
             job.remove()
 
     def job_count(self) -> int:
-        return len(self._scheduler.get_jobs())
+        if not self._scheduler.running:
+            return len(self._scheduler.get_jobs()) + self._persistent_count
+        return len(self._job_ids) + self._persistent_count
 
     def list_jobs(self) -> list[str]:
         return [job.id or "" for job in self._scheduler.get_jobs()]
+
+
+def _job_kind(job_id: Optional[str]) -> str:
+    """Jenis job dari ID berformat ``<jenis>-<kunci>`` (mis. ``reminder-12``)."""
+
+    return (job_id or "lainnya").split("-", 1)[0]
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Optional
+
+from .utility_tools import GuildStatistics, gather_guild_statistics
+
+
+__all__ = ["JobMetrics", "RollingHistogram", "StatsRegistry"]
+
+
+# Nilai ``ChannelType`` Discord -> field GuildStatistics yang dihitung.
+_CHANNEL_FIELDS = {
+    0: "text_channels",  # GUILD_TEXT
+    5: "text_channels",  # GUILD_ANNOUNCEMENT
+    2: "voice_channels",
+    13: "stage_channels",
+    15: "forum_channels",
+    16: "forum_channels",  # GUILD_MEDIA
+    4: "categories",
+    10: "thread_channels",
+    11: "thread_channels",
+    12: "thread_channels",
+}
+
+
+def _channel_field(channel: Any) -> Optional[str]:
+    try:
+        return _CHANNEL_FIELDS.get(int(getattr(channel, "type", -1)))
+    except (TypeError, ValueError):
+        return None
+
+
+def _guild_id_of(obj: Any) -> Optional[int]:
+    guild_id = getattr(obj, "guild_id", None) or getattr(obj, "_guild_id", None)
+    if guild_id is None:
+        guild_id = getattr(getattr(obj, "guild", None), "id", None)
+    return int(guild_id) if guild_id is not None else None
+
+
+class StatsRegistry:
+    """Penghitung agregat bot yang diperbarui bertahap dari event gateway.
+
+    :class:`GuildStatistics` dihitung sekali per guild saat guild tersedia,
+    lalu disesuaikan per event (anggota masuk/keluar, channel/thread/role
+    dibuat/dihapus, emoji/stiker diperbarui, acara terjadwal dibuat/dihapus,
+    update guild), sehingga presence, ``/botstats`` dan
+    ``/serverinfo`` tidak perlu mengiterasi anggota atau koleksi channel.
+    """
+
+    def __init__(self) -> None:
+        self._guilds: dict[int, GuildStatistics] = {}
+        self.member_count = 0
+        self.human_count = 0
+        self.bot_count = 0
+
+    @property
+    def guild_count(self) -> int:
+        return len(self._guilds)
+
+    def _apply(self, stats: GuildStatistics, sign: int) -> None:
+        self.member_count += sign * stats.total_members
+        self.human_count += sign * stats.human_members
+        self.bot_count += sign * stats.bot_members
+
+    def rebuild(self, guilds: Iterable[Any]) -> None:
+        self._guilds.clear()
+        self.member_count = self.human_count = self.bot_count = 0
+        for guild in guilds:
+            self.track_guild(guild)
+
+    def track_guild(self, guild: Any) -> None:
+        stats = gather_guild_statistics(guild)
+        previous = self._guilds.get(guild.id)
+        if previous is not None:
+            self._apply(previous, -1)
+        self._guilds[guild.id] = stats
+        self._apply(stats, 1)
+
+    def forget_guild(self, guild_id: int) -> None:
+        previous = self._guilds.pop(guild_id, None)
+        if previous is not None:
+            self._apply(previous, -1)
+
+    def member_joined(self, guild_id: int, *, is_bot: bool) -> None:
+        self._adjust_member(guild_id, 1, is_bot=is_bot)
+
+    def member_left(self, guild_id: int, *, is_bot: bool) -> None:
+        self._adjust_member(guild_id, -1, is_bot=is_bot)
+
+    def _adjust_member(self, guild_id: int, delta: int, *, is_bot: bool) -> None:
+        stats = self._guilds.get(guild_id)
+        if stats is None:
+            return
+        self._apply(stats, -1)
+        stats.total_members = max(stats.total_members + delta, 0)
+        if is_bot:
+            stats.bot_members = max(stats.bot_members + delta, 0)
+        else:
+            stats.human_members = max(stats.human_members + delta, 0)
+        self._apply(stats, 1)
+
+    def _adjust(self, guild_id: Optional[int], name: Optional[str], delta: int) -> None:
+        stats = self._guilds.get(guild_id) if guild_id is not None else None
+        if stats is None or name is None:
+            return
+        setattr(stats, name, max(getattr(stats, name) + delta, 0))
+
+    def channel_created(self, channel: Any) -> None:
+        self._adjust(_guild_id_of(channel), _channel_field(channel), 1)
+
+    def channel_deleted(self, channel: Any) -> None:
+        self._adjust(_guild_id_of(channel), _channel_field(channel), -1)
+
+    def role_created(self, guild_id: int) -> None:
+        self._adjust(guild_id, "roles", 1)
+
+    def role_deleted(self, guild_id: int) -> None:
+        self._adjust(guild_id, "roles", -1)
+
+    def emojis_updated(self, guild_id: int, emojis: Optional[Iterable[Any]]) -> None:
+        self._set(guild_id, "emoji_count", len(list(emojis or ())))
+
+    def stickers_updated(self, guild_id: int, stickers: Optional[Iterable[Any]]) -> None:
+        self._set(guild_id, "sticker_count", len(list(stickers or ())))
+
+    def scheduled_event_created(self, event: Any) -> None:
+        self._adjust(_guild_id_of(event), "scheduled_events", 1)
+
+    def scheduled_event_deleted(self, event: Any) -> None:
+        self._adjust(_guild_id_of(event), "scheduled_events", -1)
+
+    def _set(self, guild_id: int, name: str, value: int) -> None:
+        stats = self._guilds.get(guild_id)
+        if stats is not None:
+            setattr(stats, name, value)
+
+    def guild_updated(self, guild: Any) -> None:
+        stats = self._guilds.get(guild.id)
+        if stats is None:
+            return
+        stats.boosts = getattr(guild, "premium_subscription_count", 0) or 0
+        stats.boost_level = getattr(guild, "premium_tier", 0) or 0
+
+    def guild(self, guild_id: int) -> Optional[GuildStatistics]:
+        return self._guilds.get(guild_id)
+
+
+class RollingHistogram:
+    """Sampel terbaru (maksimal ``maxlen``) untuk menghitung persentil bergulir."""
+
+    __slots__ = ("_samples", "count")
+
+    def __init__(self, maxlen: int = 256) -> None:
+        self._samples: deque[float] = deque(maxlen=max(1, maxlen))
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+        self.count += 1
+
+    def percentile(self, q: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(int(round(q / 100 * (len(ordered) - 1))), len(ordered) - 1)
+        return ordered[index]
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": max(self._samples, default=0.0),
+        }
+
+
+@dataclass(slots=True)
+class JobMetrics:
+    """Metrik eksekusi satu jenis job terjadwal (detik untuk lag dan durasi)."""
+
+    runs: int = 0
+    failures: int = 0
+    misfires: int = 0
+    lag: RollingHistogram = field(default_factory=RollingHistogram)
+    runtime: RollingHistogram = field(default_factory=RollingHistogram)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "misfires": self.misfires,
+            "lag": self.lag.summary(),
+            "runtime": self.runtime.summary(),
+        }
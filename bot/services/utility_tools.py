@@ -4,11 +4,14 @@ import os
 import re
 import sys
 from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime, time as dt_time, timedelta, timezone as dt_timezone, tzinfo
 from typing import Any, Iterable, Sequence
 
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
+from .resources import read_proc_status
+
 __all__ = [
     "GuildStatistics",
     "resolve_timezone",
@@ -34,12 +37,6 @@ SUPPORTED_TIME_FORMATS: Sequence[str] = (
     "%d/%m/%Y",
 )
 
-_DATE_ONLY_FORMATS = {
-    "%Y-%m-%d",
-    "%d-%m-%Y",
-    "%d/%m/%Y",
-}
-
 _TIME_ONLY_FORMATS = {
     "%H:%M",
     "%H:%M:%S",
@@ -61,6 +58,38 @@ _TZ_ALIAS = {
 
 _OFFSET_RE = re.compile(r"^(?:UTC|GMT)?\s*([+-])\s*(\d{1,2})(?::?(\d{2}))?$", re.IGNORECASE)
 
+TIMEZONE_CACHE_SIZE = 256
+
+# Padanan direktif strptime yang dipakai SUPPORTED_TIME_FORMATS (angka satu
+# digit tetap diterima seperti strptime).
+_DIRECTIVE_PATTERNS = {
+    "Y": r"(?P<Y>\d{4})",
+    "m": r"(?P<m>1[0-2]|0?[1-9])",
+    "d": r"(?P<d>3[01]|[12]\d|0?[1-9])",
+    "H": r"(?P<H>2[0-3]|[01]?\d)",
+    "M": r"(?P<M>[0-5]?\d)",
+    "S": r"(?P<S>[0-5]?\d)",
+}
+
+
+def _compile_format(fmt: str) -> re.Pattern[str]:
+    parts: list[str] = []
+    index = 0
+    while index < len(fmt):
+        char = fmt[index]
+        if char == "%":
+            parts.append(_DIRECTIVE_PATTERNS[fmt[index + 1]])
+            index += 2
+            continue
+        parts.append(r"\s+" if char == " " else re.escape(char))
+        index += 1
+    return re.compile("".join(parts), re.IGNORECASE)
+
+
+_FORMAT_GRAMMAR: Sequence[tuple[str, re.Pattern[str]]] = tuple(
+    (fmt, _compile_format(fmt)) for fmt in SUPPORTED_TIME_FORMATS
+)
+
 
 @dataclass(slots=True)
 class GuildStatistics:
@@ -81,27 +110,54 @@ class GuildStatistics:
     boost_level: int
 
 
-def _parse_timezone_string(value: str, *, source: str | None = None) -> tzinfo:
-    candidate = value.strip()
-    alias_key = candidate.upper()
-    if alias_key in _TZ_ALIAS:
-        candidate = _TZ_ALIAS[alias_key]
+class _InvalidOffset(ValueError):
+    pass
+
+
+@lru_cache(maxsize=TIMEZONE_CACHE_SIZE)
+def _normalize_timezone_name(value: str) -> str:
+    candidate = " ".join(value.split())
+    upper = candidate.upper()
+    if upper in _TZ_ALIAS:
+        return _TZ_ALIAS[upper]
+    if _OFFSET_RE.fullmatch(candidate):
+        # "utc + 7" dan "UTC+7" berbagi satu entri cache.
+        return upper.replace(" ", "")
+    return candidate
+
+
+@lru_cache(maxsize=TIMEZONE_CACHE_SIZE)
+def _load_timezone(candidate: str) -> tzinfo | None:
+    """Muat zona waktu yang sudah dinormalisasi; ``None`` jika tidak dikenali.
+
+    Hasil di-memo (LRU) karena nama yang sama dipakai berulang per guild, dan
+    offset seperti ``UTC+7`` selalu gagal dulu di ``ZoneInfo`` sebelum diurai.
+    """
 
     try:
         return ZoneInfo(candidate)
-    except ZoneInfoNotFoundError as exc:
-        match = _OFFSET_RE.fullmatch(candidate)
-        if not match:
-            label = source if source is not None else value
-            raise ValueError(f"Zona waktu '{label}' tidak dikenali.") from exc
-        sign = 1 if match.group(1) == "+" else -1
-        hours = int(match.group(2))
-        minutes = int(match.group(3) or 0)
-        if hours > 23 or minutes > 59:
-            label = source if source is not None else value
-            raise ValueError(f"Offset zona waktu '{label}' tidak valid.") from exc
-        delta = timedelta(hours=hours, minutes=minutes) * sign
-        return dt_timezone(delta)
+    except ZoneInfoNotFoundError:
+        pass
+    match = _OFFSET_RE.fullmatch(candidate)
+    if not match:
+        return None
+    sign = 1 if match.group(1) == "+" else -1
+    hours = int(match.group(2))
+    minutes = int(match.group(3) or 0)
+    if hours > 23 or minutes > 59:
+        raise _InvalidOffset(candidate)
+    return dt_timezone(timedelta(hours=hours, minutes=minutes) * sign)
+
+
+def _parse_timezone_string(value: str, *, source: str | None = None) -> tzinfo:
+    label = source if source is not None else value
+    try:
+        tz = _load_timezone(_normalize_timezone_name(value))
+    except _InvalidOffset as exc:
+        raise ValueError(f"Offset zona waktu '{label}' tidak valid.") from exc
+    if tz is None:
+        raise ValueError(f"Zona waktu '{label}' tidak dikenali.")
+    return tz
 
 
 def _to_timezone(value: tzinfo | str | None) -> tzinfo:
@@ -149,16 +205,27 @@ def parse_datetime_input(value: str, tz: tzinfo, *, reference: datetime | None =
             return iso.replace(tzinfo=tz)
         return iso.astimezone(tz)
 
-    for fmt in SUPPORTED_TIME_FORMATS:
+    for fmt, pattern in _FORMAT_GRAMMAR:
+        match = pattern.fullmatch(raw)
+        if match is None:
+            continue
+        fields = {key: int(number) for key, number in match.groupdict().items()}
         try:
-            parsed = datetime.strptime(raw, fmt)
+            if fmt in _TIME_ONLY_FORMATS:
+                parsed_time = dt_time(fields["H"], fields["M"], fields.get("S", 0))
+                return datetime.combine(reference.date(), parsed_time, tz)
+            return datetime(
+                fields["Y"],
+                fields["m"],
+                fields["d"],
+                fields.get("H", 0),
+                fields.get("M", 0),
+                fields.get("S", 0),
+                tzinfo=tz,
+            )
         except ValueError:
+            # Tanggal mustahil (mis. 31/02): coba format berikutnya seperti strptime.
             continue
-        if fmt in _DATE_ONLY_FORMATS:
-            return datetime.combine(parsed.date(), dt_time(), tz)
-        if fmt in _TIME_ONLY_FORMATS:
-            return datetime.combine(reference.date(), parsed.time(), tz)
-        return parsed.replace(tzinfo=tz)
 
     raise ValueError(
         "Format waktu tidak dikenali. Gunakan format seperti '2025-01-31 19:45' atau '31-01-2025 19:45'."
@@ -224,17 +291,27 @@ def gather_guild_statistics(guild: Any) -> GuildStatistics:
 
 
 def process_resource_snapshot() -> dict[str, Any]:
-    memory_mb: float | None = None
+    """Memori proses saat ini (RSS), puncaknya, dan load average.
+
+    ``memory_mb`` memakai ``VmRSS`` dari ``/proc`` bila tersedia; ``ru_maxrss``
+    hanya puncak sepanjang umur proses sehingga dilaporkan terpisah sebagai
+    ``peak_memory_mb``.
+    """
+
+    peak_mb: float | None = None
     try:
         import resource  # type: ignore
 
         usage = resource.getrusage(resource.RUSAGE_SELF)
         if sys.platform.startswith("darwin"):
-            memory_mb = usage.ru_maxrss / (1024 * 1024)
+            peak_mb = usage.ru_maxrss / (1024 * 1024)
         else:
-            memory_mb = usage.ru_maxrss / 1024
+            peak_mb = usage.ru_maxrss / 1024
     except (ImportError, AttributeError):
-        memory_mb = None
+        peak_mb = None
+
+    status = read_proc_status()
+    memory_mb = status["VmRSS"] / 1024 if "VmRSS" in status else peak_mb
 
     try:
         load_avg = os.getloadavg()
@@ -243,6 +320,7 @@ def process_resource_snapshot() -> dict[str, Any]:
 
     return {
         "memory_mb": memory_mb,
+        "peak_memory_mb": peak_mb,
         "load_average": load_avg,
     }
 
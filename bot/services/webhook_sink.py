@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Sequence
+
+import interactions
+
+from .logging import get_logger
+
+
+__all__ = ["WebhookLogSink"]
+
+
+DEFAULT_WEBHOOK_NAME = "ForUS Activity Log"
+# Channel tanpa izin Manage Webhooks dicoba lagi setelah jeda ini, karena izin
+# bisa diberikan kemudian tanpa event yang memberi tahu sink.
+UNSUPPORTED_RETRY_SECONDS = 15 * 60
+
+
+class _WebhookBucket:
+    """Batas kirim lokal per webhook, terpisah dari bucket global bot."""
+
+    __slots__ = ("rate", "per", "_sent")
+
+    def __init__(self, rate: int, per: float) -> None:
+        self.rate = max(1, rate)
+        self.per = max(0.0, per)
+        self._sent: deque[float] = deque()
+
+    def delay(self, now: float) -> float:
+        while self._sent and now - self._sent[0] >= self.per:
+            self._sent.popleft()
+        if len(self._sent) < self.rate:
+            return 0.0
+        return self.per - (now - self._sent[0])
+
+    def record(self, now: float) -> None:
+        self._sent.append(now)
+
+
+class WebhookLogSink:
+    """Kirim batch log aktivitas lewat webhook milik bot per channel log.
+
+    Satu webhook dibuat (atau dipakai ulang bila sudah ada dengan nama yang
+    sama) untuk tiap channel, disimpan di memori, dan dibuat ulang otomatis
+    jika terhapus. Pengiriman lewat webhook memakai bucket rate limit
+    tersendiri sehingga volume log tidak memperlambat respons perintah.
+    Channel yang menolak pembuatan webhook memakai pengiriman biasa selama
+    ``unsupported_ttl`` detik sebelum webhook dicoba lagi.
+    """
+
+    def __init__(
+        self,
+        *,
+        name: str = DEFAULT_WEBHOOK_NAME,
+        rate: int = 5,
+        per: float = 2.0,
+        unsupported_ttl: float = UNSUPPORTED_RETRY_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self._rate = rate
+        self._per = per
+        self._webhooks: dict[int, interactions.Webhook] = {}
+        self._buckets: dict[int, _WebhookBucket] = {}
+        self._locks: dict[int, asyncio.Lock] = {}
+        # channel_id -> waktu (``clock``) saat webhook boleh dicoba lagi
+        self._unsupported: dict[int, float] = {}
+        self.unsupported_ttl = max(0.0, unsupported_ttl)
+        self._clock = clock
+        self._log = get_logger("WebhookLogSink")
+        self.webhooks_created = 0
+        self.webhooks_recreated = 0
+        self.throttled = 0
+
+    def supports(self, channel_id: int) -> bool:
+        retry_at = self._unsupported.get(channel_id)
+        if retry_at is None:
+            return True
+        if self._clock() >= retry_at:
+            del self._unsupported[channel_id]
+            return True
+        return False
+
+    def forget(self, channel_id: int) -> None:
+        self._webhooks.pop(channel_id, None)
+
+    async def _acquire(self, channel: Any) -> interactions.Webhook:
+        webhook = self._webhooks.get(channel.id)
+        if webhook is not None:
+            return webhook
+
+        lock = self._locks.setdefault(channel.id, asyncio.Lock())
+        async with lock:
+            webhook = self._webhooks.get(channel.id)
+            if webhook is not None:
+                return webhook
+            for existing in await channel.fetch_webhooks():
+                if existing.name == self.name and existing.token:
+                    webhook = existing
+                    break
+            if webhook is None:
+                webhook = await channel.create_webhook(name=self.name)
+                self.webhooks_created += 1
+            self._webhooks[channel.id] = webhook
+            return webhook
+
+    async def _throttle(self, channel_id: int) -> None:
+        bucket = self._buckets.get(channel_id)
+        if bucket is None:
+            bucket = _WebhookBucket(self._rate, self._per)
+            self._buckets[channel_id] = bucket
+        delay = bucket.delay(self._clock())
+        if delay > 0:
+            self.throttled += 1
+            await asyncio.sleep(delay)
+        bucket.record(self._clock())
+
+    async def send(self, channel: Any, embeds: Sequence[interactions.Embed]) -> None:
+        """Kirim embed lewat webhook channel.
+
+        ``Forbidden`` (bot tidak punya izin Manage Webhooks) menandai channel
+        sebagai tidak didukung lalu diteruskan ke pemanggil agar bisa kembali
+        ke pengiriman biasa.
+        """
+
+        webhook = await self._acquire_supported(channel)
+        await self._throttle(channel.id)
+        try:
+            await webhook.send(embeds=list(embeds))
+        except interactions.errors.NotFound:
+            self.forget(channel.id)
+            self.webhooks_recreated += 1
+            webhook = await self._acquire_supported(channel)
+            await webhook.send(embeds=list(embeds))
+
+    async def _acquire_supported(self, channel: Any) -> interactions.Webhook:
+        try:
+            return await self._acquire(channel)
+        except interactions.errors.Forbidden:
+            self._unsupported[channel.id] = self._clock() + self.unsupported_ttl
+            self._log.info("Izin webhook tidak tersedia di channel %s, memakai pengiriman biasa", channel.id)
+            raise
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "webhooks": len(self._webhooks),
+            "webhooks_created": self.webhooks_created,
+            "webhooks_recreated": self.webhooks_recreated,
+            "throttled": self.throttled,
+            "unsupported": len(self._unsupported),
+        }
@@ -1,8 +1,19 @@
 from types import SimpleNamespace
 
+import interactions
 import pytest
 
-from bot.services.activity_logger import format_attachments, format_user, truncate_content
+from bot.services.activity_logger import (
+    ActivityLogger,
+    _ActivityLogConfig,
+    format_attachments,
+    format_category_mode,
+    format_user,
+    parse_category_mode,
+    truncate_content,
+)
+from bot.services.activity_outbox import ActivityLogOutbox
+from bot.services.webhook_sink import WebhookLogSink
 
 
 class DummyAttachment:
@@ -49,3 +60,297 @@ def test_format_user_defaults() -> None:
     dummy = SimpleNamespace(mention="@user", id=123456, display_name="Dummy")
     assert format_user(dummy) == "@user (`123456`)"
     assert format_user(None) == "Unknown"
+
+
+class DummyChannel:
+    def __init__(self, channel_id: int = 900) -> None:
+        self.id = channel_id
+        self.sent: list[list[interactions.Embed]] = []
+
+    async def send(self, *, embeds):
+        self.sent.append(list(embeds))
+
+
+def _embed(title: str, value: str = "isi") -> interactions.Embed:
+    embed = interactions.Embed(title=title)
+    embed.add_field(name="Isi", value=value)
+    return embed
+
+
+@pytest.mark.asyncio()
+async def test_outbox_packs_embeds_per_message() -> None:
+    outbox = ActivityLogOutbox(flush_interval=60)
+    channel = DummyChannel()
+
+    for index in range(23):
+        outbox.submit(channel, _embed(f"Log {index}"), guild_id=1)
+    await outbox.close()
+
+    assert [len(batch) for batch in channel.sent] == [10, 10, 3]
+    assert outbox.messages_sent == 3
+    assert outbox.embeds_sent == 23
+
+
+@pytest.mark.asyncio()
+async def test_outbox_splits_batch_over_total_char_limit() -> None:
+    outbox = ActivityLogOutbox(flush_interval=60)
+    channel = DummyChannel()
+
+    for index in range(8):
+        outbox.submit(channel, _embed(f"Log {index}", "x" * 1000), guild_id=1)
+    await outbox.flush()
+
+    assert [len(batch) for batch in channel.sent] == [5, 3]
+    assert all(sum(len(embed) for embed in batch) <= 6000 for batch in channel.sent)
+    assert [embed.title for batch in channel.sent for embed in batch] == [f"Log {index}" for index in range(8)]
+    assert outbox.embeds_sent == 8
+    assert outbox.summaries_sent == 0
+
+
+@pytest.mark.asyncio()
+async def test_outbox_summarizes_single_oversized_embed() -> None:
+    outbox = ActivityLogOutbox(flush_interval=60)
+    channel = DummyChannel()
+    huge = interactions.Embed(title="Pesan Diedit")
+    for index in range(7):
+        huge.add_field(name=f"Bagian {index}", value="x" * 1000)
+
+    outbox.submit(channel, _embed("Log kecil"), guild_id=1)
+    outbox.submit(channel, huge, guild_id=1)
+    await outbox.flush()
+
+    assert [len(batch) for batch in channel.sent] == [1, 1]
+    assert channel.sent[0][0].title == "Log kecil"
+    (summary,) = channel.sent[1]
+    assert "1 aktivitas" in summary.title
+    assert len(summary) <= 6000
+    assert outbox.summaries_sent == 1
+
+
+@pytest.mark.asyncio()
+async def test_outbox_sends_moderation_before_chatter() -> None:
+    outbox = ActivityLogOutbox(flush_interval=60)
+    channel = DummyChannel()
+
+    outbox.submit(channel, _embed("Pesan Baru"), guild_id=1, category="messages")
+    outbox.submit(channel, _embed("Anggota Keluar"), guild_id=1, category="members")
+    await outbox.close()
+
+    assert [embed.title for embed in channel.sent[0]] == ["Anggota Keluar", "Pesan Baru"]
+
+
+@pytest.mark.asyncio()
+async def test_outbox_overflow_evicts_chatter_and_counts() -> None:
+    outbox = ActivityLogOutbox(flush_interval=60, max_pending=3, overflow="summarize")
+    channel = DummyChannel()
+
+    for index in range(3):
+        assert outbox.submit(channel, _embed(f"Reaksi {index}"), guild_id=1, category="reactions")
+    assert outbox.submit(channel, _embed("Role"), guild_id=1, category="server")
+    assert not outbox.submit(channel, _embed("Reaksi 4"), guild_id=1, category="reactions")
+    assert outbox.pending(1) == 3
+    await outbox.close()
+
+    titles = [embed.title for embed in channel.sent[0]]
+    assert titles[0] == "Role"
+    assert titles[-1] == "2 Log Dilewati"
+    assert outbox.coalesced == 2
+    assert outbox.dropped == 0
+
+
+@pytest.mark.asyncio()
+async def test_outbox_drop_policy_counts_dropped() -> None:
+    outbox = ActivityLogOutbox(flush_interval=60, max_pending=1, overflow="drop")
+    channel = DummyChannel()
+
+    outbox.submit(channel, _embed("Pesan 1"), guild_id=1, category="messages")
+    outbox.submit(channel, _embed("Pesan 2"), guild_id=1, category="messages")
+    await outbox.close()
+
+    assert [embed.title for embed in channel.sent[0]] == ["Pesan 1"]
+    assert outbox.dropped == 1
+
+
+class _WebhookGone(interactions.errors.NotFound):
+    def __init__(self) -> None:
+        Exception.__init__(self, "Unknown Webhook")
+
+
+class DummyWebhook:
+    def __init__(self, name: str, *, deleted: bool = False) -> None:
+        self.name = name
+        self.token = "token"
+        self.deleted = deleted
+        self.sent: list[list[interactions.Embed]] = []
+
+    async def send(self, *, embeds):
+        if self.deleted:
+            raise _WebhookGone()
+        self.sent.append(list(embeds))
+
+
+class WebhookChannel(DummyChannel):
+    def __init__(self, channel_id: int = 901) -> None:
+        super().__init__(channel_id)
+        self.webhooks: list[DummyWebhook] = []
+
+    async def fetch_webhooks(self):
+        return [hook for hook in self.webhooks if not hook.deleted]
+
+    async def create_webhook(self, *, name: str):
+        hook = DummyWebhook(name)
+        self.webhooks.append(hook)
+        return hook
+
+
+@pytest.mark.asyncio()
+async def test_outbox_webhook_sink_reuses_and_recreates_webhook() -> None:
+    sink = WebhookLogSink(rate=100, per=1.0)
+    outbox = ActivityLogOutbox(flush_interval=60, sink=sink)
+    channel = WebhookChannel()
+
+    outbox.submit(channel, _embed("Log 1"), guild_id=1)
+    await outbox.flush()
+    first = channel.webhooks[0]
+    first.deleted = True
+    outbox.submit(channel, _embed("Log 2"), guild_id=1)
+    await outbox.close()
+
+    assert channel.sent == []
+    assert [len(hook.sent) for hook in channel.webhooks] == [1, 1]
+    assert sink.webhooks_created == 2
+    assert sink.webhooks_recreated == 1
+
+
+class _NoWebhookPermission(interactions.errors.Forbidden):
+    def __init__(self) -> None:
+        Exception.__init__(self, "Missing Permissions")
+
+
+@pytest.mark.asyncio()
+async def test_webhook_sink_retries_unsupported_channel_after_ttl() -> None:
+    now = [0.0]
+    sink = WebhookLogSink(rate=100, per=1.0, unsupported_ttl=600, clock=lambda: now[0])
+    outbox = ActivityLogOutbox(flush_interval=60, sink=sink)
+    channel = WebhookChannel()
+    denied = {"value": True}
+    original_create = channel.create_webhook
+
+    async def create_webhook(*, name: str):
+        if denied["value"]:
+            raise _NoWebhookPermission()
+        return await original_create(name=name)
+
+    channel.create_webhook = create_webhook
+
+    outbox.submit(channel, _embed("Log 1"), guild_id=1)
+    await outbox.flush()
+    assert len(channel.sent) == 1
+    assert not sink.supports(channel.id)
+
+    # Izin diberikan kemudian; setelah TTL webhook dicoba lagi.
+    denied["value"] = False
+    now[0] = 601.0
+    assert sink.supports(channel.id)
+    outbox.submit(channel, _embed("Log 2"), guild_id=1)
+    await outbox.close()
+
+    assert len(channel.sent) == 1
+    assert [len(hook.sent) for hook in channel.webhooks] == [1]
+
+
+@pytest.mark.asyncio()
+async def test_webhook_sink_marks_channel_unsupported_when_recreate_is_forbidden() -> None:
+    sink = WebhookLogSink(rate=100, per=1.0, unsupported_ttl=600, clock=lambda: 0.0)
+    outbox = ActivityLogOutbox(flush_interval=60, sink=sink)
+    channel = WebhookChannel()
+
+    outbox.submit(channel, _embed("Log 1"), guild_id=1)
+    await outbox.flush()
+    channel.webhooks[0].deleted = True
+
+    async def create_webhook(*, name: str):
+        raise _NoWebhookPermission()
+
+    # Webhook dihapus dan izin Manage Webhooks dicabut sekaligus.
+    channel.create_webhook = create_webhook
+    outbox.submit(channel, _embed("Log 2"), guild_id=1)
+    await outbox.close()
+
+    assert not sink.supports(channel.id)
+    assert len(channel.sent) == 1
+
+
+@pytest.mark.asyncio()
+async def test_webhook_sink_throttles_with_injected_clock() -> None:
+    now = [0.0]
+    sink = WebhookLogSink(rate=1, per=5.0, clock=lambda: now[0])
+    channel = WebhookChannel()
+
+    await sink.send(channel, [_embed("Log 1")])
+    now[0] = 6.0
+    await sink.send(channel, [_embed("Log 2")])
+
+    assert sink.throttled == 0
+    assert [len(hook.sent) for hook in channel.webhooks] == [2]
+
+
+def test_parse_category_mode_roundtrip() -> None:
+    assert parse_category_mode(None) == ("full", 100)
+    assert parse_category_mode("sampled:25") == ("sampled", 25)
+    assert parse_category_mode("sampled:abc") == ("full", 100)
+    assert parse_category_mode("aggregated") == ("aggregated", 0)
+    assert format_category_mode("sampled", 25) == "sampled:25"
+    assert format_category_mode("full", 50) == "full"
+
+
+def test_config_allows_applies_sampling_and_aggregation() -> None:
+    config = _ActivityLogConfig(
+        channel_id=1,
+        enabled=True,
+        disabled_categories=frozenset(),
+        category_modes={"messages": ("sampled", 25), "reactions": ("aggregated", 0)},
+    )
+    assert config.allows("messages", roll=lambda: 0.1)
+    assert not config.allows("messages", roll=lambda: 0.5)
+    assert config.allows("messages", sample=False, roll=lambda: 0.5)
+    assert not config.allows("reactions")
+    assert config.aggregates("reactions")
+    assert config.allows("members")
+
+
+@pytest.mark.asyncio()
+async def test_aggregated_category_posts_channel_summary() -> None:
+    settings = SimpleNamespace(
+        effective_activity_channel=lambda: 900,
+        activity_log_enabled=True,
+        activity_log_disabled_events=[],
+        activity_log_category_modes={"reactions": "aggregated"},
+    )
+
+    class Repo:
+        async def get(self, guild_id: int):
+            return settings
+
+    channel = DummyChannel(900)
+    guild = SimpleNamespace(id=1, get_channel=lambda _: None)
+    logger = ActivityLogger(
+        SimpleNamespace(guild_repo=Repo()),
+        outbox=ActivityLogOutbox(flush_interval=60),
+        aggregate_window=300,
+    )
+
+    for user_id in (10, 11, 10):
+        assert await logger.send_embed(
+            guild,
+            _embed("Reaksi Ditambahkan"),
+            channel=channel,
+            category="reactions",
+            user_id=user_id,
+            source_channel_id=42,
+        )
+    await logger.close()
+
+    (summary,) = channel.sent[0]
+    assert summary.title == "Ringkasan Reaksi"
+    assert summary.description == "3 reaksi di <#42> dari 2 pengguna"
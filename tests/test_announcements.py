@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+import interactions
+import pytest
+
+from bot.cogs.announcements import Announcements
+from bot.database.repositories import ScheduledAnnouncement, ScheduledJob
+from bot.services.delivery import DeliveryExecutor
+from bot.services.logging import get_logger
+
+
+class FakeAnnouncementRepo:
+    def __init__(self, announcements: list[ScheduledAnnouncement]) -> None:
+        self.announcements = {announcement.id: announcement for announcement in announcements}
+        self.finished: dict[str, list[int]] = {}
+
+    async def get_many(self, announcement_ids):
+        return [self.announcements[aid] for aid in announcement_ids if aid in self.announcements]
+
+    async def finish_many(self, announcement_ids, status):
+        self.finished.setdefault(status, []).extend(announcement_ids)
+
+
+class FakeScheduler:
+    def __init__(self) -> None:
+        self.scheduled: list[tuple[str, int, dict[str, Any]]] = []
+
+    async def schedule_persistent(self, kind, key, run_time, payload=None):
+        self.scheduled.append((kind, key, payload or {}))
+        return f"{kind}-{key}"
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int, error: Exception | None = None) -> None:
+        self.id = channel_id
+        self.error = error
+
+    async def send(self, **kwargs: Any) -> None:
+        if self.error is not None:
+            raise self.error
+
+
+class _ChannelGone(interactions.errors.NotFound):
+    def __init__(self) -> None:
+        Exception.__init__(self, "Unknown Channel")
+
+    def __str__(self) -> str:
+        return "Unknown Channel"
+
+
+def _announcement(announcement_id: int, channel_id: int) -> ScheduledAnnouncement:
+    return ScheduledAnnouncement(
+        id=announcement_id,
+        guild_id=1,
+        channel_id=channel_id,
+        author_id=10,
+        content="halo",
+        embed_title=None,
+        embed_description=None,
+        mention_role_id=None,
+        image_url=None,
+        scheduled_at="2026-01-01T00:00:00+00:00",
+        status="pending",
+        created_at="2026-01-01T00:00:00+00:00",
+        delivered_at=None,
+    )
+
+
+def _job(announcement_id: int) -> ScheduledJob:
+    return ScheduledJob(
+        job_id=f"announcement-{announcement_id}",
+        kind="announcement",
+        key=str(announcement_id),
+        run_at=0.0,
+        payload={},
+    )
+
+
+@pytest.mark.asyncio()
+async def test_fire_announcements_retries_transient_failures(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(interactions, "GuildText", FakeChannel)
+    channels = {
+        100: FakeChannel(100),
+        101: FakeChannel(101, RuntimeError("discord 503")),
+        102: FakeChannel(102, _ChannelGone()),
+    }
+    guild = SimpleNamespace(get_channel=channels.get)
+    repo = FakeAnnouncementRepo([_announcement(1, 100), _announcement(2, 101), _announcement(3, 102)])
+    scheduler = FakeScheduler()
+    cog = SimpleNamespace(
+        bot=SimpleNamespace(
+            announcement_repo=repo,
+            audit_repo=None,
+            scheduler=scheduler,
+            delivery=DeliveryExecutor(),
+            get_guild=lambda guild_id: guild,
+        ),
+        _build_message=lambda announcement: {"content": announcement.content},
+        _log=get_logger("Announcements"),
+    )
+
+    await Announcements._fire_announcements(cog, [_job(1), _job(2), _job(3)])
+
+    # Kegagalan sementara dijadwalkan ulang, bukan dibatalkan; NotFound tetap batal.
+    assert repo.finished == {"sent": [1], "cancelled": [3]}
+    assert scheduler.scheduled == [("announcement", 2, {"attempt": 1})]
@@ -1,7 +1,19 @@
 from __future__ import annotations
 
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
 from bot.database.repositories import AutomodRule
-from bot.services.automod import AutomodEngine
+from bot.services.automod import (
+    AutomodEngine,
+    CompiledRuleSet,
+    HeavyRule,
+    find_unsafe_regex_patterns,
+    is_catastrophic_pattern,
+)
 
 
 def test_link_filter_allows_whitelisted_domain():
@@ -31,3 +43,118 @@ def test_mention_limit_violation():
     rules = [AutomodRule(guild_id=1, rule_type="mention_limit", payload={"max_mentions": 2}, is_active=True)]
     violations = engine.evaluate(content="halo", mention_count=5, rules=rules)
     assert violations
+
+
+def test_regex_pack_compiled_as_heavy_rule():
+    engine = AutomodEngine()
+    rules = [AutomodRule(guild_id=1, rule_type="regex_pack", payload={"patterns": [r"fr[e3]{2}\s*nitro"]}, is_active=True)]
+    compiled = engine.compile(rules)
+    assert not compiled.cheap
+    assert len(compiled.heavy) == 1
+    violations = engine.evaluate(content="Klaim FREE nitro sekarang", mention_count=0, rules=compiled)
+    assert violations and violations[0].rule_type == "regex_pack"
+
+
+@pytest.mark.asyncio()
+async def test_heavy_rules_run_in_process_pool():
+    engine = AutomodEngine(heavy_workers=1, heavy_deadline=10)
+    rules = engine.compile(
+        [AutomodRule(guild_id=1, rule_type="regex_pack", payload={"patterns": [r"discord\.gift/\w+"]}, is_active=True)]
+    )
+    try:
+        violations = await engine.evaluate_async(content="cek discord.gift/abc123", mention_count=0, rules=rules)
+    finally:
+        engine.close()
+    assert [violation.rule_type for violation in violations] == ["regex_pack"]
+
+
+@pytest.mark.asyncio()
+async def test_heavy_rules_deadline_uses_fallback_verdict():
+    executor = ThreadPoolExecutor(max_workers=1)
+    executor.submit(time.sleep, 0.3)
+    engine = AutomodEngine(executor=executor, heavy_deadline=0.05, heavy_fallback="block")
+    rules = engine.compile(
+        [AutomodRule(guild_id=1, rule_type="regex_pack", payload={"patterns": [r"tidak-cocok"]}, is_active=True)]
+    )
+    try:
+        violations = await engine.evaluate_async(content="pesan biasa", mention_count=0, rules=rules)
+    finally:
+        executor.shutdown(wait=True)
+    assert engine.deadline_misses == 1
+    assert violations and violations[0].rule_type == "regex_pack"
+
+
+@pytest.mark.asyncio()
+async def test_stuck_worker_pool_is_recycled_after_deadline_miss():
+    engine = AutomodEngine(heavy_workers=1, heavy_deadline=0.5)
+    # compile() menolak pola ini, jadi bangun langsung untuk menguji jalur daur ulang pool.
+    pathological = CompiledRuleSet(heavy=(HeavyRule(rule_type="regex_pack", patterns=(re.compile(r"(a+)+$"),)),))
+    normal = engine.compile(
+        [AutomodRule(guild_id=1, rule_type="regex_pack", payload={"patterns": [r"discord\.gift/\w+"]}, is_active=True)]
+    )
+    try:
+        # Warm-up agar waktu start worker tidak ikut terhitung.
+        await engine.evaluate_async(content="halo", mention_count=0, rules=normal)
+        stuck = await engine.evaluate_async(content="a" * 40 + "!", mention_count=0, rules=pathological)
+        violations = await engine.evaluate_async(content="cek discord.gift/abc123", mention_count=0, rules=normal)
+    finally:
+        engine.close()
+    assert stuck == []
+    assert engine.deadline_misses == 1
+    assert engine.pool_restarts == 1
+    assert [violation.rule_type for violation in violations] == ["regex_pack"]
+
+
+def test_catastrophic_patterns_are_detected():
+    assert is_catastrophic_pattern(r"(a+)+$")
+    assert is_catastrophic_pattern(r"(.*)*x")
+    assert is_catastrophic_pattern(r"(\w+\s?)+$")
+    assert not is_catastrophic_pattern(r"fr[e3]{2}\s*nitro")
+    assert not is_catastrophic_pattern(r"(ab){2}")
+    assert find_unsafe_regex_patterns([r"discord\.gift/\w+", r"(a*)*"]) == [r"(a*)*"]
+
+
+def test_compile_skips_stored_catastrophic_patterns():
+    engine = AutomodEngine()
+    patterns = [r"(a+)+$", r"discord\.gift/\w+"]
+    rules = [AutomodRule(guild_id=1, rule_type="regex_pack", payload={"patterns": patterns}, is_active=True)]
+    compiled = engine.compile(rules)
+    assert [pattern.pattern for pattern in compiled.heavy[0].patterns] == [r"discord\.gift/\w+"]
+
+    only_unsafe = [AutomodRule(guild_id=1, rule_type="regex_pack", payload={"patterns": [r"(.*)*x"]}, is_active=True)]
+    assert engine.compile(only_unsafe).heavy == ()
+
+
+def test_duplicate_flood_triggers_on_distinct_users():
+    engine = AutomodEngine()
+    rules = [
+        AutomodRule(
+            guild_id=1,
+            rule_type="duplicate_flood",
+            payload={"min_users": 3, "window_seconds": 30, "similarity": 0.6},
+            is_active=True,
+        )
+    ]
+    text = "Gratis nitro klaim sekarang di situs kami!!"
+    assert not engine.evaluate(content=text, mention_count=0, rules=rules, author_id=10, timestamp=100.0)
+    # Pengirim yang sama tidak dihitung dua kali.
+    assert not engine.evaluate(content=text, mention_count=0, rules=rules, author_id=10, timestamp=101.0)
+    assert not engine.evaluate(content=text.upper(), mention_count=0, rules=rules, author_id=11, timestamp=102.0)
+    violations = engine.evaluate(content=text + " 🔥", mention_count=0, rules=rules, author_id=12, timestamp=103.0)
+    assert violations and violations[0].rule_type == "duplicate_flood"
+
+
+def test_duplicate_flood_window_expires():
+    engine = AutomodEngine()
+    rules = [
+        AutomodRule(
+            guild_id=1,
+            rule_type="duplicate_flood",
+            payload={"min_users": 2, "window_seconds": 10},
+            is_active=True,
+        )
+    ]
+    text = "pesan raid yang disalin berulang kali"
+    assert not engine.evaluate(content=text, mention_count=0, rules=rules, author_id=1, timestamp=0.0)
+    assert not engine.evaluate(content=text, mention_count=0, rules=rules, author_id=2, timestamp=60.0)
+    assert engine.evaluate(content=text, mention_count=0, rules=rules, author_id=3, timestamp=61.0)
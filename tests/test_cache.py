@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from bot.services.cache import SingleFlight, TTLCache
+
+
+@pytest.mark.asyncio()
+async def test_get_or_set_coalesces_concurrent_misses_per_key() -> None:
+    cache = TTLCache(ttl=60)
+    release = asyncio.Event()
+    calls: list[str] = []
+
+    def factory(key: str):
+        async def _load() -> str:
+            calls.append(key)
+            await release.wait()
+            return f"data-{key}"
+
+        return _load
+
+    waiters = [asyncio.create_task(cache.get_or_set("id:1301:2024:05", factory("a"))) for _ in range(5)]
+    other = asyncio.create_task(cache.get_or_set("id:1506:2024:05", factory("b")))
+    for _ in range(5):
+        await asyncio.sleep(0)
+    # Kunci berbeda tidak saling menunggu.
+    assert sorted(calls) == ["a", "b"]
+    assert cache.flights.in_flight() == 2
+
+    release.set()
+    assert await asyncio.gather(*waiters) == ["data-a"] * 5
+    assert await other == "data-b"
+    assert await cache.get("id:1301:2024:05") == "data-a"
+    assert cache.flights.stats()["id:1301:2024:05"] == {"calls": 5, "coalesced": 4}
+    assert cache.flights.total_coalesced() == 4
+    assert cache.flights.in_flight() == 0
+
+
+@pytest.mark.asyncio()
+async def test_single_flight_shares_errors_and_survives_caller_cancellation() -> None:
+    flights = SingleFlight(max_tracked=1)
+    release = asyncio.Event()
+
+    async def failing() -> None:
+        await release.wait()
+        raise RuntimeError("upstream down")
+
+    first = asyncio.create_task(flights.run("k", failing))
+    second = asyncio.create_task(flights.run("k", failing))
+    for _ in range(3):
+        await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    with pytest.raises(RuntimeError):
+        await second
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    assert await flights.run("other", lambda: asyncio.sleep(0, result=1)) == 1
+    assert list(flights.stats()) == ["other"]
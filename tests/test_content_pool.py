@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from bot.services.content_pool import ContentPool
+
+
+@pytest.mark.asyncio()
+async def test_content_pool_serves_buffered_items_and_adapts_refill_rate() -> None:
+    now = 0.0
+    batches = [[1, 2, 3], [4, 5, 6]]
+
+    async def fetch() -> list[int]:
+        return batches.pop(0)
+
+    pool = ContentPool("test", fetch, capacity=4, low_watermark=2, min_interval=1.0, max_interval=30.0, clock=lambda: now)
+    try:
+        assert pool.take() is None
+        assert await pool.fill_once() == 3
+        assert await pool.fill_once() == 1  # sisa batch dibuang saat penuh
+        assert len(pool) == 4
+
+        # Permintaan jarang: jeda isi ulang mengikuti laju konsumsi.
+        for step in (10.0, 20.0, 30.0):
+            now = step
+            assert pool.take() is not None
+        assert len(pool) == 1
+        assert pool.next_delay() == 1.0  # di bawah low watermark: isi secepat mungkin
+
+        pool.add([7, 8])
+        assert pool.next_delay() == 5.0
+        assert pool.stats()["hits"] == 3
+        assert pool.stats()["misses"] == 1
+    finally:
+        pool.stop()
+
+
+@pytest.mark.asyncio()
+async def test_content_pool_backs_off_after_failures_and_refills_in_background() -> None:
+    calls = 0
+
+    async def flaky() -> list[str]:
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("rate limited")
+        return ["a", "b"]
+
+    pool = ContentPool("flaky", flaky, capacity=2, min_interval=0.0, max_interval=8.0)
+    assert await pool.fill_once() == 0
+    assert pool.next_delay() == 2.0
+    assert pool.stats()["fetch_failures"] == 1
+
+    pool.start()
+    try:
+        for _ in range(50):
+            if len(pool) == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.take() == "a"
+    finally:
+        pool.stop()
@@ -7,6 +7,8 @@ import pytest_asyncio
 from bot.database.core import Database
 from bot.database import migrations
 from bot.database.repositories import (
+    ActivityArchiveEntry,
+    ActivityArchiveRepository,
     AnnouncementRepository,
     AutomodRepository,
     AuditLogRepository,
@@ -62,6 +64,13 @@ async def test_guild_settings_activity_log_fields(temp_db):
     assert settings.activity_log_enabled is True
     assert settings.activity_log_disabled_events == []
     assert settings.activity_log_channel_id == 9876
+    assert settings.activity_log_category_modes == {}
+
+    await repo.upsert(321, activity_log_category_modes={"messages": "sampled:25", "reactions": "aggregated"})
+    settings = await repo.get(321)
+    assert settings is not None
+    assert settings.activity_log_category_modes == {"messages": "sampled:25", "reactions": "aggregated"}
+    assert settings.activity_log_channel_id == 9876
 
 
 @pytest.mark.asyncio()
@@ -86,13 +95,23 @@ async def test_economy_daily_timestamp_upsert(temp_db):
 @pytest.mark.asyncio()
 async def test_reminder_crud(temp_db):
     repo = ReminderRepository(temp_db)
+    assert await repo.count_pending() == 0
     reminder_id = await repo.create(1, 2, "Halo", "2025-01-01T00:00:00+00:00", None)
+    assert await repo.count_pending() == 1
     reminders = await repo.list_for_user(1, 2)
     assert any(r["id"] == reminder_id for r in reminders)
     await repo.delete(reminder_id)
+    await repo.delete(reminder_id)
+    assert await repo.count_pending() == 0
     reminders = await repo.list_for_user(1, 2)
     assert not reminders
 
+    first = await repo.create(1, 2, "A", "2025-01-01T00:00:00+00:00", None)
+    second = await repo.create(1, 2, "B", "2025-01-01T00:01:00+00:00", None)
+    assert [r["message"] for r in await repo.get_many([second, first])] == ["A", "B"]
+    await repo.delete_many([first, second])
+    assert await repo.count_pending() == 0
+
 
 @pytest.mark.asyncio()
 async def test_couple_repository_lifecycle(temp_db):
@@ -199,6 +218,21 @@ async def test_announcement_repository_flow(temp_db):
     assert cancelled is True
     assert await repo.get(announcement.id) is not None
 
+    other = await repo.create(
+        guild_id=999,
+        channel_id=111,
+        author_id=222,
+        content="Lagi",
+        embed_title=None,
+        embed_description=None,
+        mention_role_id=None,
+        image_url=None,
+        scheduled_at="2025-01-01T00:00:00+00:00",
+    )
+    await repo.finish_many([announcement.id, other.id], "sent")
+    statuses = {item.id: item.status for item in await repo.get_many([announcement.id, other.id])}
+    assert statuses == {announcement.id: "cancelled", other.id: "sent"}
+
 
 @pytest.mark.asyncio()
 async def test_audit_repository_summary(temp_db):
@@ -222,3 +256,60 @@ async def test_audit_repository_summary(temp_db):
     actor_summary = await repo.actor_summary(guild_id, limit=2)
     actor_dict = dict(actor_summary)
     assert actor_dict.get(2) == 2
+
+
+@pytest.mark.asyncio()
+async def test_activity_archive_search_and_retention(temp_db):
+    repo = ActivityArchiveRepository(temp_db)
+    await repo.append_many(
+        [
+            ActivityArchiveEntry(
+                guild_id=1,
+                created_at=1_000,
+                category="messages",
+                title="Pesan Dihapus",
+                summary="Pesan Dihapus | Isi: jual akun murah",
+                user_id=10,
+                channel_id=20,
+                payload={"title": "Pesan Dihapus"},
+            ),
+            ActivityArchiveEntry(
+                guild_id=1,
+                created_at=2_000,
+                category="members",
+                title="Anggota Keluar",
+                summary="Anggota Keluar | Pengguna: @budi",
+                user_id=11,
+            ),
+            ActivityArchiveEntry(
+                guild_id=2,
+                created_at=2_500,
+                category="messages",
+                title="Pesan Dihapus",
+                summary="Pesan Dihapus | Isi: jual akun murah",
+                user_id=10,
+            ),
+        ]
+    )
+
+    by_user = await repo.search(1, user_id=10)
+    assert [entry.title for entry in by_user] == ["Pesan Dihapus"]
+    assert by_user[0].payload == {"title": "Pesan Dihapus"}
+
+    by_text = await repo.search(1, text="akun")
+    assert len(by_text) == 1 and by_text[0].channel_id == 20
+
+    recent = await repo.search(1, since=1_500)
+    assert [entry.category for entry in recent] == ["members"]
+
+    assert await repo.purge_before(1_500) == 1
+    assert await repo.search(1, text="akun") == []
+    assert len(await repo.search(2, text="akun")) == 1
+
+
+@pytest.mark.asyncio()
+async def test_job_schedule_indexes(temp_db):
+    rows = await temp_db.fetchall("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")
+    names = {row["name"] for row in rows}
+    assert "idx_scheduled_jobs_kind_run_at" in names
+    assert "idx_reminders_remind_at" not in names
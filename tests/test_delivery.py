@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from bot.services.delivery import DeliveryExecutor
+
+
+@pytest.mark.asyncio()
+async def test_delivery_executor_respects_global_and_channel_limits() -> None:
+    executor = DeliveryExecutor(global_limit=3, per_channel_limit=1)
+    active: dict[int, int] = {}
+    peak_total = 0
+    peak_channel = 0
+
+    async def send(item: tuple[int, int]) -> None:
+        nonlocal peak_total, peak_channel
+        channel_id, value = item
+        active[channel_id] = active.get(channel_id, 0) + 1
+        peak_total = max(peak_total, sum(active.values()))
+        peak_channel = max(peak_channel, active[channel_id])
+        await asyncio.sleep(0.01)
+        active[channel_id] -= 1
+        if value == 7:
+            raise RuntimeError("gagal")
+
+    items = [(index % 4, index) for index in range(12)]
+    results = await executor.run(items, send, channel_of=lambda item: item[0])
+
+    assert peak_total == 3
+    assert peak_channel == 1
+    assert [result.item for result in results] == items
+    assert [result.item[1] for result in results if not result.ok] == [7]
+    assert (executor.delivered, executor.failed) == (11, 1)
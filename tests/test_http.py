@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from bot.services.http import CircuitOpenError, EndpointPolicy, HTTPClient, HTTPRequestError
+
+
+async def _no_sleep(_: float) -> None:
+    return None
+
+
+@pytest.mark.asyncio()
+async def test_http_client_retries_then_opens_circuit() -> None:
+    hits = {"flaky": 0, "down": 0, "missing": 0}
+
+    async def flaky(request: web.Request) -> web.Response:
+        hits["flaky"] += 1
+        if hits["flaky"] < 3:
+            return web.Response(status=503)
+        return web.json_response({"ok": True})
+
+    async def down(request: web.Request) -> web.Response:
+        hits["down"] += 1
+        return web.Response(status=500)
+
+    async def missing(request: web.Request) -> web.Response:
+        hits["missing"] += 1
+        return web.Response(status=404)
+
+    app = web.Application()
+    app.router.add_get("/flaky", flaky)
+    app.router.add_get("/down", down)
+    app.router.add_get("/missing", missing)
+
+    now = [0.0]
+    server = TestServer(app)
+    await server.start_server()
+    client = HTTPClient(
+        default_policy=EndpointPolicy(timeout=2, retries=2, failure_threshold=2, reset_after=30),
+        policies={},
+        clock=lambda: now[0],
+        sleep=_no_sleep,
+    )
+    try:
+        assert await client.get_json(str(server.make_url("/flaky"))) == {"ok": True}
+        assert hits["flaky"] == 3
+
+        with pytest.raises(HTTPRequestError) as missing_error:
+            await client.get_json(str(server.make_url("/missing")))
+        assert missing_error.value.status == 404
+        assert hits["missing"] == 1
+
+        for _ in range(2):
+            with pytest.raises(HTTPRequestError):
+                await client.get_json(str(server.make_url("/down")))
+        assert hits["down"] == 6
+
+        with pytest.raises(CircuitOpenError):
+            await client.get_json(str(server.make_url("/down")))
+        assert hits["down"] == 6
+        assert client.is_open(str(server.make_url("/flaky")))
+
+        # Setelah masa tunggu, satu permintaan uji boleh lewat dan menutup breaker.
+        now[0] = 31.0
+        hits["flaky"] = 0
+        assert await client.get_json(str(server.make_url("/flaky"))) == {"ok": True}
+        assert not client.is_open(str(server.make_url("/flaky")))
+    finally:
+        await client.close()
+        await server.close()
+
+
+@pytest.mark.asyncio()
+async def test_http_client_probe_with_invalid_json_does_not_wedge_breaker() -> None:
+    state = {"mode": "down"}
+
+    async def upstream(request: web.Request) -> web.Response:
+        if state["mode"] == "down":
+            return web.Response(status=500)
+        if state["mode"] == "html":
+            return web.Response(status=200, text="<html>maintenance</html>", content_type="text/html")
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/api", upstream)
+
+    now = [0.0]
+    server = TestServer(app)
+    await server.start_server()
+    client = HTTPClient(
+        default_policy=EndpointPolicy(timeout=2, retries=0, failure_threshold=1, reset_after=30),
+        policies={},
+        clock=lambda: now[0],
+        sleep=_no_sleep,
+    )
+    url = str(server.make_url("/api"))
+    try:
+        with pytest.raises(HTTPRequestError):
+            await client.get_json(url)
+        assert client.is_open(url)
+
+        now[0] = 31.0
+        state["mode"] = "html"
+        with pytest.raises(HTTPRequestError) as html_error:
+            await client.get_json(url)
+        assert not isinstance(html_error.value, CircuitOpenError)
+        assert html_error.value.status == 200
+
+        # Probe gagal membuka ulang breaker; setelah masa tunggu berikutnya upstream pulih.
+        with pytest.raises(CircuitOpenError):
+            await client.get_json(url)
+        now[0] = 62.0
+        state["mode"] = "ok"
+        assert await client.get_json(url) == {"ok": True}
+        assert await client.get_json(url) == {"ok": True}
+        assert not client.is_open(url)
+    finally:
+        await client.close()
+        await server.close()
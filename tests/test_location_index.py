@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from bot.services.location_index import LocationEntry, LocationIndex, PrayerLocationCatalog
+
+
+def _city(location_id: str, lokasi: str) -> dict[str, Any]:
+    return {"id": location_id, "lokasi": lokasi}
+
+
+def _entry(row: dict[str, Any]) -> LocationEntry:
+    return LocationEntry(location_id=row["id"], label=row["lokasi"], payload=row)
+
+
+CITIES = [
+    _city("1301", "KOTA JAKARTA"),
+    _city("1505", "KAB. KEDIRI"),
+    _city("1506", "KOTA KEDIRI"),
+    _city("1609", "KOTA BANDUNG"),
+    _city("1610", "KAB. BANDUNG BARAT"),
+]
+
+
+def test_location_index_prefix_search_ranks_exact_tokens_first() -> None:
+    index = LocationIndex(_entry(row) for row in CITIES)
+
+    assert [row["id"] for row in index.search("band")] == ["1609", "1610"]
+    assert [row["id"] for row in index.search("kota ked")] == ["1506"]
+    assert [row["id"] for row in index.search("kediri")] == ["1505", "1506"]
+    assert index.search("1505")[0]["id"] == "1505"
+    # Skor sama: label terpendek lebih dulu, lalu urut abjad.
+    assert index.search("kota", limit=2) == [CITIES[2], CITIES[3]]
+
+
+def test_location_index_falls_back_to_substring() -> None:
+    index = LocationIndex(_entry(row) for row in CITIES)
+
+    assert [row["id"] for row in index.search("ndung")] == ["1609", "1610"]
+    assert index.search("surabaya") == []
+    assert index.search("  ") == []
+
+
+@pytest.mark.asyncio()
+async def test_catalog_persists_refresh_and_reloads_from_repository() -> None:
+    class FakeRepo:
+        def __init__(self) -> None:
+            self.rows: dict[str, list[tuple[str, str, dict[str, Any]]]] = {}
+
+        async def replace(self, negara: str, rows: list[tuple[str, str, dict[str, Any]]]) -> None:
+            self.rows[negara] = list(rows)
+
+        async def list_all(self, negara: str) -> list[dict[str, Any]]:
+            return [payload for _, _, payload in self.rows.get(negara, [])]
+
+    calls = 0
+
+    async def load() -> list[dict[str, Any]]:
+        nonlocal calls
+        calls += 1
+        return CITIES + [{"lokasi": "TANPA ID"}]
+
+    def build(row: dict[str, Any]) -> LocationEntry | None:
+        return _entry(row) if "id" in row else None
+
+    repo = FakeRepo()
+    catalog = PrayerLocationCatalog(repo, loaders={"indonesia": load}, builders={"indonesia": build})
+    assert await catalog.search("indonesia", "kediri") is None
+
+    await catalog.refresh_all()
+    assert calls == 1
+    assert len(repo.rows["indonesia"]) == len(CITIES)
+
+    # Instance baru (mis. setelah restart) membangun indeks dari database tanpa memanggil upstream.
+    restarted = PrayerLocationCatalog(repo, loaders={"indonesia": load}, builders={"indonesia": build})
+    results = await restarted.search("indonesia", "kediri")
+    assert [row["id"] for row in results or []] == ["1505", "1506"]
+    assert calls == 1
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from bot.services.loop_monitor import LoopMonitor
+
+
+@pytest.mark.asyncio()
+async def test_loop_monitor_records_lag_and_names_blocking_handler() -> None:
+    monitor = LoopMonitor(interval=0.01, slow_threshold=0.05)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        time.sleep(0.08)  # blokir loop secara sengaja
+        await asyncio.sleep(0.03)
+    finally:
+        await monitor.close()
+
+    summary = monitor.summary()
+    assert summary["samples"] >= 2
+    assert summary["max"] >= 0.05
+    assert summary["slow_callbacks"] >= 1
+    assert "test_loop_monitor_records_lag_and_names_blocking_handler" in monitor.recent[-1].stack
+
+
+@pytest.mark.asyncio()
+async def test_loop_monitor_reports_each_stall_once() -> None:
+    monitor = LoopMonitor(interval=0.5, slow_threshold=0.1)
+    monitor.start()
+    try:
+        # Seolah watchdog memeriksa saat coroutine ini memblokir loop 1 detik.
+        stalled_at = time.monotonic() + monitor.interval + 1.0
+        first = monitor.check(stalled_at)
+        second = monitor.check(stalled_at + 0.5)
+    finally:
+        await monitor.close()
+
+    assert first is not None
+    assert first.handler.startswith("test_loop_monitor_reports_each_stall_once ")
+    assert second is None
+    assert monitor.slow_callbacks == 1
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from bot.services.message_pipeline import MessagePipeline
+
+
+def _message(guild_id: int = 1) -> SimpleNamespace:
+    return SimpleNamespace(
+        guild=SimpleNamespace(id=guild_id, get_channel=lambda _: None),
+        author=SimpleNamespace(id=10, bot=False),
+        channel=SimpleNamespace(id=20),
+        content="halo semua",
+    )
+
+
+@pytest.mark.asyncio()
+async def test_guard_verdict_skips_moderated_stages_only():
+    pipeline = MessagePipeline(SimpleNamespace(guild_repo=None))
+    calls: list[str] = []
+
+    async def guard(ctx):
+        async def action() -> None:
+            calls.append("action")
+
+        return action
+
+    async def xp_stage(ctx):
+        calls.append("xp")
+
+    async def log_stage(ctx):
+        calls.append("log")
+
+    pipeline.register_guard("spam", guard, priority=20)
+    pipeline.register_stage("level_xp", xp_stage, skip_if_moderated=True)
+    pipeline.register_stage("activity_log", log_stage)
+
+    context = await pipeline.process(_message())
+
+    assert context is not None
+    assert context.moderated_by == "spam"
+    assert sorted(calls) == ["action", "log"]
+
+
+@pytest.mark.asyncio()
+async def test_lowest_priority_guard_wins():
+    pipeline = MessagePipeline(SimpleNamespace(guild_repo=None))
+    fired: list[str] = []
+
+    def make_guard(name: str):
+        async def guard(ctx):
+            async def action() -> None:
+                fired.append(name)
+
+            return action
+
+        return guard
+
+    pipeline.register_guard("automod", make_guard("automod"), priority=30)
+    pipeline.register_guard("banned_words", make_guard("banned_words"), priority=10)
+
+    context = await pipeline.process(_message())
+
+    assert context.moderated_by == "banned_words"
+    assert fired == ["banned_words"]
+
+
+@pytest.mark.asyncio()
+async def test_provider_runs_once_per_message():
+    loads = 0
+
+    class Repo:
+        async def get(self, guild_id: int):
+            nonlocal loads
+            loads += 1
+            await asyncio.sleep(0)
+            return SimpleNamespace(log_channel_id=None)
+
+    pipeline = MessagePipeline(SimpleNamespace(guild_repo=Repo()))
+
+    async def guard(ctx):
+        await ctx.settings()
+        return None
+
+    async def stage(ctx):
+        await ctx.settings()
+        await ctx.log_channel()
+
+    pipeline.register_guard("a", guard)
+    pipeline.register_guard("b", guard)
+    pipeline.register_stage("c", stage)
+
+    context = await pipeline.process(_message())
+
+    assert context.moderated_by is None
+    assert loads == 1
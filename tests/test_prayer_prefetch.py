@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from bot.services.cache import TTLCache
+from bot.services.prayer_prefetch import PrayerPrefetcher
+
+JAKARTA = ZoneInfo("Asia/Jakarta")
+
+
+def _key(negara: str, lokasi: str, year: int, month: int) -> str:
+    return f"{negara}:{lokasi}:{year}:{month:02d}"
+
+
+@pytest.mark.asyncio()
+async def test_prefetcher_refreshes_popular_locations_before_expiry_and_rollover() -> None:
+    cache = TTLCache(ttl=3600)
+    fetched: list[tuple[str, str, int, int]] = []
+    pauses: list[float] = []
+
+    async def refresh(negara: str, lokasi: str, year: int, month: int) -> dict[str, str]:
+        fetched.append((negara, lokasi, year, month))
+        await cache.set(_key(negara, lokasi, year, month), {"lokasi": lokasi})
+        return {"lokasi": lokasi}
+
+    async def fake_sleep(seconds: float) -> None:
+        pauses.append(seconds)
+
+    prefetcher = PrayerPrefetcher(
+        cache,
+        refresh,
+        _key,
+        timezones={"indonesia": JAKARTA},
+        top_n=2,
+        refresh_margin=600,
+        spacing=2.0,
+        sleep=fake_sleep,
+    )
+    for lokasi, hits in (("1632", 5), ("1609", 3), ("0101", 1)):
+        for _ in range(hits):
+            prefetcher.record("indonesia", lokasi)
+    assert prefetcher.popular() == [("indonesia", "1632"), ("indonesia", "1609")]
+
+    # Entri yang masih lama kedaluwarsa tidak diambil ulang.
+    await cache.set(_key("indonesia", "1609", 2024, 6), {"lokasi": "1609"})
+    refreshed = await prefetcher.run_once(datetime(2024, 6, 10, 12, tzinfo=JAKARTA))
+    assert refreshed == 1
+    assert fetched == [("indonesia", "1632", 2024, 6)]
+    assert pauses == []
+
+    # Menjelang akhir bulan, bulan berikutnya ikut dipanaskan dengan jeda.
+    fetched.clear()
+    await prefetcher.run_once(datetime(2024, 6, 30, 12, tzinfo=JAKARTA))
+    assert ("indonesia", "1632", 2024, 7) in fetched
+    assert ("indonesia", "1609", 2024, 7) in fetched
+    assert len(pauses) == len(fetched) - 1
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+
+from bot.services.prayer_schedule import (
+    MonthSchedule,
+    compact_indonesia_month,
+    compact_malaysia_month,
+    indonesian_date_label,
+)
+
+KUALA_LUMPUR = ZoneInfo("Asia/Kuala_Lumpur")
+
+
+def test_compact_indonesia_month_indexes_days_and_drops_extra_fields() -> None:
+    data = {
+        "lokasi": "KOTA KEDIRI",
+        "daerah": "JAWA TIMUR",
+        "jadwal": [
+            {
+                "date": "2024-06-03",
+                "tanggal": "Senin, 03/06/2024",
+                "imsak": "04:09",
+                "subuh": "04:19",
+                "terbit": "05:36",
+                "dhuha": "06:05",
+                "dzuhur": "11:34",
+                "ashar": "14:53",
+                "maghrib": "17:24",
+                "isya": "18:38",
+            },
+            {"date": "2024-07-01", "subuh": "04:20"},
+        ],
+    }
+
+    schedule = compact_indonesia_month(data, 2024, 6)
+
+    assert len(schedule.times) == 30 * len(schedule.prayers)
+    assert schedule.day(3) == {
+        "imsak": "04:09",
+        "subuh": "04:19",
+        "terbit": "05:36",
+        "dhuha": "06:05",
+        "dzuhur": "11:34",
+        "ashar": "14:53",
+        "maghrib": "17:24",
+        "isya": "18:38",
+    }
+    assert schedule.day(4) is None
+    assert schedule.day(31) is None
+    assert (schedule.label, schedule.region) == ("KOTA KEDIRI", "JAWA TIMUR")
+    assert indonesian_date_label(date(2024, 6, 3)) == "Senin, 03/06/2024"
+
+
+def test_compact_malaysia_month_converts_epochs_and_round_trips() -> None:
+    def stamp(hour: int, minute: int) -> int:
+        return int(datetime(2025, 6, 1, hour, minute, tzinfo=KUALA_LUMPUR).timestamp())
+
+    payload = {
+        "zone": "SGR01",
+        "prayers": [
+            {
+                "day": 1,
+                "hijri": "1446-12-04",
+                "fajr": stamp(5, 31),
+                "syuruk": stamp(6, 47),
+                "dhuhr": stamp(13, 12),
+                "asr": stamp(16, 30),
+                "maghrib": stamp(19, 24),
+                "isha": stamp(20, 40),
+            }
+        ],
+    }
+
+    schedule = compact_malaysia_month(
+        payload,
+        2025,
+        6,
+        KUALA_LUMPUR,
+        zone_detail={"negeri": "Selangor", "daerah": "Gombak"},
+    )
+
+    assert schedule.day(1) == {
+        "fajr": "05:31",
+        "syuruk": "06:47",
+        "dhuhr": "13:12",
+        "asr": "16:30",
+        "maghrib": "19:24",
+        "isha": "20:40",
+    }
+    assert schedule.note(1) == "1446-12-04"
+    assert schedule.label == "Selangor"
+
+    restored = MonthSchedule.from_dict(schedule.to_dict())
+    assert restored.day(1) == schedule.day(1)
+    assert restored.note(1) == "1446-12-04"
@@ -11,6 +11,7 @@ from discord.ext import commands
 from zoneinfo import ZoneInfo
 
 from bot.cogs.utility import Utility
+from bot.services.prayer_schedule import compact_indonesia_month, compact_malaysia_month
 
 
 @pytest.mark.asyncio()
@@ -37,7 +38,8 @@ async def test_jadwalsholat_indonesia_builds_embed(monkeypatch):
         ],
     }
 
-    monkeypatch.setattr(utility, "_fetch_month_indonesia", AsyncMock(return_value=month_payload))
+    schedule = compact_indonesia_month(month_payload, 2024, 6)
+    monkeypatch.setattr(utility, "_fetch_month_indonesia", AsyncMock(return_value=schedule))
 
     interaction = MagicMock()
     interaction.response = MagicMock()
@@ -80,13 +82,13 @@ async def test_jadwalsholat_malaysia_builds_embed(monkeypatch):
     def stamp(hour: int, minute: int) -> int:
         return int(datetime(2025, 6, 1, hour, minute, tzinfo=tz).timestamp())
 
+    zone_detail = {
+        "jakimCode": "SGR01",
+        "negeri": "Selangor",
+        "daerah": "Gombak, Petaling, Sepang, Hulu Langat, Hulu Selangor, Shah Alam",
+    }
     month_payload = {
         "zone": "SGR01",
-        "zone_detail": {
-            "jakimCode": "SGR01",
-            "negeri": "Selangor",
-            "daerah": "Gombak, Petaling, Sepang, Hulu Langat, Hulu Selangor, Shah Alam",
-        },
         "prayers": [
             {
                 "day": 1,
@@ -101,7 +103,8 @@ async def test_jadwalsholat_malaysia_builds_embed(monkeypatch):
         ],
     }
 
-    monkeypatch.setattr(utility, "_fetch_month_malaysia", AsyncMock(return_value=month_payload))
+    schedule = compact_malaysia_month(month_payload, 2025, 6, tz, zone_detail=zone_detail)
+    monkeypatch.setattr(utility, "_fetch_month_malaysia", AsyncMock(return_value=schedule))
 
     interaction = MagicMock()
     interaction.response = MagicMock()
@@ -182,7 +185,6 @@ async def test_jadwalsholat_command_registered_in_tree():
         assert command.description
     finally:
         await bot.remove_cog("Utility")
-        await cog.session.close()
         await bot.close()
 
 
@@ -12,6 +12,7 @@ from bot.services.presence import (
     _build_activity,
     _format_template,
     _humanize_timedelta,
+    compile_template,
 )
 
 
@@ -79,6 +80,30 @@ async def test_collect_snapshot_compiles_metrics() -> None:
     assert snapshot.database_connected is True
     assert snapshot.latency_ms == pytest.approx(123.0, rel=0.01)
     assert snapshot.uptime.total_seconds() >= 2 * 3600
+    assert snapshot.is_complete
+
+
+@pytest.mark.asyncio()
+async def test_last_snapshot_is_partial_but_collect_snapshot_is_complete() -> None:
+    config = RichPresenceConfig(
+        enabled=True,
+        rotation_seconds=30,
+        default_status="online",
+        activities=[PresenceActivityConfig(type="playing", text="{guild_count} server")],
+    )
+    manager = RichPresenceManager(DummyBot(), config, version="1.2.3")
+    await manager._build_context(frozenset({"guild_count"}))
+
+    partial = manager.last_snapshot
+    assert partial is not None
+    assert not partial.is_complete
+    assert partial.keys == frozenset({"guild_count"})
+    assert partial.guild_count == 2
+    assert partial.scheduler_jobs == 0
+
+    full = await manager.collect_snapshot()
+    assert full.is_complete
+    assert full.scheduler_jobs == 4
 
 
 def test_build_activity_variants() -> None:
@@ -118,3 +143,65 @@ def test_format_template_handles_missing_keys() -> None:
 def test_humanize_timedelta_output() -> None:
     human = _humanize_timedelta(timedelta(hours=1, minutes=30, seconds=10))
     assert human.startswith("1 jam")
+
+
+@pytest.mark.asyncio()
+async def test_apply_next_presence_suppresses_unchanged_activity() -> None:
+    config = RichPresenceConfig(
+        enabled=True,
+        activities=[PresenceActivityConfig(type="watching", text="{guild_count} server")],
+    )
+    bot = DummyBot()
+    calls: list[object] = []
+
+    async def change_presence(**kwargs):
+        calls.append(kwargs)
+
+    bot.change_presence = change_presence
+    manager = RichPresenceManager(bot, config, version="1.0.0")
+
+    await manager._apply_next_presence()
+    await manager._apply_next_presence()
+    assert len(calls) == 1
+    assert (manager.updates_sent, manager.updates_suppressed) == (1, 1)
+
+    bot.guilds.append(DummyGuild(5, 5, 0))
+    await manager._apply_next_presence()
+    assert len(calls) == 2
+    assert manager.stats()["updates_sent"] == 2
+
+    manager.request_refresh()
+    manager.request_refresh()
+    assert manager.refreshes_coalesced == 2
+
+
+@pytest.mark.asyncio()
+async def test_compiled_templates_only_collect_required_metrics() -> None:
+    class CountingReminderRepository:
+        calls = 0
+
+        async def count_pending(self) -> int:
+            CountingReminderRepository.calls += 1
+            return 7
+
+    config = RichPresenceConfig(
+        enabled=True,
+        activities=[
+            PresenceActivityConfig(type="watching", text="{guild_count} server"),
+            PresenceActivityConfig(type="playing", text="{pending_reminders} pengingat"),
+        ],
+    )
+    bot = DummyBot()
+    bot.reminder_repo = CountingReminderRepository()
+    manager = RichPresenceManager(bot, config)
+
+    assert compile_template("{guild_count} server {uptime_human}").keys == {"guild_count", "uptime_human"}
+
+    context = await manager._build_context(frozenset({"guild_count"}))
+    assert context["guild_count"] == 2
+    assert "pending_reminders" not in context
+    assert CountingReminderRepository.calls == 0
+
+    context = await manager._build_context(frozenset({"pending_reminders"}))
+    assert context["pending_reminders"] == 7
+    assert CountingReminderRepository.calls == 1
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from bot.cogs.reminders import REMINDER_MAX_ATTEMPTS, Reminders
+from bot.database.repositories import ScheduledJob
+from bot.services.delivery import DeliveryExecutor
+from bot.services.logging import get_logger
+
+
+class FakeReminderRepo:
+    def __init__(self, reminders: list[dict[str, Any]]) -> None:
+        self.reminders = {reminder["id"]: reminder for reminder in reminders}
+        self.deleted: list[int] = []
+
+    async def get_many(self, reminder_ids):
+        return [self.reminders[rid] for rid in reminder_ids if rid in self.reminders]
+
+    async def delete_many(self, reminder_ids):
+        self.deleted.extend(reminder_ids)
+
+
+class FakeScheduler:
+    def __init__(self) -> None:
+        self.scheduled: list[tuple[str, int, dict[str, Any]]] = []
+
+    async def schedule_persistent(self, kind, key, run_time, payload=None):
+        self.scheduled.append((kind, key, payload or {}))
+        return f"{kind}-{key}"
+
+
+def _job(reminder_id: int, attempt: int = 0) -> ScheduledJob:
+    payload = {"attempt": attempt} if attempt else {}
+    return ScheduledJob(job_id=f"reminder-{reminder_id}", kind="reminder", key=str(reminder_id), run_at=0.0, payload=payload)
+
+
+@pytest.mark.asyncio()
+async def test_fire_reminders_keeps_failed_deliveries_for_retry() -> None:
+    repo = FakeReminderRepo(
+        [
+            {"id": 1, "guild_id": 1, "user_id": 10, "channel_id": 100, "message": "ok"},
+            {"id": 2, "guild_id": 1, "user_id": 11, "channel_id": 101, "message": "gagal"},
+            {"id": 3, "guild_id": 1, "user_id": 12, "channel_id": 102, "message": "gagal terus"},
+        ]
+    )
+    scheduler = FakeScheduler()
+
+    async def deliver(reminder: dict[str, Any]) -> None:
+        if reminder["id"] != 1:
+            raise RuntimeError("discord 503")
+
+    cog = SimpleNamespace(
+        bot=SimpleNamespace(reminder_repo=repo, scheduler=scheduler, delivery=DeliveryExecutor()),
+        _deliver_reminder=deliver,
+        _log=get_logger("Reminders"),
+    )
+    await Reminders._fire_reminders(cog, [_job(1), _job(2), _job(3, attempt=REMINDER_MAX_ATTEMPTS - 1)])
+
+    # Yang terkirim dan yang percobaannya habis dihapus; yang gagal dijadwalkan ulang.
+    assert sorted(repo.deleted) == [1, 3]
+    assert scheduler.scheduled == [("reminder", 2, {"attempt": 1})]
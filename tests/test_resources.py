@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import gc
+
+import pytest
+
+from bot.services.resources import ResourceSampler, read_proc_status
+
+
+def test_resource_sampler_tracks_cpu_rate_and_trend() -> None:
+    now = 0.0
+    cpu = iter([1.0, 1.5, 3.0])
+    rss = iter([100 * 1024, 110 * 1024, 125 * 1024])
+
+    def clock() -> float:
+        return now
+
+    sampler = ResourceSampler(
+        maxlen=10,
+        clock=clock,
+        cpu_reader=lambda: next(cpu),
+        status_reader=lambda: {"VmRSS": next(rss), "Threads": 4},
+        fd_counter=lambda: 12,
+    )
+    first = sampler.sample()
+    assert first.cpu_percent is None
+    assert first.rss_mb == 100
+
+    now = 10.0
+    assert sampler.sample().cpu_percent == pytest.approx(5.0)
+    now = 20.0
+    assert sampler.sample().cpu_percent == pytest.approx(15.0)
+
+    summary = sampler.summary()
+    assert summary["window_seconds"] == 20.0
+    assert summary["rss_mb"] == 125
+    assert summary["rss_delta_mb"] == 25
+    assert summary["cpu_percent_avg"] == pytest.approx(10.0)
+    assert (summary["threads"], summary["open_fds"]) == (4, 12)
+
+
+def test_resource_sampler_records_gc_pauses() -> None:
+    sampler = ResourceSampler(cpu_reader=lambda: None, status_reader=dict, fd_counter=lambda: None)
+    sampler.start()
+    try:
+        gc.collect()
+        sample = sampler.sample()
+    finally:
+        sampler.close()
+    assert sample.gc_collections >= 1
+    assert sample.gc_pause_ms >= 0
+    assert sample.rss_mb is None
+    assert sampler.sample().gc_collections == 0
+
+
+def test_read_proc_status_handles_missing_file(tmp_path) -> None:
+    assert read_proc_status(str(tmp_path / "missing")) == {}
+    status = tmp_path / "status"
+    status.write_text("Name:\tpython\nVmHWM:\t  2048 kB\nVmRSS:\t  1024 kB\nThreads:\t3\n")
+    assert read_proc_status(str(status)) == {"VmHWM": 2048, "VmRSS": 1024, "Threads": 3}
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+from bot.database import migrations
+from bot.database.core import Database
+from bot.database.repositories import ScheduledJob, ScheduledJobRepository
+from bot.services import scheduler as scheduler_module
+from bot.services.scheduler import Scheduler
+
+
+@pytest_asyncio.fixture()
+async def temp_db(tmp_path: Path):
+    db = await Database.initialize(f"sqlite+aiosqlite:///{tmp_path / 'jobs.db'}")
+    await migrations.run_migrations()
+    yield db
+    await db.close()
+
+
+@pytest.mark.asyncio()
+async def test_persistent_jobs_coalesce_and_misfire(temp_db) -> None:
+    store = ScheduledJobRepository(temp_db)
+    now = datetime.now(timezone.utc)
+    # Job lama yang tersimpan sebelum "restart".
+    await store.upsert(ScheduledJob(job_id="reminder-1", kind="reminder", key="1", run_at=(now - timedelta(hours=2)).timestamp()))
+
+    scheduler = Scheduler()
+    scheduler.attach_store(store)
+    fired: list[list[str]] = []
+    missed: list[list[str]] = []
+    announced: list[str] = []
+
+    async def fire_reminders(jobs: list[ScheduledJob]) -> None:
+        fired.append([job.key for job in jobs])
+
+    async def drop_reminders(jobs: list[ScheduledJob]) -> None:
+        missed.append([job.key for job in jobs])
+
+    async def fire_announcement(job: ScheduledJob) -> None:
+        announced.append(job.key)
+
+    scheduler.register_job_type("reminder", fire_reminders, misfire_grace_time=60, coalesce=True, on_misfire=drop_reminders)
+    scheduler.register_job_type("announcement", fire_announcement)
+    await scheduler.schedule_persistent("reminder", 2, now - timedelta(seconds=1))
+    await scheduler.schedule_persistent("reminder", 3, now)
+    await scheduler.schedule_persistent("announcement", 9, now - timedelta(days=1))
+    await scheduler.schedule_persistent("reminder", 4, now + timedelta(hours=1))
+    await scheduler.cancel_persistent("reminder-3")
+
+    scheduler.start()
+    try:
+        for _ in range(50):
+            if fired and announced:
+                break
+            await asyncio.sleep(0.02)
+    finally:
+        scheduler.shutdown(wait=False)
+
+    assert missed == [["1"]]
+    assert fired == [["2"]]
+    assert announced == ["9"]
+    assert await store.count() == 1
+    assert scheduler.job_count() == 1
+
+    metrics = scheduler.metrics_summary()
+    assert (metrics["reminder"]["runs"], metrics["reminder"]["misfires"]) == (1, 1)
+    assert metrics["announcement"]["lag"]["max"] >= 86_000
+    assert scheduler.total_misfires() == 1
+
+
+@pytest.mark.asyncio()
+async def test_persistent_jobs_load_only_horizon_window(temp_db) -> None:
+    store = ScheduledJobRepository(temp_db)
+    now = datetime.now(timezone.utc)
+    scheduler = Scheduler(horizon_seconds=60)
+    scheduler.attach_store(store)
+    fired: list[list[str]] = []
+
+    async def fire_reminders(jobs: list[ScheduledJob]) -> None:
+        fired.append(sorted(job.key for job in jobs))
+
+    scheduler.register_job_type("reminder", fire_reminders, coalesce=True)
+    for key in range(5):
+        await scheduler.schedule_persistent("reminder", key, now + timedelta(milliseconds=50))
+    await scheduler.schedule_persistent("reminder", 99, now + timedelta(days=7))
+
+    scheduler.start()
+    try:
+        for _ in range(50):
+            if fired:
+                break
+            await asyncio.sleep(0.02)
+        # Job minggu depan belum dimuat ke memori, tetapi tetap tersimpan.
+        assert set(scheduler._window) == set()
+    finally:
+        scheduler.shutdown(wait=False)
+
+    assert fired == [["0", "1", "2", "3", "4"]]
+    assert [job.job_id for job in await store.window(["reminder"], (now + timedelta(days=8)).timestamp())] == ["reminder-99"]
+
+
+@pytest.mark.asyncio()
+async def test_rescheduling_stored_job_does_not_inflate_job_count(temp_db) -> None:
+    store = ScheduledJobRepository(temp_db)
+    now = datetime.now(timezone.utc)
+    scheduler = Scheduler(horizon_seconds=60)
+    scheduler.attach_store(store)
+
+    # Di luar jendela: penjadwalan ulang (mis. retry) hanya memperbarui baris yang ada.
+    for attempt in range(3):
+        await scheduler.schedule_persistent("announcement", 5, now + timedelta(days=1), {"attempt": attempt})
+    await scheduler.schedule_persistent("announcement", 6, now + timedelta(days=2))
+
+    assert await store.count() == 2
+    assert scheduler.job_count() == 2
+
+
+@pytest.mark.asyncio()
+async def test_schedule_once_records_lag_runtime_and_failures() -> None:
+    scheduler = Scheduler()
+    scheduler.start()
+    done = asyncio.Event()
+
+    async def failing() -> None:
+        done.set()
+        raise RuntimeError("gagal")
+
+    try:
+        scheduler.schedule_once("maintenance-purge", datetime.now(timezone.utc), failing)
+        await asyncio.wait_for(done.wait(), timeout=2)
+        await asyncio.sleep(0.01)
+    finally:
+        scheduler.shutdown(wait=False)
+
+    metrics = scheduler.metrics_for("maintenance")
+    assert (metrics.runs, metrics.failures) == (1, 1)
+    assert metrics.runtime.count == 1 and metrics.lag.count == 1
+
+
+@pytest.mark.asyncio()
+async def test_persistent_job_survives_handler_failure_and_retries(temp_db) -> None:
+    store = ScheduledJobRepository(temp_db)
+    now = datetime.now(timezone.utc)
+    scheduler = Scheduler(retry_seconds=0.05)
+    scheduler.attach_store(store)
+    attempts: list[str] = []
+    rows_during_run: list[int] = []
+
+    async def fire_announcement(job: ScheduledJob) -> None:
+        attempts.append(job.key)
+        rows_during_run.append(await store.count())
+        if len(attempts) == 1:
+            raise RuntimeError("gateway putus")
+
+    scheduler.register_job_type("announcement", fire_announcement)
+    await scheduler.schedule_persistent("announcement", 7, now)
+
+    scheduler.start()
+    try:
+        for _ in range(100):
+            if len(attempts) >= 2:
+                break
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.05)
+    finally:
+        scheduler.shutdown(wait=False)
+
+    assert attempts == ["7", "7"]
+    # Baris job masih ada selama handler berjalan dan baru dihapus setelah berhasil.
+    assert rows_during_run == [1, 1]
+    assert await store.count() == 0
+    metrics = scheduler.metrics_for("announcement")
+    assert (metrics.runs, metrics.failures) == (2, 1)
+
+
+@pytest.mark.asyncio()
+async def test_completed_job_keeps_row_rescheduled_by_handler(temp_db) -> None:
+    store = ScheduledJobRepository(temp_db)
+    now = datetime.now(timezone.utc)
+    scheduler = Scheduler()
+    scheduler.attach_store(store)
+    fired: list[str] = []
+
+    async def fire_reminder(job: ScheduledJob) -> None:
+        fired.append(job.key)
+        await scheduler.schedule_persistent("reminder", job.key, now + timedelta(hours=1))
+
+    scheduler.register_job_type("reminder", fire_reminder)
+    await scheduler.schedule_persistent("reminder", 5, now)
+
+    scheduler.start()
+    try:
+        for _ in range(50):
+            if fired:
+                break
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.02)
+    finally:
+        scheduler.shutdown(wait=False)
+
+    assert fired == ["5"]
+    rows = await store.window(["reminder"], (now + timedelta(days=1)).timestamp())
+    assert [row.run_at for row in rows] == [(now + timedelta(hours=1)).timestamp()]
+
+
+@pytest.mark.asyncio()
+async def test_refill_does_not_drop_job_scheduled_concurrently(temp_db) -> None:
+    store = ScheduledJobRepository(temp_db)
+    now = datetime.now(timezone.utc)
+    scheduler = Scheduler()
+    scheduler.attach_store(store)
+
+    async def fire_reminder(job: ScheduledJob) -> None:
+        return None
+
+    scheduler.register_job_type("reminder", fire_reminder)
+    scheduler._window_end = (now + timedelta(minutes=5)).timestamp()
+
+    read_started = asyncio.Event()
+    release_read = asyncio.Event()
+    original_window = store.window
+
+    async def slow_window(*args, **kwargs):
+        rows = await original_window(*args, **kwargs)
+        read_started.set()
+        await release_read.wait()
+        return rows
+
+    store.window = slow_window  # type: ignore[method-assign]
+    refill = asyncio.create_task(scheduler._refill(now.timestamp()))
+    await read_started.wait()
+    schedule = asyncio.create_task(scheduler.schedule_persistent("reminder", 1, now + timedelta(minutes=1)))
+    await asyncio.sleep(0.05)
+    release_read.set()
+    await asyncio.gather(refill, schedule)
+
+    assert "reminder-1" in scheduler._window
+    assert [job_id for _, job_id in scheduler._heap] == ["reminder-1"]
+
+
+@pytest.mark.asyncio()
+async def test_schedule_interval_records_lag() -> None:
+    scheduler = Scheduler()
+    scheduler.start()
+    done = asyncio.Event()
+
+    async def sample() -> None:
+        done.set()
+
+    try:
+        scheduler.schedule_interval(
+            "maintenance-sample",
+            60,
+            sample,
+            first_run=datetime.now(timezone.utc) + timedelta(milliseconds=50),
+        )
+        # Blokir loop agar eksekusi pertama terlambat dari jadwalnya.
+        time.sleep(0.25)
+        await asyncio.wait_for(done.wait(), timeout=2)
+        await asyncio.sleep(0.01)
+    finally:
+        scheduler.shutdown(wait=False)
+
+    metrics = scheduler.metrics_for("maintenance")
+    assert (metrics.runs, metrics.lag.count) == (1, 1)
+    assert metrics.lag.summary()["max"] >= 0.15
+
+
+@pytest.mark.asyncio()
+async def test_truncated_window_of_failing_jobs_does_not_spin(temp_db, monkeypatch) -> None:
+    monkeypatch.setattr(scheduler_module, "WINDOW_LIMIT", 3)
+    store = ScheduledJobRepository(temp_db)
+    now = datetime.now(timezone.utc)
+    scheduler = Scheduler(retry_seconds=60)
+    scheduler.attach_store(store)
+    attempted: list[str] = []
+    window_calls = [0]
+    original_window = store.window
+
+    async def counting_window(*args, **kwargs):
+        window_calls[0] += 1
+        return await original_window(*args, **kwargs)
+
+    store.window = counting_window  # type: ignore[method-assign]
+
+    async def always_fail(job: ScheduledJob) -> None:
+        attempted.append(job.key)
+        raise RuntimeError("upstream mati")
+
+    scheduler.register_job_type("announcement", always_fail)
+    for key in range(5):
+        await store.upsert(
+            ScheduledJob(
+                job_id=f"announcement-{key}",
+                kind="announcement",
+                key=str(key),
+                run_at=(now - timedelta(minutes=5 - key)).timestamp(),
+            )
+        )
+
+    scheduler.start()
+    try:
+        await asyncio.sleep(0.5)
+    finally:
+        scheduler.shutdown(wait=False)
+
+    # Semua job tercoba sekali (tidak tertutup job yang sedang backoff) tanpa query beruntun.
+    assert sorted(attempted) == ["0", "1", "2", "3", "4"]
+    assert window_calls[0] <= 5
+    assert await store.count() == 5
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from bot.services.scheduler import Scheduler
+from bot.services.stats import RollingHistogram, StatsRegistry
+
+
+def _guild(guild_id: int, humans: int, bots: int) -> SimpleNamespace:
+    members = [SimpleNamespace(bot=False) for _ in range(humans)]
+    members += [SimpleNamespace(bot=True) for _ in range(bots)]
+    return SimpleNamespace(id=guild_id, member_count=humans + bots, members=members)
+
+
+def test_registry_tracks_guilds_and_members_incrementally() -> None:
+    stats = StatsRegistry()
+    stats.rebuild([_guild(1, 18, 7), _guild(2, 30, 10)])
+    assert (stats.guild_count, stats.member_count, stats.human_count, stats.bot_count) == (2, 65, 48, 17)
+
+    stats.member_joined(1, is_bot=False)
+    stats.member_left(2, is_bot=True)
+    assert (stats.member_count, stats.human_count, stats.bot_count) == (65, 49, 16)
+
+    stats.track_guild(_guild(1, 5, 0))
+    assert (stats.guild_count, stats.member_count) == (2, 44)
+
+    stats.forget_guild(2)
+    stats.member_joined(2, is_bot=False)
+    assert (stats.guild_count, stats.member_count, stats.human_count, stats.bot_count) == (1, 5, 5, 0)
+
+
+@pytest.mark.asyncio()
+async def test_scheduler_job_count_follows_add_and_remove() -> None:
+    scheduler = Scheduler()
+    scheduler.start()
+
+    async def _job() -> None:
+        return None
+
+    try:
+        later = datetime.now(timezone.utc) + timedelta(hours=1)
+        scheduler.schedule_once("a", later, _job)
+        scheduler.schedule_once("a", later, _job)
+        scheduler.schedule_once("b", later, _job)
+        assert scheduler.job_count() == 2
+
+        scheduler.cancel("a")
+        scheduler.schedule_once("now", datetime.now(timezone.utc), _job)
+        await asyncio.sleep(0.05)
+        assert scheduler.job_count() == 1
+    finally:
+        scheduler.shutdown(wait=False)
+
+
+def test_rolling_histogram_keeps_recent_samples() -> None:
+    histogram = RollingHistogram(maxlen=10)
+    for value in range(100):
+        histogram.add(float(value))
+    summary = histogram.summary()
+    assert histogram.count == 100
+    assert summary["max"] == 99.0
+    assert summary["p50"] in (94.0, 95.0)
+    assert summary["p95"] == 99.0
+
+
+def test_registry_updates_guild_statistics_from_channel_and_role_events() -> None:
+    guild = _guild(1, 3, 1)
+    guild.text_channels = [1, 2]
+    guild.threads = [1]
+    guild.roles = [1, 2, 3]
+    guild.premium_subscription_count = 0
+    stats = StatsRegistry()
+    stats.track_guild(guild)
+
+    stats.channel_created(SimpleNamespace(type=0, guild_id=1))
+    stats.channel_created(SimpleNamespace(type=2, _guild_id=1))
+    stats.channel_deleted(SimpleNamespace(type=11, guild=SimpleNamespace(id=1)))
+    stats.channel_created(SimpleNamespace(type=0, guild_id=99))
+    stats.role_created(1)
+    stats.role_deleted(1)
+    stats.role_deleted(1)
+    stats.member_joined(1, is_bot=True)
+    stats.guild_updated(SimpleNamespace(id=1, premium_subscription_count=7, premium_tier=2))
+
+    snapshot = stats.guild(1)
+    assert snapshot is not None
+    assert (snapshot.text_channels, snapshot.voice_channels, snapshot.thread_channels) == (3, 1, 0)
+    assert snapshot.roles == 2
+    assert (snapshot.total_members, snapshot.bot_members) == (5, 2)
+    assert (snapshot.boosts, snapshot.boost_level) == (7, 2)
+
+
+def test_registry_tracks_emojis_stickers_and_scheduled_events() -> None:
+    guild = _guild(1, 2, 0)
+    guild.emojis = [1, 2]
+    guild.stickers = [1]
+    guild.scheduled_events = []
+    stats = StatsRegistry()
+    stats.track_guild(guild)
+
+    stats.emojis_updated(1, [1, 2, 3, 4])
+    stats.stickers_updated(1, [])
+    stats.scheduled_event_created(SimpleNamespace(_guild_id=1))
+    stats.scheduled_event_created(SimpleNamespace(_guild_id=1))
+    stats.scheduled_event_deleted(SimpleNamespace(_guild_id=1))
+    stats.emojis_updated(99, [1])
+
+    snapshot = stats.guild(1)
+    assert snapshot is not None
+    assert (snapshot.emoji_count, snapshot.sticker_count, snapshot.scheduled_events) == (4, 0, 1)
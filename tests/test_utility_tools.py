@@ -93,3 +93,26 @@ def test_format_timezone_display_for_offset() -> None:
 def test_resolve_timezone_invalid() -> None:
     with pytest.raises(ValueError):
         resolve_timezone("INVALID_ZONE")
+
+
+def test_resolve_timezone_memoizes_normalized_names() -> None:
+    from bot.services.utility_tools import _load_timezone
+
+    _load_timezone.cache_clear()
+    first = resolve_timezone("  utc+7 ")
+    second = resolve_timezone("UTC+7")
+    assert first is second
+    assert resolve_timezone("wib") is resolve_timezone("Asia/Jakarta")
+    assert _load_timezone.cache_info().hits >= 2
+    with pytest.raises(ValueError, match="tidak valid"):
+        resolve_timezone("UTC+25")
+
+
+def test_parse_datetime_input_grammar_matches_strptime_rules() -> None:
+    tz = ZoneInfo("Asia/Jakarta")
+    assert parse_datetime_input("5/1/2025 9:05", tz) == datetime(2025, 1, 5, 9, 5, tzinfo=tz)
+    assert parse_datetime_input("31-01-2025", tz) == datetime(2025, 1, 31, tzinfo=tz)
+    with pytest.raises(ValueError):
+        parse_datetime_input("31/02/2025", tz)
+    with pytest.raises(ValueError):
+        parse_datetime_input("24:00", tz)